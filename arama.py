@@ -0,0 +1,343 @@
+import os
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from bm25_indeks import indeks_al, tablodan_olustur, INDEKS_YOLU
+from indeks_manifest import parca_kimligi
+from gomme_onbellek import onbellek
+from metrikler import aralik, say
+from indeks_surumu import AktifIndeks, ModelUyumsuzlugu, ESKI_MODEL
+from trafik import KotaAsildi
+import belge_tablosu
+
+# Kaydi olmayan (dogrudan verilen) Pinecone index'inin soru gommesi modeli;
+# kayitli index'lerde model indeks_surumu kaydindan, yerel depoda bilgi.json'dan gelir
+SORGU_MODELI = ESKI_MODEL
+# belge_yukle.py --vektor ile yerel tabloya yazilan gommelerin modeli
+LANCE_GOMME_MODELI = "voyage-3"
+VEKTOR_SUTUNU = "vektor"
+ESIK = 0.3
+RRF_K = 60
+
+# Hibrit aramanin iki bacagi icin tum oturumlarca paylasilan is parcaciklari
+_havuz = ThreadPoolExecutor(max_workers=8, thread_name_prefix="arama")
+
+
+def ayir(sonuclar):
+    """Arama sonuclarini eski (parcalar, kaynaklar) bicimine cevirir."""
+    parcalar = [s["metin"] for s in sonuclar]
+    kaynaklar = [{"belge": s["belge"], "sayfa": s["sayfa"]} for s in sonuclar]
+    return parcalar, kaynaklar
+
+
+def sorgu_gommesi(voyage, soru, model):
+    """Soru gommesi; ayni (normallestirilmis) soru tekrar Voyage'a gitmez."""
+    return onbellek().gom(voyage, soru, model, input_type="query")
+
+
+def model_denetle(index_modeli, istenen, boyut=None, vektor=None):
+    """Soru gommesi index'i dolduran modelle yapilmayacaksa ModelUyumsuzlugu.
+
+    Farkli modellerin vektorleri ayni boyutta olsa da karsilastirilamaz;
+    arama yanlis sonuc dondurmek yerine hata verir.
+    """
+    if istenen and istenen != index_modeli:
+        raise ModelUyumsuzlugu(f"Index {index_modeli} ile gomulmus, soru {istenen} ile gomulemez.")
+    if boyut and vektor is not None and len(vektor) != boyut:
+        raise ModelUyumsuzlugu(f"Index {boyut} boyutlu, soru gommesi {len(vektor)} boyutlu ({index_modeli}).")
+
+
+def voyage_istemcisi():
+    anahtar = os.environ.get("VOYAGE_API_KEY")
+    if not anahtar:
+        return None
+    try:
+        import voyageai
+    except ImportError:
+        return None
+    return voyageai.Client(api_key=anahtar)
+
+
+def lance_tablosu():
+    """Surecin paylastigi vergi_belgeleri tablosu; tablo ya da lancedb yoksa None."""
+    try:
+        return belge_tablosu.tablo()
+    except ImportError:
+        return None
+
+
+class PineconeArayici:
+    """Voyage ile gomulen soruyu Pinecone index'inde arar.
+
+    index bir Pinecone index'i ya da indeks_surumu.AktifIndeks olabilir;
+    AktifIndeks kayittaki aktif index'e gecince sonraki sorgu yenisine gider.
+    model verilmezse soru index'i dolduran modelle gomulur; verilir ve
+    index'inkinden farkliysa arama reddedilir.
+    """
+
+    def __init__(self, index, voyage, model=None):
+        self.index = index
+        self.voyage = voyage
+        self.model = model
+
+    def hedef(self):
+        """(index, soru modeli, boyut); boyut bilinmiyorsa None."""
+        if isinstance(self.index, AktifIndeks):
+            index, bilgi = self.index.al()
+            model_denetle(bilgi["model"], self.model)
+            return index, bilgi["model"], bilgi["boyut"]
+        return self.index, self.model or SORGU_MODELI, None
+
+    def kayit_sayisi(self):
+        if not self.index:
+            return 0
+        return self.hedef()[0].describe_index_stats().get("total_vector_count", 0)
+
+    def _gom(self, soru, model, boyut):
+        vektor = sorgu_gommesi(self.voyage, soru, model)
+        model_denetle(model, None, boyut, vektor)
+        return vektor
+
+    def sorgu_vektoru(self, soru):
+        if not self.voyage:
+            return None
+        _, model, boyut = self.hedef()
+        return self._gom(soru, model, boyut)
+
+    def ara(self, soru, n=5, suzgec=None):
+        if not self.index or not self.voyage:
+            return []
+        index, model, boyut = self.hedef()
+        vektor = self._gom(soru, model, boyut)
+        ek = {"filter": suzgec.pinecone()} if suzgec else {}
+        with aralik("pinecone_sorgu"):
+            # Gommeler MMR'da adaylar arasi benzerlik icin kullanilir (baglam_derleme)
+            results = index.query(vector=vektor, top_k=n, include_metadata=True, include_values=True, **ek)
+        sonuclar = []
+        for match in results.matches:
+            if match.score > ESIK:
+                meta = match.metadata
+                metin, belge, sayfa = meta.get("metin", ""), meta.get("kaynak", meta.get("belge", "")), meta.get("sayfa", 1)
+                # Eski konumsal (doc_N) kimlikler yerine icerikten turetilen kimlik;
+                # boylece ayni parca her arka uctan ayni kimlikle gelir
+                sonuclar.append({"id": parca_kimligi(belge, sayfa, metin), "metin": metin,
+                                 "belge": belge, "sayfa": sayfa, "puan": match.score,
+                                 "vektor": getattr(match, "values", None) or None})
+        return sonuclar
+
+
+class LanceArayici:
+    """Yerel LanceDB tablosundaki gommeler uzerinde surec ici vektor aramasi.
+
+    Ag uzerinden yalnizca sorgu gommesi alinir; arama diskteki tabloda ve
+    (varsa) IVF-PQ indeksinde yapilir.
+    """
+
+    def __init__(self, tablo, voyage, model=LANCE_GOMME_MODELI):
+        self.tablo = tablo
+        self.voyage = voyage
+        self.model = model
+
+    def kayit_sayisi(self):
+        if self.tablo is None or VEKTOR_SUTUNU not in self.tablo.schema.names:
+            return 0
+        return self.tablo.count_rows()
+
+    def sorgu_vektoru(self, soru):
+        return sorgu_gommesi(self.voyage, soru, self.model) if self.voyage else None
+
+    def ara(self, soru, n=5, suzgec=None):
+        if self.tablo is None or not self.voyage:
+            return []
+        vektor = self.sorgu_vektoru(soru)
+        with aralik("lance_sorgu"):
+            sorgu = (self.tablo.search(vektor, vector_column_name=VEKTOR_SUTUNU)
+                     .distance_type("cosine").limit(n).refine_factor(10))
+            if suzgec:
+                # prefilter: once suzgec, sonra en yakin n; sonradan eleme n'den az sonuc birakir
+                sorgu = sorgu.where(suzgec.lance(), prefilter=True)
+            satirlar = sorgu.select(["belge", "sayfa", "metin", VEKTOR_SUTUNU, "_distance"]).to_list()
+        sonuclar = []
+        for s in satirlar:
+            puan = 1 - s["_distance"]
+            if puan > ESIK:
+                sonuclar.append({"id": parca_kimligi(s["belge"], s["sayfa"], s["metin"]), "metin": s["metin"],
+                                 "belge": s["belge"], "sayfa": s["sayfa"], "puan": puan,
+                                 "vektor": s.get(VEKTOR_SUTUNU)})
+        return sonuclar
+
+
+class YerelArayici:
+    """belge_yukle_pinecone.py --yerel ile yazilan mmap vektor deposunda kaba kuvvet arama.
+
+    Pinecone'a ag istegi yerine surec icinde tek bir matris carpimi yapilir;
+    puanlar ve ESIK Pinecone'daki gibidir. Depo yeniden yazilirsa sonraki
+    sorguda yenisi acilir.
+    """
+
+    def __init__(self, voyage, klasor=None, model=None):
+        self.voyage = voyage
+        self.klasor = klasor
+        self.model = model
+
+    def depo(self):
+        from vektor_deposu import depo_al, DEPO_YOLU
+        return depo_al(self.klasor or DEPO_YOLU)
+
+    def kayit_sayisi(self):
+        depo = self.depo()
+        return len(depo) if depo else 0
+
+    def _gom(self, depo, soru):
+        """Soru depoyu dolduran modelle gomulur; model verilip farkliysa ModelUyumsuzlugu."""
+        model_denetle(depo.model, self.model)
+        vektor = sorgu_gommesi(self.voyage, soru, depo.model)
+        model_denetle(depo.model, None, depo.vektorler.shape[1], vektor)
+        return vektor
+
+    def sorgu_vektoru(self, soru):
+        depo = self.depo()
+        return self._gom(depo, soru) if depo is not None and self.voyage else None
+
+    def ara(self, soru, n=5, suzgec=None):
+        depo = self.depo()
+        if depo is None or not self.voyage:
+            return []
+        vektor = self._gom(depo, soru)
+        with aralik("yerel_sorgu"):
+            bulunan = depo.ara(vektor, n, depo.satirlar(suzgec))
+        sonuclar = []
+        for puan, i in bulunan:
+            if puan > ESIK:
+                k = depo.kayit(i)
+                # int8 satirin olcegi kosinusu degistirmez
+                sonuclar.append({"id": parca_kimligi(k["belge"], k["sayfa"], k["metin"]), "metin": k["metin"],
+                                 "belge": k["belge"], "sayfa": k["sayfa"], "puan": puan,
+                                 "vektor": depo.vektorler[i].astype("float32").tolist()})
+        return sonuclar
+
+
+class KelimeArayici:
+    """Yerel BM25 indeksinde anahtar kelime aramasi."""
+
+    def __init__(self, yol=INDEKS_YOLU):
+        self.yol = yol
+
+    def indeks(self):
+        indeks = indeks_al(self.yol)
+        if indeks is None and self.yol == INDEKS_YOLU:
+            # Bu indeksten once kurulmus veritabanlari icin bir kez olustur
+            tablo = lance_tablosu()
+            if tablo is not None:
+                tablodan_olustur(tablo)
+                indeks = indeks_al()
+        return indeks
+
+    def sorgu_vektoru(self, soru):
+        return None
+
+    def kayit_sayisi(self):
+        indeks = self.indeks()
+        return len(indeks.parcalar) if indeks else 0
+
+    def ara(self, soru, n=5, suzgec=None):
+        indeks = self.indeks()
+        if indeks is None:
+            return []
+        with aralik("bm25"):
+            bulunan = indeks.ara(soru, n, suzgec)
+        return [{"id": parca_kimligi(p["belge"], p["sayfa"], p["metin"]), "metin": p["metin"],
+                 "belge": p["belge"], "sayfa": p["sayfa"], "puan": puan}
+                for puan, p in bulunan]
+
+
+def rrf_birlestir(listeler, n, k=RRF_K):
+    """Siralanmis sonuc listelerini reciprocal-rank fusion ile birlestirir."""
+    puanlar, sonuclar = {}, {}
+    for liste in listeler:
+        for sira, s in enumerate(liste):
+            puanlar[s["id"]] = puanlar.get(s["id"], 0.0) + 1.0 / (k + sira + 1)
+            sonuclar.setdefault(s["id"], s)
+    en_iyi = sorted(puanlar, key=puanlar.get, reverse=True)[:n]
+    return [dict(sonuclar[kimlik], puan=puanlar[kimlik]) for kimlik in en_iyi]
+
+
+class HibritArayici:
+    """Kelime ve vektor aramasini ayni anda calistirip RRF ile birlestirir.
+
+    Madde numarasi gibi birebir ifadeleri BM25, farkli kelimelerle sorulan
+    sorulari vektor aramasi yakalar. Iki bacak paralel calistigi icin sure
+    ikisinin toplami degil, yavas olaninki kadardir. Bir bacak hata verirse
+    digerinin sonuclari kullanilir; ancak kalan bacak da bos donerse
+    bacaklardan birinin KotaAsildi'si yukari iletilir.
+    """
+
+    def __init__(self, kelime, vektor, aday_carpani=2):
+        self.kelime = kelime
+        self.vektor = vektor
+        self.aday_carpani = aday_carpani
+
+    def sorgu_vektoru(self, soru):
+        return self.vektor.sorgu_vektoru(soru)
+
+    def kayit_sayisi(self):
+        sayilar = []
+        for arayici in (self.vektor, self.kelime):
+            try:
+                sayilar.append(arayici.kayit_sayisi())
+            except Exception:
+                pass
+        return max(sayilar, default=0)
+
+    def ara(self, soru, n=5, suzgec=None):
+        k = n * self.aday_carpani
+        # Her is kendi baglam kopyasiyla calisir; asama sureleri istegin dokumune islenir
+        isler = [_havuz.submit(contextvars.copy_context().run, a.ara, soru, k, suzgec)
+                 for a in (self.vektor, self.kelime)]
+        listeler, hatalar = [], []
+        for is_ in isler:
+            try:
+                listeler.append(is_.result())
+            except Exception as e:
+                say("yutulan_hata", yer="hibrit_bacak")
+                hatalar.append(e)
+        kota = [e for e in hatalar if isinstance(e, KotaAsildi)]
+        if kota and not any(listeler):
+            raise kota[0]
+        if not listeler:
+            raise hatalar[0]
+        return rrf_birlestir(listeler, n)
+
+
+def arayici_olustur(varsayilan="pinecone", index=None, voyage=None):
+    """VERGIAI_ARAMA ortam degiskenine (yoksa varsayilana) gore arayici kurar.
+
+    Degerler: pinecone, lance, yerel, kelime veya hibrit. Hibritin vektor
+    bacagi VERGIAI_VEKTOR ile secilir (pinecone, lance veya yerel). index ve voyage
+    verilmezse gerekenler ortam degiskenlerindeki anahtarlarla olusturulur.
+    Tum arayicilarin ara(soru, n, suzgec) metodu belge_bilgisi.Suzgec alir.
+    """
+    arka_uc = (os.environ.get("VERGIAI_ARAMA") or varsayilan).lower()
+    if arka_uc == "hibrit":
+        vektor_ucu = (os.environ.get("VERGIAI_VEKTOR") or "pinecone").lower()
+        return HibritArayici(KelimeArayici(), _vektor_arayici(vektor_ucu, index, voyage))
+    if arka_uc == "kelime":
+        return KelimeArayici()
+    return _vektor_arayici(arka_uc, index, voyage)
+
+
+def _vektor_arayici(arka_uc, index, voyage):
+    if voyage is None:
+        voyage = voyage_istemcisi()
+    if arka_uc == "lance":
+        return LanceArayici(lance_tablosu(), voyage)
+    if arka_uc == "yerel":
+        return YerelArayici(voyage)
+    if arka_uc == "pinecone":
+        if index is None and os.environ.get("PINECONE_API_KEY"):
+            try:
+                from pinecone import Pinecone
+                index = AktifIndeks(Pinecone(api_key=os.environ["PINECONE_API_KEY"]))
+            except Exception:
+                index = None
+        return PineconeArayici(index, voyage)
+    raise ValueError(f"Bilinmeyen arama arka ucu: {arka_uc} (pinecone, lance, yerel, kelime veya hibrit olmali)")
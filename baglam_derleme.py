@@ -0,0 +1,160 @@
+import os
+import math
+from collections import Counter
+from turkce import tokenlar, token_tahmini
+from parcalayici import cumleler
+from metrikler import aralik, say
+
+# Aramadan n * ADAY_CARPANI aday istenir, MMR bunlardan n tanesini secer
+ADAY_CARPANI = 3
+# 1: yalnizca alaka, 0: yalnizca cesitlilik
+MMR_LAMBDA = 0.8
+# Son mesaja eklenen belgelerin toplam tahmini token butcesi
+BAGLAM_BUTCE = int(os.environ.get("VERGIAI_BAGLAM_BUTCE", "1000"))
+# Bu kadar kisa ilk cumle ("Vergi indirimi:", "Madde 29 – 1.") maddeyi
+# tanittigi icin parcadan hangi cumle secilirse secilsin korunur
+BASLIK_TOKEN = 30
+ATLAMA = " [...] "
+
+
+def _vektor(metin):
+    return Counter(tokenlar(metin))
+
+
+def _birim(vektor):
+    """Gommeyi birim uzunluga getirir; gomme yoksa None."""
+    if vektor is None or not len(vektor):
+        return None
+    vektor = [float(x) for x in vektor]
+    norm = math.sqrt(sum(x * x for x in vektor))
+    return [x / norm for x in vektor] if norm else None
+
+
+def _kosinus(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    ic = sum(v * b.get(k, 0) for k, v in a.items())
+    if not ic:
+        return 0.0
+    return ic / math.sqrt(sum(v * v for v in a.values()) * sum(v * v for v in b.values()))
+
+
+def _alakalar(sonuclar):
+    """Arayici puanlarini 0-1 araligina ceker; BM25, kosinus ve RRF olcekleri farklidir."""
+    puanlar = [s.get("puan", 0.0) for s in sonuclar]
+    en_az, en_cok = min(puanlar), max(puanlar)
+    if en_cok <= en_az:
+        return [1.0 - i / len(sonuclar) for i in range(len(sonuclar))]
+    return [(p - en_az) / (en_cok - en_az) for p in puanlar]
+
+
+def mmr_sec(sonuclar, n, lam=MMR_LAMBDA):
+    """Maximal marginal relevance: alakali ama birbirini tekrar etmeyen n sonuc.
+
+    Iki adayin da gommesi ("vektor"; Pinecone, LanceDB ve yerel depo
+    sonuclarinda gelir) varsa benzerlik gommelerin kosinusudur; yalnizca
+    BM25'in buldugu parcalarda gomme olmadigindan o ciftler icin kok
+    vektorlerinin kosinusu kullanilir. Ek Voyage cagrisi yapilmaz.
+    """
+    gommeler = [_birim(s.get("vektor")) for s in sonuclar]
+    terimler = [None] * len(sonuclar)
+
+    def benzerlik(i, j):
+        if gommeler[i] is not None and gommeler[j] is not None and len(gommeler[i]) == len(gommeler[j]):
+            return sum(a * b for a, b in zip(gommeler[i], gommeler[j]))
+        for k in (i, j):
+            if terimler[k] is None:
+                terimler[k] = _vektor(sonuclar[k]["metin"])
+        return _kosinus(terimler[i], terimler[j])
+
+    alaka = _alakalar(sonuclar)
+    # Her adayin secilenlere en yakin benzerligi; secim basina bir kez guncellenir
+    en_yakin = [0.0] * len(sonuclar)
+    secilen, kalan = [], list(range(len(sonuclar)))
+    while kalan and len(secilen) < n:
+        en_iyi = max(kalan, key=lambda i: lam * alaka[i] - (1 - lam) * en_yakin[i])
+        secilen.append(en_iyi)
+        kalan.remove(en_iyi)
+        for i in kalan:
+            en_yakin[i] = max(en_yakin[i], benzerlik(i, en_iyi))
+    return [sonuclar[i] for i in secilen]
+
+
+def paketle(soru, sonuclar, butce=BAGLAM_BUTCE):
+    """Her parcayi soruyla en ilgili cumlelerine indirir; toplam butceyi asmaz.
+
+    Once her parcanin en ilgili cumlesi (ve kisa ilk cumlesi) alinir, sonra
+    soruyla ortak kok tasimayan (vektor aramasinin getirdigi) parcalara
+    butcenin esit payi kadar bastan cumle verilir, kalan butce soruyla ortak
+    kok sayisi en yuksek cumlelere harcanir. Cumleler parcadaki sirasiyla
+    birlestirilir, atlanan yerlere ATLAMA konur. Belge ve sayfa degismez;
+    MMR icin tasinan gomme pakete konmaz.
+    """
+    sorgu = set(tokenlar(soru))
+    parcalar = []
+    for s in sonuclar:
+        parcalar.append([(c, token_tahmini(c), len(sorgu & set(tokenlar(c)))) for c in cumleler(s["metin"])])
+    tutulan = [set() for _ in parcalar]
+    kalan = butce
+
+    def tut(i, j):
+        nonlocal kalan
+        t = parcalar[i][j][1]
+        if j in tutulan[i] or t > kalan:
+            return
+        tutulan[i].add(j)
+        kalan -= t
+
+    for i, cs in enumerate(parcalar):
+        if not cs:
+            continue
+        tut(i, max(range(len(cs)), key=lambda j: (cs[j][2], -j)))
+        if cs[0][1] <= BASLIK_TOKEN:
+            tut(i, 0)
+    pay = butce // max(1, len(parcalar))
+    for i, cs in enumerate(parcalar):
+        if any(c[2] for c in cs):
+            continue
+        for j in range(len(cs)):
+            if sum(cs[k][1] for k in tutulan[i]) + cs[j][1] > pay:
+                break
+            tut(i, j)
+    adaylar = sorted((-c[2], i, j) for i, cs in enumerate(parcalar) for j, c in enumerate(cs) if c[2])
+    for _, i, j in adaylar:
+        tut(i, j)
+
+    paket = []
+    for s, cs, secili in zip(sonuclar, parcalar, tutulan):
+        if not secili:
+            continue
+        metin, onceki = "", None
+        for j in sorted(secili):
+            if onceki is None:
+                metin = ("[...] " if j > 0 else "") + cs[j][0]
+            else:
+                metin += (" " if j == onceki + 1 else ATLAMA) + cs[j][0]
+            onceki = j
+        if onceki < len(cs) - 1:
+            metin += " [...]"
+        paket.append({**{k: v for k, v in s.items() if k != "vektor"}, "metin": metin})
+    return paket
+
+
+def derle(soru, sonuclar, n=5, butce=BAGLAM_BUTCE):
+    """Aday sonuclardan MMR ile n tane secip soruya gore butceye sigdirir."""
+    if not sonuclar:
+        return []
+    with aralik("baglam"):
+        secilen = mmr_sec(sonuclar, n)
+        paket = paketle(soru, secilen, butce)
+    say("baglam_token", sum(token_tahmini(s["metin"]) for s in paket))
+    say("baglam_aday_token", sum(token_tahmini(s["metin"]) for s in sonuclar[:n]))
+    return paket
+
+
+def baglam_metni(sonuclar):
+    """Son kullanici mesajina eklenen BELGELER blogu; sonuc yoksa None."""
+    if not sonuclar:
+        return None
+    icerik = "\n".join(f"[{s['belge']} - Sayfa {s['sayfa']}]\n{s['metin']}" for s in sonuclar)
+    return f"BELGELER:\n{icerik}"
@@ -0,0 +1,224 @@
+import os
+import time
+import threading
+from arama import arayici_olustur
+from indeks_surumu import AktifIndeks
+from metrikler import say, aralik, istek, dokum_ozeti
+from trafik import TekUcus
+from gomme_onbellek import normallestir
+
+# Ayni anda acik tutulacak en fazla HTTP baglantisi (her servis icin)
+HAVUZ_BOYUTU = 32
+ISTATISTIK_YASAM = 60
+# Istemciler, arayici ve kayit sayisi ayri is parcaciginda hazirlanir; sayfa
+# beklemeden cizilir. 0 ise isit() hazirlik bitene kadar bekler
+ARKA_ISINMA = os.environ.get("VERGIAI_ARKA_ISINMA", "1") != "0"
+
+_kilit = threading.Lock()
+_baglanti = None
+_arayici = None
+_sayac = None
+_asenkron_client = None
+_isinma = None
+_hazir = threading.Event()
+_aramalar = TekUcus("arama")
+
+
+def _voyage_oturumu():
+    """Tum is parcaciklarinin paylastigi, baglanti havuzlu requests oturumu.
+
+    voyageai varsayilan olarak is parcacigi basina oturum acar; Streamlit her
+    calistirmayi yeni bir is parcaciginda yaptigindan baglantilar hic tekrar
+    kullanilmaz.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    oturum = requests.Session()
+    oturum.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=HAVUZ_BOYUTU, max_retries=3))
+    return oturum
+
+
+def _baglan():
+    # SDK'larin ice aktarimi soguk baslangicin buyuk kismidir; sureleri ayri kaydedilir
+    with aralik("ice_aktarma_anthropic"):
+        from anthropic import Anthropic, DefaultHttpxClient
+        import httpx
+    anthropic_key = os.environ.get("ANTHROPIC_API_KEY")
+    pinecone_key = os.environ.get("PINECONE_API_KEY")
+    voyage_key = os.environ.get("VOYAGE_API_KEY")
+    client = Anthropic(api_key=anthropic_key, http_client=DefaultHttpxClient(
+        limits=httpx.Limits(max_connections=HAVUZ_BOYUTU, max_keepalive_connections=HAVUZ_BOYUTU)))
+    voyage = None
+    try:
+        with aralik("ice_aktarma_voyageai"):
+            import voyageai
+        if voyage_key:
+            voyageai.requestssession = _voyage_oturumu()
+            voyage = voyageai.Client(api_key=voyage_key)
+    except ImportError:
+        pass
+    try:
+        with aralik("ice_aktarma_pinecone"):
+            from pinecone import Pinecone
+    except ImportError:
+        return None, client, voyage
+    if not pinecone_key:
+        return None, client, voyage
+    try:
+        # Index'leri yalnizca belge_yukle_pinecone.py olusturur; uygulama kayittaki aktif index'i acar
+        pc = Pinecone(api_key=pinecone_key, connection_pool_maxsize=HAVUZ_BOYUTU)
+        return AktifIndeks(pc), client, voyage
+    except Exception:
+        return None, client, voyage
+
+
+def baglanti():
+    """(index, client, voyage) uclusu; surec basina bir kez kurulur."""
+    global _baglanti
+    with _kilit:
+        if _baglanti is None:
+            _baglanti = _baglan()
+        return _baglanti
+
+
+def _isit(varsayilan):
+    with istek("acilis") as dokum:
+        try:
+            with aralik("acilis_baglanti"):
+                baglanti()
+            with aralik("acilis_arayici"):
+                arayici(varsayilan)
+            with aralik("acilis_kayit_sayisi"):
+                kayit_sayisi()
+        except Exception as e:
+            say("yutulan_hata", yer="isinma")
+            print(f"Isinma yarida kaldi, ilk istekte tekrar denenecek ({type(e).__name__}): {e}")
+        finally:
+            _hazir.set()
+    print(f"Baglantilar hazir ({dokum['toplam']:.2f} sn): {dokum_ozeti(dokum)}")
+
+
+def isit(varsayilan="hibrit", arka=ARKA_ISINMA):
+    """Istemcileri, arayiciyi ve kayit sayisini surec basina bir kez hazirlar.
+
+    arka ise is parcaciginda calisir ve hemen doner; hazir() ile sorulur,
+    bekle() ile beklenir. Hazirlik bitmeden gelen cagri (baglanti(), arayici())
+    ayni kilidi bekledigi icin isi ikinci kez yapmaz.
+    """
+    global _isinma
+    with _kilit:
+        yeni = _isinma is None
+        if yeni:
+            _isinma = threading.Thread(target=_isit, args=(varsayilan,), daemon=True, name="isinma")
+    if yeni:
+        _isinma.start()
+    if not arka:
+        bekle()
+
+
+def hazir():
+    return _hazir.is_set()
+
+
+def bekle(sure=None):
+    """Isinma bitene kadar (en fazla sure saniye) bekler; bittiyse True."""
+    return _hazir.wait(sure)
+
+
+def asenkron_client():
+    """sunucu.py'nin paylastigi AsyncAnthropic; surec basina bir kez kurulur.
+
+    Baglanti havuzu HAVUZ_BOYUTU ile sinirlidir; ayni olay dongusundeki tum
+    istekler ayni havuzu kullanir.
+    """
+    global _asenkron_client
+    with _kilit:
+        if _asenkron_client is None:
+            from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+            import httpx
+            _asenkron_client = AsyncAnthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"), http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=HAVUZ_BOYUTU, max_keepalive_connections=HAVUZ_BOYUTU)))
+        return _asenkron_client
+
+
+def baglanti_ayarla(index, client, voyage, arayici=None, asenkron=None):
+    """Surecin istemcilerini (ve istenirse arayicisini) disaridan verir.
+
+    Yuk testi ve sahte servisler icindir; kayit sayaci sifirlanir, arayici
+    verilmezse ilk kullanimda bu istemcilerle yeniden kurulur. asenkron
+    verilirse asenkron_client() onu dondurur.
+    """
+    global _baglanti, _arayici, _sayac, _asenkron_client
+    with _kilit:
+        _baglanti = (index, client, voyage)
+        _arayici = arayici
+        _sayac = None
+        _asenkron_client = asenkron
+
+
+def arayici(varsayilan="hibrit"):
+    """Surec genelinde paylasilan arayici."""
+    global _arayici
+    index, _, voyage = baglanti()
+    with _kilit:
+        if _arayici is None:
+            _arayici = arayici_olustur(varsayilan=varsayilan, index=index, voyage=voyage)
+        return _arayici
+
+
+def ara(soru, n=5, suzgec=None):
+    """Paylasilan arayiciyla arama; ayni anda gelen ayni arama tek kez yapilir.
+
+    Anahtar normallestirilmis soru, n ve suzgectir; bekleyen oturumlar ilk
+    aramanin sonucunu (kendi liste kopyalarinda) alir.
+    """
+    anahtar = (normallestir(soru), n, repr(suzgec))
+    return list(_aramalar.yap(anahtar, lambda: arayici().ara(soru, n, suzgec)))
+
+
+class KayitSayaci:
+    """Index kayit sayisini onbellekte tutar ve arka planda yeniler.
+
+    Ilk okuma sayiyi bekler; sonrakiler hemen onbellekteki degeri dondurur,
+    deger yasam suresini asmissa tek bir arka plan is parcacigi yeniler.
+    """
+
+    def __init__(self, kaynak, yasam=ISTATISTIK_YASAM):
+        self.kaynak = kaynak
+        self.yasam = yasam
+        self.sayi = 0
+        self.zaman = None
+        self.yenileniyor = False
+        self.kilit = threading.Lock()
+
+    def _yenile(self):
+        try:
+            sayi = self.kaynak()
+        except Exception as e:
+            say("yutulan_hata", yer="kayit_sayisi")
+            print(f"Kayit sayisi alinamadi: {e}")
+            sayi = None
+        with self.kilit:
+            if sayi is not None:
+                self.sayi = sayi
+            self.zaman = time.monotonic()
+            self.yenileniyor = False
+
+    def deger(self):
+        with self.kilit:
+            ilk = self.zaman is None
+            eski = not ilk and time.monotonic() - self.zaman > self.yasam
+            if eski and not self.yenileniyor:
+                self.yenileniyor = True
+                threading.Thread(target=self._yenile, daemon=True).start()
+        if ilk:
+            self._yenile()
+        return self.sayi
+
+
+def kayit_sayisi():
+    global _sayac
+    with _kilit:
+        if _sayac is None:
+            _sayac = KayitSayaci(lambda: arayici().kayit_sayisi())
+    return _sayac.deger()
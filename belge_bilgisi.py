@@ -0,0 +1,205 @@
+import re
+import json
+import datetime
+from turkce import katla
+
+# Belge bilgilerini elle vermek/duzeltmek icin (istege bagli):
+# {"kdvira_kilavuzu": {"kanun": "KDV", "yayim": "2023-04-17", "etiketler": ["iade"]}}
+BILGI_DOSYASI = "./belgeler/bilgiler.json"
+# Kanun kodu: (kanun numarasi, belgenin basinda aranan katlanmis ifadeler)
+KANUNLAR = {
+    "KDV": ("3065", ("katma deger vergisi", "kdv")),
+    "GVK": ("193", ("gelir vergisi",)),
+    "KVK": ("5520", ("kurumlar vergisi",)),
+    "VUK": ("213", ("vergi usul",)),
+    "OTV": ("4760", ("ozel tuketim vergisi", "otv")),
+    "DVK": ("488", ("damga vergisi",)),
+    "HK": ("492", ("harclar",)),
+    "AATUHK": ("6183", ("amme alacaklarinin",)),
+    "EVK": ("1319", ("emlak vergisi",)),
+    "MTV": ("197", ("motorlu tasitlar vergisi",)),
+}
+_NUMARADAN = {numara: kod for kod, (numara, _) in KANUNLAR.items()}
+# Belge turu etiketleri; ilk eslesen kazanir ("... Kanunu Uygulama Kilavuzu" kilavuzdur)
+TURLER = ("kilavuz", "teblig", "sirkuler", "ozelge", "yonetmelik", "kanun")
+# Baslik, tur ve tarih belgenin ilk sayfasinin bu kadar karakterinde aranir
+BASLIK_KARAKTER = 1000
+# sinceDays ust siniri (~100 yil); daha eski belge yok, daha buyuk deger tarih tasirir
+AZAMI_GUN = 36500
+
+_KANUN_NUMARASI = re.compile(r"kanun numarasi\s*:\s*(\d{3,4})")
+_DOSYA_NUMARASI = re.compile(r"(?:^|[._-])(\d{3,4})$")
+_TARIH = r"(\d{1,2})\s*[./]\s*(\d{1,2})\s*[./]\s*(\d{4})"
+_RESMI_GAZETE = re.compile(r"resmi gazete\s*:?\s*(?:tarih\s*:?\s*)?" + _TARIH)
+_HERHANGI_TARIH = re.compile(_TARIH)
+
+
+def _tarih(gun, ay, yil):
+    """YYYYMMDD tamsayisi; gecersiz tarih icin 0."""
+    try:
+        return int(datetime.date(int(yil), int(ay), int(gun)).strftime("%Y%m%d"))
+    except ValueError:
+        return 0
+
+
+def tarih_sayisi(deger):
+    """"2023-04-17", date veya YYYYMMDD sayisini YYYYMMDD tamsayisina cevirir.
+
+    Okunamayan deger (ornegin elle girilen "01.03.2024") uyariyla 0 sayilir.
+    """
+    if not deger:
+        return 0
+    if isinstance(deger, int):
+        return deger
+    if isinstance(deger, datetime.date):
+        return int(deger.strftime("%Y%m%d"))
+    try:
+        yil, ay, gun = str(deger).split("-")
+    except ValueError:
+        print(f"Tarih okunamadi ({deger!r}), YYYY-AA-GG olmali; yayim tarihi bos sayildi.")
+        return 0
+    return _tarih(gun, ay, yil)
+
+
+def gun_oncesi(gun, bugun=None):
+    """Son gun gunun baslangic tarihi (YYYYMMDD); chat.ts'deki sinceDays karsiligi.
+
+    gun AZAMI_GUN ile sinirlanir; istemciden gelen buyuk sayi tarih tasmasina yol acmaz.
+    """
+    bugun = bugun or datetime.date.today()
+    return tarih_sayisi(bugun - datetime.timedelta(days=int(min(gun, AZAMI_GUN))))
+
+
+def _kanun(belge, baslik):
+    m = _KANUN_NUMARASI.search(baslik) or _DOSYA_NUMARASI.search(belge)
+    if m:
+        return _NUMARADAN.get(m.group(1), m.group(1))
+    # Baslikta en once gecen kanun adi
+    en_erken = None
+    for kod, (_, ifadeler) in KANUNLAR.items():
+        for ifade in ifadeler:
+            m = re.search(rf"\b{ifade}\b", baslik)
+            if m and (en_erken is None or m.start() < en_erken[0]):
+                en_erken = (m.start(), kod)
+    return en_erken[1] if en_erken else ""
+
+
+def elle_girilenler(yol=BILGI_DOSYASI):
+    """BILGI_DOSYASI'ndaki {belge: bilgi} sozlugu; dosya yoksa bos."""
+    try:
+        with open(yol, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"{yol} okunamadi ({e}), belge bilgileri metinden cikarilacak.")
+        return {}
+
+
+def belge_bilgisi(belge, sayfalar, elle=None):
+    """Belgenin kanun kodu, yayim tarihi ve etiketleri.
+
+    Donen: {"kanun": "KDV" (bilinmiyorsa kanun numarasi veya ""), "yayim":
+    YYYYMMDD (bilinmiyorsa 0), "etiketler": ["kdv", "kanun", ...]}. Kanun
+    once ilk sayfadaki "Kanun Numarasi", sonra dosya adindaki numara
+    (mevzuat.gov.tr'deki 1.5.3065), sonra basliktaki kanun adindan; tarih
+    Resmi Gazete tarihinden, yoksa ilk sayfadaki ilk tarihten bulunur.
+    elle verilen alanlar (BILGI_DOSYASI) bunlarin yerine gecer.
+    """
+    baslik = katla(sayfalar[0]["metin"][:BASLIK_KARAKTER]) if sayfalar else ""
+    baslik = " ".join(baslik.split())
+    kanun = _kanun(belge, baslik)
+    m = _RESMI_GAZETE.search(baslik) or _HERHANGI_TARIH.search(baslik)
+    yayim = _tarih(*m.groups()) if m else 0
+    tur = next((t for t in TURLER if t in baslik), "")
+    elle = elle or {}
+    # Suzgec kanunu buyuk harfle karsilastirir; elle girilen "kdv" de "KDV" yazilir
+    kanun = str(elle.get("kanun", kanun)).strip().upper()
+    etiketler = [e for e in (katla(kanun), tur) if e]
+    etiketler += [katla(e) for e in elle.get("etiketler", []) if katla(e) not in etiketler]
+    return {"kanun": kanun, "yayim": tarih_sayisi(elle["yayim"]) if "yayim" in elle else yayim,
+            "etiketler": etiketler}
+
+
+def _tirnak(deger):
+    return "'" + str(deger).replace("'", "''") + "'"
+
+
+class Suzgec:
+    """Aramayi kanuna, etiketlere, yayim tarihine ve belgeye gore daraltir.
+
+    Alanlar arasinda VE, bir alanin degerleri arasinda VEYA vardir. Her arka
+    uc suzgeci kendi bicimine cevirip aramanin icine verir (Pinecone metadata
+    filtresi, LanceDB where, yerel depo ve BM25 icin belge maskesi); sonuclar
+    aramadan sonra elenmez.
+    """
+
+    def __init__(self, kanun=(), etiketler=(), tarihten=0, belge=()):
+        self.kanun = sorted({k.strip().upper() for k in kanun if k and k.strip()})
+        self.etiketler = sorted({katla(e).strip() for e in etiketler if e and e.strip()})
+        self.tarihten = tarih_sayisi(tarihten)
+        self.belge = sorted({b for b in belge if b})
+
+    def __bool__(self):
+        return bool(self.kanun or self.etiketler or self.tarihten or self.belge)
+
+    def __repr__(self):
+        return f"Suzgec({self.sozluk()})"
+
+    def sozluk(self):
+        return {k: v for k, v in (("kanun", self.kanun), ("etiketler", self.etiketler),
+                                  ("tarihten", self.tarihten), ("belge", self.belge)) if v}
+
+    def uyar(self, belge, bilgi):
+        """Belge (ve bilgisi) suzgece uyuyor mu; bilgisi olmayan belge yalnizca bos suzgece uyar."""
+        bilgi = bilgi or {}
+        if self.belge and belge not in self.belge:
+            return False
+        if self.kanun and bilgi.get("kanun", "").upper() not in self.kanun:
+            return False
+        if self.etiketler and not set(self.etiketler) & set(bilgi.get("etiketler", ())):
+            return False
+        return not self.tarihten or bilgi.get("yayim", 0) >= self.tarihten
+
+    def pinecone(self):
+        """Pinecone metadata filtresi; bos suzgec icin None."""
+        kosullar = {}
+        if self.belge:
+            kosullar["belge"] = {"$in": self.belge}
+        if self.kanun:
+            kosullar["kanun"] = {"$in": self.kanun}
+        if self.etiketler:
+            kosullar["etiketler"] = {"$in": self.etiketler}
+        if self.tarihten:
+            kosullar["yayim"] = {"$gte": self.tarihten}
+        return kosullar or None
+
+    def lance(self):
+        """LanceDB where ifadesi; bos suzgec icin None."""
+        kosullar = []
+        if self.belge:
+            kosullar.append(f"belge IN ({', '.join(map(_tirnak, self.belge))})")
+        if self.kanun:
+            kosullar.append(f"kanun IN ({', '.join(map(_tirnak, self.kanun))})")
+        if self.etiketler:
+            kosullar.append(f"array_has_any(etiketler, [{', '.join(map(_tirnak, self.etiketler))}])")
+        if self.tarihten:
+            kosullar.append(f"yayim >= {self.tarihten}")
+        return " AND ".join(kosullar) or None
+
+
+def istekten(govde):
+    """API govdesindeki kanun/tags/sinceDays alanlarindan Suzgec (yoksa None).
+
+    Alan adlari functions/api/chat.ts ile aynidir; kanun tek deger veya liste olabilir.
+    """
+    def liste(deger):
+        if isinstance(deger, str):
+            return [deger]
+        return [str(d) for d in deger] if isinstance(deger, list) else []
+
+    gun = govde.get("sinceDays")
+    gecerli = isinstance(gun, (int, float)) and not isinstance(gun, bool) and gun > 0
+    suzgec = Suzgec(kanun=liste(govde.get("kanun")), etiketler=liste(govde.get("tags")),
+                    tarihten=gun_oncesi(gun) if gecerli else 0)
+    return suzgec or None
@@ -0,0 +1,97 @@
+import datetime
+import threading
+from belge_bilgisi import Suzgec
+
+VERITABANI_YOLU = "./veritabani"
+TABLO_ADI = "vergi_belgeleri"
+# Acik tablo baska bir surecin (belge_yukle.py) yazdiklarini en gec bu surede gorur
+TAZELIK = datetime.timedelta(seconds=30)
+
+_kilit = threading.Lock()
+_db = None
+_tablo = None
+
+
+def _baglanti():
+    global _db
+    if _db is None:
+        import lancedb
+        _db = lancedb.connect(VERITABANI_YOLU, read_consistency_interval=TAZELIK)
+    return _db
+
+
+def tablo():
+    """vergi_belgeleri tablosu; yoksa None.
+
+    Tablo surec basina bir kez acilir; sayim, varlik kontrolu ve aramalar
+    ayni tutamagi kullanir, her cagri tabloyu yeniden acmaz.
+    """
+    global _tablo
+    with _kilit:
+        if _tablo is None:
+            try:
+                _tablo = _baglanti().open_table(TABLO_ADI)
+            except (ValueError, OSError):
+                return None
+        return _tablo
+
+
+def var_mi():
+    return tablo() is not None
+
+
+def sutunlar():
+    t = tablo()
+    return t.schema.names if t is not None else []
+
+
+def say(kosul=None):
+    """Satir sayisi; kosulsuz sayim veri okumadan tablo bilgisinden gelir."""
+    t = tablo()
+    return t.count_rows(kosul) if t is not None else 0
+
+
+def sec(t, sutunlar, kosul=None, n=None):
+    """t tablosundan yalnizca istenen sutunlarla (kosula uyan ilk n) satir; sozluk listesi."""
+    sorgu = t.search().select(list(sutunlar))
+    if kosul:
+        sorgu = sorgu.where(kosul)
+    return sorgu.limit(n).to_list()
+
+
+def satirlar(sutunlar, kosul=None, n=None):
+    t = tablo()
+    return sec(t, sutunlar, kosul, n) if t is not None else []
+
+
+def belge_var_mi(belge):
+    """Belgenin en az bir parcasi var mi; yalnizca belge sutunu taranir, ilk eslesmede durur."""
+    return bool(satirlar(["belge"], Suzgec(belge=[belge]).lance(), n=1))
+
+
+def belgeler():
+    """Tablodaki belge adlari; yalnizca belge sutunu okunur."""
+    t = tablo()
+    if t is None:
+        return set()
+    import pyarrow.compute as pc
+    return set(pc.unique(t.search().select(["belge"]).limit(None).to_arrow()["belge"]).to_pylist())
+
+
+def olustur(veriler, sema):
+    """Tabloyu (varsa ustune yazarak) olusturur; yeni tablo surecin acik tablosu olur."""
+    global _tablo
+    with _kilit:
+        _tablo = _baglanti().create_table(TABLO_ADI, data=veriler, schema=sema, mode="overwrite")
+        return _tablo
+
+
+def ekle(veriler):
+    tablo().add(veriler)
+
+
+def sil():
+    global _tablo
+    with _kilit:
+        _baglanti().drop_table(TABLO_ADI)
+        _tablo = None
@@ -1,64 +1,112 @@
 import os
-import fitz
-import lancedb
+import sys
 import warnings
 warnings.filterwarnings("ignore")
 from dotenv import load_dotenv
+from pdf_cikarma import Olcum, sayfalari_akit, belgelere_grupla
+from parcalayici import parcala
+from tekillestirme import ust_alt_ayikla, Tekillestirici
+from belge_bilgisi import belge_bilgisi, elle_girilenler
+from bm25_indeks import tablodan_olustur
+from arama import voyage_istemcisi, LANCE_GOMME_MODELI, VEKTOR_SUTUNU
+import belge_tablosu
 load_dotenv()
 
-VERITABANI_YOLU = "./veritabani"
-TABLO_ADI = "vergi_belgeleri"
 BELGELER_KLASORU = "./belgeler"
+GOMME_BATCH = 64
+# IVF-PQ egitimi icin en az bu kadar satir gerekir; altinda kaba kuvvet arama yeterli
+VEKTOR_INDEKS_ESIGI = 256
+
+def gom(metinler):
+    voyage = voyage_istemcisi()
+    if voyage is None:
+        raise RuntimeError("VOYAGE_API_KEY tanimli degil, vektorler olusturulamaz.")
+    vektorler = []
+    for i in range(0, len(metinler), GOMME_BATCH):
+        sonuc = voyage.embed(metinler[i:i+GOMME_BATCH], model=LANCE_GOMME_MODELI, input_type="document")
+        vektorler.extend(sonuc.embeddings)
+    return vektorler
+
+
+def tablo_semasi(boyut=None):
+    """Tablo semasi; boyut verilirse vektor sutunuyla.
+
+    Sema acikca verilir: bos etiket listeleri list<string> yerine tipsiz
+    cikarilmasin, IVF-PQ indeksi de sabit uzunlukta float32 vektor sutunu ister.
+    """
+    import pyarrow as pa
+    alanlar = [
+        pa.field("belge", pa.string()),
+        pa.field("sayfa", pa.int64()),
+        pa.field("metin", pa.string()),
+        pa.field("madde", pa.string()),
+        pa.field("kanun", pa.string()),
+        pa.field("yayim", pa.int64()),
+        pa.field("etiketler", pa.list_(pa.string())),
+    ]
+    if boyut:
+        alanlar.append(pa.field(VEKTOR_SUTUNU, pa.list_(pa.float32(), boyut)))
+    return pa.schema(alanlar)
+
 
-db = lancedb.connect(VERITABANI_YOLU)
+BILGI_SUTUNLARI = ("madde", "kanun", "yayim", "etiketler")
 
 
-def tablo_var_mi():
-    try:
-        sonuc = db.list_tables()
-        return TABLO_ADI in str(sonuc)
-    except Exception:
+def eski_parcali_mi():
+    """Tablo eski parcalama ile (madde sutunu olmadan) ya da belge bilgisi sutunlari olmadan mi kurulmus."""
+    if not belge_tablosu.var_mi():
         return False
+    sutunlar = belge_tablosu.sutunlar()
+    return any(s not in sutunlar for s in BILGI_SUTUNLARI)
 
 
-def pdf_oku(dosya_yolu):
-    doc = fitz.open(dosya_yolu)
-    sayfalar = []
-    for i in range(len(doc)):
-        metin = doc[i].get_text()
-        if metin.strip():
-            sayfalar.append({"sayfa_no": i + 1, "metin": metin})
-    return sayfalar
+def vektorlu_mu():
+    return VEKTOR_SUTUNU in belge_tablosu.sutunlar()
 
 
-def metni_parcala(sayfalar, boyut=400, kesisme=40):
-    parcalar = []
-    for sayfa in sayfalar:
-        kelimeler = sayfa["metin"].split()
-        i = 0
-        while i < len(kelimeler):
-            metin = " ".join(kelimeler[i:i+boyut])
-            if metin.strip():
-                parcalar.append({"metin": metin, "sayfa": sayfa["sayfa_no"]})
-            i += boyut - kesisme
-    return parcalar
+def vektorleri_tamamla():
+    """Vektor sutunu olmayan mevcut tabloyu bir kez gomup yeniden yazar."""
+    if not belge_tablosu.var_mi() or vektorlu_mu():
+        return
+    kayitlar = belge_tablosu.satirlar(["belge", "sayfa", "metin", *BILGI_SUTUNLARI])
+    print(f"Mevcut {len(kayitlar)} parca icin vektorler olusturuluyor...")
+    vektorler = gom([k["metin"] for k in kayitlar])
+    for kayit, vektor in zip(kayitlar, vektorler):
+        kayit[VEKTOR_SUTUNU] = vektor
+    belge_tablosu.olustur(kayitlar, tablo_semasi(len(vektorler[0])))
+
+
+def vektor_indeksi_olustur(tablo):
+    n = tablo.count_rows()
+    if n < VEKTOR_INDEKS_ESIGI:
+        print(f"Vektor indeksi atlandi ({n} parca), arama kaba kuvvetle yapilacak.")
+        return
+    tablo.create_index(metric="cosine", vector_column_name=VEKTOR_SUTUNU,
+                       num_partitions=max(1, int(n ** 0.5)), num_sub_vectors=64, replace=True)
+    print(f"Vektor indeksi (IVF-PQ) olusturuldu: {n} parca.")
 
 
-def yukle(belge_adi, parcalar):
+def yukle(belge_adi, parcalar, vektorlu=False, bilgi=None):
+    bilgi = bilgi or {"kanun": "", "yayim": 0, "etiketler": []}
     veriler = [
-        {"belge": belge_adi, "sayfa": p["sayfa"], "metin": p["metin"]}
+        {"belge": belge_adi, "sayfa": p["sayfa"], "metin": p["metin"], "madde": p["madde"], **bilgi}
         for p in parcalar
     ]
 
-    if tablo_var_mi():
-        tablo = db.open_table(TABLO_ADI)
-        mevcut = tablo.to_pandas()["belge"].unique().tolist()
-        if belge_adi in mevcut:
-            print(f"  '{belge_adi}' zaten yuklu, atlaniyor.")
-            return 0
-        tablo.add(veriler)
+    if belge_tablosu.belge_var_mi(belge_adi):
+        print(f"  '{belge_adi}' zaten yuklu, atlaniyor.")
+        return 0
+
+    if vektorlu:
+        for veri, vektor in zip(veriler, gom([v["metin"] for v in veriler])):
+            veri[VEKTOR_SUTUNU] = vektor
+
+    if belge_tablosu.var_mi():
+        belge_tablosu.ekle(veriler)
+    elif vektorlu:
+        belge_tablosu.olustur(veriler, tablo_semasi(len(veriler[0][VEKTOR_SUTUNU])))
     else:
-        db.create_table(TABLO_ADI, data=veriler)
+        belge_tablosu.olustur(veriler, tablo_semasi())
 
     return len(veriler)
 
@@ -76,18 +124,56 @@ def main():
     print(f"{len(pdf_listesi)} PDF bulundu.\n")
     toplam = 0
 
-    for pdf in pdf_listesi:
-        yol = os.path.join(BELGELER_KLASORU, pdf)
-        ad = os.path.splitext(pdf)[0]
-        print(f"Isleniyor: {pdf}")
-        sayfalar = pdf_oku(yol)
-        parcalar = metni_parcala(sayfalar)
-        n = yukle(ad, parcalar)
+    # --vektor: parcalari Voyage ile gomup tabloya yazar (yerel vektor aramasi icin).
+    # Tablo bir kez vektorlu olduktan sonra yeni belgeler de hep gomulur.
+    vektorlu = "--vektor" in sys.argv[1:] or vektorlu_mu()
+    if eski_parcali_mi():
+        # Parcalar artik madde sinirlarinda ve belge bilgisi tasiyor; eski
+        # parcalarla karismasin diye tablo silinir ve tum belgeler yeniden parcalanir
+        print("Tablo eski parcalama veya sema ile olusturulmus, yeniden olusturuluyor.\n")
+        belge_tablosu.sil()
+    if vektorlu:
+        vektorleri_tamamla()
+
+    if belge_tablosu.var_mi():
+        mevcut = belge_tablosu.belgeler()
+        atlanan = [f for f in pdf_listesi if os.path.splitext(f)[0] in mevcut]
+        for pdf in atlanan:
+            print(f"  '{os.path.splitext(pdf)[0]}' zaten yuklu, atlaniyor.")
+        pdf_listesi = [f for f in pdf_listesi if f not in atlanan]
+
+    olcum = Olcum()
+    elle = elle_girilenler()
+    yollar = [os.path.join(BELGELER_KLASORU, pdf) for pdf in pdf_listesi]
+    for ad, sayfalar, hata in belgelere_grupla(sayfalari_akit(yollar, olcum=olcum)):
+        if hata:
+            print(f"  '{ad}' okunamadi, atlaniyor.\n")
+            continue
+        print(f"Isleniyor: {ad}")
+        # Baslik ust bilgi sanilip silinmeden once okunur
+        bilgi = belge_bilgisi(ad, sayfalar, elle.get(ad))
+        sayfalar, silinen = ust_alt_ayikla(sayfalar)
+        tekil = Tekillestirici()
+        parcalar = [p for p in parcala(sayfalar) if tekil.ekle(p["metin"])]
+        olcum.tekrar += tekil.atilan
+        olcum.parca += len(parcalar)
+        n = yukle(ad, parcalar, vektorlu, bilgi)
         toplam += n
-        print(f"  {len(sayfalar)} sayfa, {len(parcalar)} parca -> {n} kaydedildi.\n")
+        print(f"  {len(sayfalar)} sayfa, {silinen} ust/alt bilgi satiri, {len(parcalar)} parca -> {n} kaydedildi "
+              f"(kanun: {bilgi['kanun'] or '-'}, yayim: {bilgi['yayim'] or '-'}).\n")
 
-    tablo = db.open_table(TABLO_ADI)
-    genel_toplam = len(tablo.to_pandas())
+    print(olcum.ozet())
+
+    if not belge_tablosu.var_mi():
+        # Hic parca yazilmadi (ornegin tum PDF'ler okunamadi); kurulacak indeks yok
+        print("Veritabaninda parca yok, BM25 indeksi olusturulmadi.")
+        return
+    tablo = belge_tablosu.tablo()
+    genel_toplam = belge_tablosu.say()
+    indeks = tablodan_olustur(tablo)
+    print(f"BM25 indeksi guncellendi: {len(indeks.postings)} terim.")
+    if vektorlu:
+        vektor_indeksi_olustur(tablo)
     print(f"Bitti! Veritabaninda toplam {genel_toplam} parca var.")
 
 
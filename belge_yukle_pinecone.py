@@ -1,79 +1,415 @@
 import os
+import sys
+import time
 import voyageai
 from pinecone import Pinecone, ServerlessSpec
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dotenv import load_dotenv
+from indeks_manifest import parca_kimligi, manifest_oku, manifest_yaz, MANIFEST_YOLU
+from indeks_surumu import (kayit_oku, aktif, parmak_izi, indeks_adi, golge_bul, etiketler, etkinlestir, geri_al,
+                           manifest_yolu, ESKI_INDEKS)
+from pdf_cikarma import Olcum, sayfalari_akit, belgelere_grupla
+from parcalayici import parcala
+from tekillestirme import ust_alt_ayikla, Tekillestirici
+from belge_bilgisi import belge_bilgisi, elle_girilenler
+from trafik import yeniden_dene
+from turkce import token_tahmini
 
 load_dotenv()
 
 voyage_client = voyageai.Client(api_key=os.environ.get("VOYAGE_API_KEY"))
 pc = Pinecone(api_key=os.environ.get("PINECONE_API_KEY"))
 
-INDEX_NAME = "vergiai"
-DIMENSION = 1024
+# Varsayilan gomme modeli; --model ile baska model secilince yeni bir golge index doldurulur
+GOMME_MODELI = "voyage-multilingual-2"
+# voyage-multilingual-2 istek basina en fazla 1000 metin ve 120K token kabul eder;
+# batch'ler bu sinirlarin altinda kalacak sekilde token tahminiyle doldurulur
+GOMME_MAKS_METIN = 1000
+BATCH_TOKEN = int(os.environ.get("VERGIAI_BATCH_TOKEN", "50000"))
+# Batch siniri turkce.token_tahmini'nin bu kati kadar token sayilarak doldurulur;
+# tahmin ortalamadir, yogun metinde Voyage'in saydigi daha fazla olabilir
+TOKEN_PAYI = 1.2
+# Pinecone istek basina 2 MB sinirinin rahatca altinda
+UPSERT_BATCH = 100
+# Ayni anda gomulen/yuklenen batch sayisi
+ESZAMANLI = int(os.environ.get("VERGIAI_ESZAMANLI", "4"))
+# Manifest (kaldigi yerden devam noktasi) en fazla bu kadar saniyede bir yazilir
+KAYIT_ARALIGI = 5
+SILME_BATCH = 1000
+# Icerik kimliklerinden onceki yuklemenin konumsal kimlikleri (doc_0, doc_1...)
+KONUMSAL_ONEK = "doc_"
+BILGI_ALANLARI = ("kanun", "yayim", "etiketler")
+# Golge index'in vektor sayisinin manifestle esitlenmesi icin beklenecek en uzun sure (sn)
+GECIS_BEKLEME = 120
 
-# Index'i sil ve yeniden oluştur
-existing = [idx.name for idx in pc.list_indexes()]
-if INDEX_NAME in existing:
-    print(f"Eski index siliniyor...")
-    pc.delete_index(INDEX_NAME)
-    import time
-    time.sleep(10)
 
-print(f"Yeni index oluşturuluyor...")
-pc.create_index(name=INDEX_NAME, dimension=DIMENSION, metric="cosine", spec=ServerlessSpec(cloud="aws", region="us-east-1"))
-import time
-time.sleep(5)
-index = pc.Index(INDEX_NAME)
+def model_boyutu(model, kayit=None):
+    """Modelin gomme boyutu.
 
-def pdf_oku(pdf_yolu):
-    try:
-        import pymupdf
-        doc = pymupdf.open(pdf_yolu)
-        parcalar = []
-        for sayfa_no, sayfa in enumerate(doc):
-            metin = sayfa.get_text()
-            if metin.strip():
-                kelimeler = metin.split()
-                chunk = []
-                for kelime in kelimeler:
-                    chunk.append(kelime)
-                    if len(" ".join(chunk)) > 500:
-                        parcalar.append({"metin": " ".join(chunk), "sayfa": sayfa_no + 1, "belge": Path(pdf_yolu).stem})
-                        chunk = []
-                if chunk:
-                    parcalar.append({"metin": " ".join(chunk), "sayfa": sayfa_no + 1, "belge": Path(pdf_yolu).stem})
-        return parcalar
-    except Exception as e:
-        print(f"Hata: {pdf_yolu} - {e}")
-        return []
-
-belgeler_klasoru = Path("belgeler")
-pdf_dosyalari = sorted(belgeler_klasoru.glob("*.pdf"))
-print(f"{len(pdf_dosyalari)} PDF bulundu")
-
-tum_parcalar = []
-for pdf in pdf_dosyalari:
-    print(f"Okunuyor: {pdf.name}")
-    parcalar = pdf_oku(pdf)
-    tum_parcalar.extend(parcalar)
-    print(f"  → {len(parcalar)} parça")
-
-print(f"\nToplam {len(tum_parcalar)} parça yükleniyor...")
-
-BATCH = 64
-yuklenen = 0
-for i in range(0, len(tum_parcalar), BATCH):
-    batch = tum_parcalar[i:i+BATCH]
-    metinler = [p["metin"] for p in batch]
+    Kayitta bu modelle doldurulmus bir index varsa (once aktif index) boyut
+    oradan alinir; yalnizca yeni bir model icin tek kisa metin gomulur.
+    """
+    if kayit is not None:
+        _, bilgi = aktif(kayit)
+        for b in [bilgi, *kayit["indeksler"].values()]:
+            if b["model"] == model:
+                return b["boyut"]
+    sonuc = yeniden_dene(lambda: voyage_client.embed(["boyut"], model=model, input_type="document"))
+    return len(sonuc.embeddings[0])
+
+
+def hedef_sec(kayit, model, boyut, tam=False):
+    """Yuklenecek index'in adi ve golge olup olmadigi.
+
+    Aktif index ayni model ve boyutla doldurulmussa (ve --tam istenmediyse)
+    ona artimli yuklenir. Aksi halde modelin yarim kalmis golge index'i ya
+    da yeni bir golge index doldurulur; uygulama gecise kadar aktif
+    index'ten okumaya devam eder.
+    """
+    ad, bilgi = aktif(kayit)
+    if not tam and parmak_izi(bilgi["model"], bilgi["boyut"]) == parmak_izi(model, boyut):
+        return ad, False
+    golge = golge_bul(kayit, model, boyut)
+    if golge is None:
+        # Kayda index_hazirla onu golge etiketiyle olusturunca girer. Ad dakika
+        # damgalidir; ayni dakikada acilmis bir index varsa sonraki dakika kullanilir
+        zaman = time.time()
+        golge = indeks_adi(model, boyut, zaman)
+        while golge in kayit["indeksler"]:
+            zaman += 60
+            golge = indeks_adi(model, boyut, zaman)
+        kayit["indeksler"][golge] = {"model": model, "boyut": boyut, "durum": "golge", "etkin": 0}
+    return golge, True
+
+
+def index_hazirla(ad, bilgi):
+    """Index'i dondurur; yoksa kayit etiketleriyle olusturur (hazir olana kadar bekler). Var olan index silinmez."""
+    if ad not in [idx.name for idx in pc.list_indexes()]:
+        print(f"Yeni index oluşturuluyor: {ad} ({bilgi['boyut']} boyut)")
+        pc.create_index(name=ad, dimension=bilgi["boyut"], metric="cosine", spec=ServerlessSpec(cloud="aws", region="us-east-1"),
+                        tags=etiketler(bilgi["model"], bilgi["boyut"], bilgi["durum"], bilgi["etkin"]))
+    return pc.Index(ad)
+
+
+def gecis_yap(kayit, ad, index, beklenen, bekleme=GECIS_BEKLEME):
+    """Golge index'i aktif yapar; onceki aktif index geri alma icin kalir.
+
+    Pinecone istatistikleri upsert'ten biraz sonra guncellenir; vektor sayisi
+    bekleme suresinde manifestteki parca sayisina ulasmazsa gecis yapilmaz.
+    """
+    son = time.monotonic() + bekleme
+    while True:
+        sayi = index.describe_index_stats().get("total_vector_count", 0)
+        if sayi >= beklenen:
+            break
+        if time.monotonic() > son:
+            print(f"{ad} icinde {sayi}/{beklenen} vektor gorunuyor; gecis yapilmadi, tekrar calistirin.")
+            return False
+        time.sleep(2)
+    etkinlestir(pc, kayit, ad)
+    return True
+
+
+def yedekleri_sil(kayit):
+    """Geri alma icin tutulan son yedek disindaki eski index'leri ve manifestlerini siler."""
+    mevcut = [idx.name for idx in pc.list_indexes()]
+    for ad, bilgi in list(kayit["indeksler"].items()):
+        if bilgi["durum"] != "yedek" or ad == kayit.get("onceki"):
+            continue
+        print(f"Eski index siliniyor: {ad} ({bilgi['model']})")
+        if ad in mevcut:
+            pc.delete_index(ad)
+        if os.path.exists(manifest_yolu(ad)):
+            os.remove(manifest_yolu(ad))
+        del kayit["indeksler"][ad]
+
+
+def durum_yaz(kayit):
+    for ad, bilgi in kayit["indeksler"].items():
+        isaret = "*" if ad == kayit["aktif"] else " "
+        print(f"{isaret} {ad:45} {bilgi['durum']:6} {parmak_izi(bilgi['model'], bilgi['boyut'])}")
+
+
+def _bilgi(parca):
+    return {a: parca[a] for a in BILGI_ALANLARI}
+
+
+def batchle(parcalar, token_siniri=BATCH_TOKEN):
+    """(kimlik, parca) ciftlerini token ve metin sayisi sinirina gore gruplar."""
+    batch, token = [], 0
+    for kimlik, parca in parcalar:
+        t = token_tahmini(parca["metin"]) * TOKEN_PAYI
+        if batch and (token + t > token_siniri or len(batch) >= GOMME_MAKS_METIN):
+            yield batch
+            batch, token = [], 0
+        batch.append((kimlik, parca))
+        token += t
+    if batch:
+        yield batch
+
+
+def batch_yukle(index, batch, depo=None, model=GOMME_MODELI):
+    """Bir batch'i gomer ve upsert eder; gecici hatalar tekrar denenir.
+
+    depo verilirse gommeler yerel vektor deposuna da eklenir; index None ise
+    yalnizca depoya eklenir.
+    """
+    metinler = [p["metin"] for _, p in batch]
+    result = yeniden_dene(lambda: voyage_client.embed(metinler, model=model, input_type="document"))
+    if depo is not None:
+        depo.ekle(batch, result.embeddings)
+    if index is None:
+        return len(batch)
+    vectors = [{"id": kimlik, "values": emb, "metadata": {"metin": parca["metin"], "belge": parca["belge"], "sayfa": parca["sayfa"], "madde": parca["madde"], **_bilgi(parca)}} for (kimlik, parca), emb in zip(batch, result.embeddings)]
+    for i in range(0, len(vectors), UPSERT_BATCH):
+        parca = vectors[i:i+UPSERT_BATCH]
+        # Upsert ayni kimlikle tekrarlaninca ayni sonucu verir, tekrar denemek guvenli
+        yeniden_dene(lambda: index.upsert(vectors=parca))
+    return len(vectors)
+
+
+def gom_ve_yukle(index, yeni, manifest, eszamanli=ESZAMANLI, depo=None, model=GOMME_MODELI, yol=MANIFEST_YOLU):
+    """Yeni parcalari ESZAMANLI batch halinde paralel gomer ve upsert eder.
+
+    yeni bir uretec olabilir; ilk batch dolar dolmaz gonderilir, boylece
+    gomme islemi sonraki PDF'ler okunurken baslar. Ayni anda en fazla
+    eszamanli batch bekler. Biten batch'ler manifeste islenir ve manifest
+    duzenli araliklarla (ve cikista) yazilir; yarida kalan calisma tekrar
+    baslatilinca yalnizca yuklenmemis parcalari gonderir. Tekrar denemelere
+    ragmen basarisiz olan batch manifeste girmez, sonraki calismada yeniden
+    denenir. Yalnizca yerel depoya yazilirken index ve manifest None'dur.
+    Manifest index'e ait yol'a yazilir.
+    """
+    sayac = {"yuklenen": 0, "hatali": 0}
+    son_kayit = [time.monotonic()]
+    bekleyen = {}
+
+    def bitenleri_isle(bitenler):
+        for is_ in bitenler:
+            batch = bekleyen.pop(is_)
+            try:
+                sayac["yuklenen"] += is_.result()
+            except Exception as e:
+                sayac["hatali"] += len(batch)
+                print(f"Hata ({len(batch)} parca yuklenemedi): {e}")
+                continue
+            if manifest is not None:
+                for kimlik, parca in batch:
+                    manifest[kimlik] = {"belge": parca["belge"], "sayfa": parca["sayfa"], "bilgi": _bilgi(parca)}
+            print(f"  {sayac['yuklenen']} yüklendi")
+        if manifest is not None and time.monotonic() - son_kayit[0] > KAYIT_ARALIGI:
+            manifest_yaz(manifest, yol)
+            son_kayit[0] = time.monotonic()
+
+    havuz = ThreadPoolExecutor(max_workers=eszamanli, thread_name_prefix="yukleme")
     try:
-        result = voyage_client.embed(metinler, model="voyage-multilingual-2", input_type="document")
-        vectors = [{"id": f"doc_{i+j}", "values": emb, "metadata": {"metin": parca["metin"], "belge": parca["belge"], "sayfa": parca["sayfa"]}} for j, (parca, emb) in enumerate(zip(batch, result.embeddings))]
-        index.upsert(vectors=vectors)
-        yuklenen += len(vectors)
-        print(f"  {yuklenen}/{len(tum_parcalar)} yüklendi")
-    except Exception as e:
-        print(f"Hata batch {i}: {e}")
-
-print(f"\n✅ Tamamlandı! {yuklenen} vektör yüklendi.")
-print(f"Pinecone toplam: {index.describe_index_stats()['total_vector_count']}")
+        for batch in batchle(yeni):
+            while len(bekleyen) >= eszamanli:
+                bitenleri_isle(wait(bekleyen, return_when=FIRST_COMPLETED).done)
+            bekleyen[havuz.submit(batch_yukle, index, batch, depo, model)] = batch
+        while bekleyen:
+            bitenleri_isle(wait(bekleyen, return_when=FIRST_COMPLETED).done)
+    finally:
+        # Kesintide baslamamis batch'ler iptal edilir; bitenler kaydedilir
+        havuz.shutdown(wait=True, cancel_futures=True)
+        bitenleri_isle([is_ for is_ in list(bekleyen) if is_.done() and not is_.cancelled()])
+        if manifest is not None:
+            manifest_yaz(manifest, yol)
+    if sayac["hatali"]:
+        print(f"{sayac['hatali']} parca yuklenemedi; betik tekrar calistirilinca yeniden denenecek.")
+    return sayac["yuklenen"], sayac["hatali"]
+
+
+def bilgileri_guncelle(index, guncellenecek, manifest, eszamanli=ESZAMANLI, yol=MANIFEST_YOLU):
+    """Zaten yuklu parcalarin belge bilgisini (kanun, yayim, etiketler) yeniden gommeden gunceller.
+
+    guncellenecek: {kimlik: bilgi}. Bilgisi olmadan yuklenmis ya da belge
+    bilgisi degismis parcalar icindir. Bilgi belgeye aittir; her belge icin
+    parca parca degil belge suzgeciyle tek update istegi gider. Basarili
+    belgelerin parcalari manifeste islenir; guncellenen parca sayisi doner.
+    """
+    belgeler = {}
+    for kimlik, bilgi in guncellenecek.items():
+        belgeler.setdefault(manifest[kimlik]["belge"], (bilgi, []))[1].append(kimlik)
+
+    def guncelle(belge):
+        yeniden_dene(lambda: index.update(filter={"belge": {"$eq": belge}}, set_metadata=belgeler[belge][0]))
+        return belge
+
+    guncellenen = 0
+    with ThreadPoolExecutor(max_workers=eszamanli, thread_name_prefix="bilgi") as havuz:
+        for belge, is_ in [(b, havuz.submit(guncelle, b)) for b in belgeler]:
+            try:
+                is_.result()
+            except Exception as e:
+                print(f"Hata (belge bilgisi guncellenemedi: {belge}): {e}")
+                continue
+            bilgi, kimlikler = belgeler[belge]
+            for kimlik in kimlikler:
+                manifest[kimlik]["bilgi"] = bilgi
+            guncellenen += len(kimlikler)
+    manifest_yaz(manifest, yol)
+    return guncellenen
+
+
+def eskileri_sil(index, eski, manifest, yol=MANIFEST_YOLU):
+    """Artik hicbir belgede bulunmayan parcalari index'ten ve manifestten siler."""
+    eski = sorted(eski)
+    for i in range(0, len(eski), SILME_BATCH):
+        batch = eski[i:i+SILME_BATCH]
+        index.delete(ids=batch)
+        for kimlik in batch:
+            manifest.pop(kimlik, None)
+        manifest_yaz(manifest, yol)
+    return len(eski)
+
+
+def konumsallari_sil(index):
+    """Ilk surumun doc_N kimlikli vektorlerini siler; silinen sayisini dondurur.
+
+    Bu kimlikler manifestte yoktur; eskileri_sil onlari gormez ve ayni
+    pasajlar icerik kimlikleriyle yeniden yuklendiginde arama her pasaji
+    iki kez bulur. Kimlikler once toplanir, sayfalama sirasinda silinmez.
+    """
+    kimlikler = [k for sayfa in index.list(prefix=KONUMSAL_ONEK) for k in sayfa]
+    for i in range(0, len(kimlikler), SILME_BATCH):
+        index.delete(ids=kimlikler[i:i+SILME_BATCH])
+    return len(kimlikler)
+
+
+def _secenek(ad, varsayilan=None):
+    argumanlar = sys.argv[1:]
+    return argumanlar[argumanlar.index(ad) + 1] if ad in argumanlar[:-1] else varsayilan
+
+
+def main():
+    argumanlar = sys.argv[1:]
+    kayit = kayit_oku(pc)
+    # --durum: index'leri, modellerini ve hangisinin aktif oldugunu gosterir
+    if "--durum" in argumanlar:
+        durum_yaz(kayit)
+        return
+    # --geri-al: uygulamayi bir onceki aktif index'e dondurur
+    if "--geri-al" in argumanlar:
+        try:
+            geri_al(pc, kayit)
+        except ValueError as e:
+            print(e)
+            return
+        print(f"Aktif index: {kayit['aktif']} ({kayit['indeksler'][kayit['aktif']]['model']})")
+        return
+    # --eski-sil: son yedek disindaki eski index'leri siler
+    if "--eski-sil" in argumanlar:
+        yedekleri_sil(kayit)
+        return
+    # --tam: her seyi yeni bir golge index'e bastan gomer; aktif index silinmez
+    tam = "--tam" in argumanlar
+    # --model ad: belgeleri bu modelle gomer; aktif index baska modelle
+    # doldurulmussa yeni golge index'e yuklenir ve tamamlaninca ona gecilir
+    model = _secenek("--model", GOMME_MODELI)
+    # --gecis-yok: golge index'i doldurur ama aktif yapmaz
+    gecis = "--gecis-yok" not in argumanlar
+    # --yerel: gommeleri yerel mmap vektor deposuna da yazar (VERGIAI_ARAMA=yerel)
+    # --yalniz-yerel: Pinecone'a hic baglanmadan yalnizca yerel depoyu yazar
+    yalniz_yerel = "--yalniz-yerel" in argumanlar
+    depo = None
+    if yalniz_yerel or "--yerel" in argumanlar:
+        from vektor_deposu import DepoYazici
+        depo = DepoYazici(model, sifirdan=tam)
+    index, ad, golge, yol = None, None, False, None
+    if not yalniz_yerel:
+        boyut = model_boyutu(model, kayit)
+        ad, golge = hedef_sec(kayit, model, boyut, tam)
+        yol = manifest_yolu(ad)
+        print(f"Hedef index: {ad} ({parmak_izi(model, boyut)}{', golge' if golge else ''})")
+        index = index_hazirla(ad, kayit["indeksler"][ad])
+    manifest = None if yalniz_yerel else manifest_oku(yol)
+    if manifest and index.describe_index_stats().get("total_vector_count", 0) == 0:
+        print("Index bos ama manifest dolu, manifest sifirlaniyor.")
+        manifest = {}
+
+    belgeler_klasoru = Path("belgeler")
+    pdf_dosyalari = sorted(belgeler_klasoru.glob("*.pdf"))
+    print(f"{len(pdf_dosyalari)} PDF bulundu")
+
+    gorulen = set()
+    okunamayan = set()
+    guncellenecek = {}
+    elle = elle_girilenler()
+    olcum = Olcum()
+
+    def yeni_parcalar():
+        for belge, sayfalar, hata in belgelere_grupla(sayfalari_akit(pdf_dosyalari, olcum=olcum)):
+            if hata:
+                okunamayan.add(belge)
+                continue
+            # Baslik ust bilgi sanilip silinmeden once okunur
+            bilgi = belge_bilgisi(belge, sayfalar, elle.get(belge))
+            if depo is not None:
+                depo.bilgiler[belge] = bilgi
+            sayfalar, _ = ust_alt_ayikla(sayfalar)
+            # Tekillestirme belge icindedir; hangi kopyanin kalacagi yalnizca belgeye baglidir
+            tekil = Tekillestirici()
+            for parca in parcala(sayfalar):
+                if not tekil.ekle(parca["metin"]):
+                    olcum.tekrar += 1
+                    continue
+                parca["belge"] = belge
+                parca.update(bilgi)
+                olcum.parca += 1
+                kimlik = parca_kimligi(parca["belge"], parca["sayfa"], parca["metin"])
+                if kimlik in gorulen:
+                    continue
+                gorulen.add(kimlik)
+                # Depoda olmayan parca Pinecone'da olsa da yeniden gomulur (upsert zararsizdir)
+                if (manifest is not None and kimlik not in manifest) or (depo is not None and kimlik not in depo):
+                    yield kimlik, parca
+                elif manifest is not None and manifest[kimlik].get("bilgi") != bilgi:
+                    guncellenecek[kimlik] = bilgi
+
+    print("\nYeni/değişmiş parçalar yükleniyor...")
+    yuklenen, hatali = gom_ve_yukle(index, yeni_parcalar(), manifest, depo=depo, model=model, yol=yol)
+    print(olcum.ozet())
+
+    # Okunamayan belgelerin parcalari silinmez; gecici bir hata index'i bosaltmasin
+    # Yuklenemeyen parca varsa eski surumleri de silinmez; yerleri bos kalmasin
+    def eskiler(belgeler):
+        return set() if hatali else {k for k, b in belgeler.items() if k not in gorulen and b not in okunamayan}
+
+    if guncellenecek:
+        print(f"{len(guncellenecek)} parcanin belge bilgisi guncelleniyor "
+              f"({len({manifest[k]['belge'] for k in guncellenecek})} belge)...")
+        print(f"  {bilgileri_guncelle(index, guncellenecek, manifest, yol=yol)} parca guncellendi")
+
+    silinen = 0
+    if index is not None:
+        eski = eskiler({k: v["belge"] for k, v in manifest.items()})
+        silinen = eskileri_sil(index, eski, manifest, yol) if eski else 0
+        # Yalnizca ilk (delete-and-rebuild) surumun doldurdugu index'te doc_N kimlikleri olabilir.
+        # Tum belgeler icerik kimlikleriyle yuklenmeden silinmez; yerleri bos kalmasin
+        if ad == ESKI_INDEKS and not golge:
+            if hatali or okunamayan:
+                print("Eksik yukleme; konumsal (doc_N) vektorler bir sonraki calismada silinecek.")
+            else:
+                konumsal = konumsallari_sil(index)
+                if konumsal:
+                    print(f"Eski konumsal kimlikli {konumsal} vektor silindi.")
+                silinen += konumsal
+    if depo is not None:
+        eski = eskiler(depo.eski_belgeler)
+        adet = depo.kaydet(silinecek=eski)
+        print(f"Yerel vektor deposu yazildi: {adet} parca, {len(eski)} eski parca cikarildi ({depo.klasor}).")
+
+    print(f"\n✅ Tamamlandı! {yuklenen} vektör yüklendi, {silinen} eski vektör silindi.")
+    if index is not None:
+        print(f"Pinecone toplam ({ad}): {index.describe_index_stats()['total_vector_count']}")
+    if golge and (hatali or okunamayan):
+        print(f"Golge index {ad} eksik; aktif index degismedi. Tekrar calistirinca kaldigi yerden devam eder.")
+    elif golge and gecis and gecis_yap(kayit, ad, index, len(manifest)):
+        print(f"Aktif index: {ad} ({model}). Onceki index {kayit['onceki']} geri alma icin duruyor "
+              f"(python belge_yukle_pinecone.py --geri-al).")
+
+
+if __name__ == "__main__":
+    main()
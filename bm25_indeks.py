@@ -0,0 +1,133 @@
+import os
+import math
+import heapq
+import pickle
+import threading
+from array import array
+from collections import Counter
+from turkce import tokenlar
+from belge_tablosu import sec
+
+INDEKS_YOLU = "./veritabani/bm25_indeks.pkl"
+SURUM = 1
+K1 = 1.5
+B = 0.75
+
+
+class BM25Indeks:
+    """Parca metinleri uzerinde ters indeks ve BM25 puanlamasi.
+
+    postings her terim icin (parca numaralari, terim frekanslari) dizilerini,
+    uzunluklar her parcanin token sayisini tutar. Belge frekansi, terimin
+    posting listesinin uzunlugudur. bilgiler belge basina kanun, yayim ve
+    etiketleri (belge_bilgisi) tutar; suzgecli aramada yalnizca uyan
+    belgelerin parcalari puanlanir.
+    """
+
+    def __init__(self, parcalar, postings, uzunluklar, bilgiler=None):
+        self.parcalar = parcalar
+        self.postings = postings
+        self.uzunluklar = uzunluklar
+        self.bilgiler = bilgiler or {}
+        self.belgeler = sorted({p["belge"] for p in parcalar})
+        sira = {b: i for i, b in enumerate(self.belgeler)}
+        self.belge_no = array("I", (sira[p["belge"]] for p in parcalar))
+        self.ort_uzunluk = (sum(uzunluklar) / len(uzunluklar)) if uzunluklar else 0.0
+        n = len(parcalar)
+        self.idf = {t: math.log(1 + (n - len(p[0]) + 0.5) / (len(p[0]) + 0.5)) for t, p in postings.items()}
+
+    @classmethod
+    def olustur(cls, kayitlar):
+        """kayitlar: {"belge", "sayfa", "metin"} sozluklerinden olusan yinelenebilir.
+
+        Kayitlarda kanun, yayim ve etiketler varsa belge bilgisi olarak alinir.
+        """
+        parcalar = []
+        postings = {}
+        uzunluklar = array("I")
+        bilgiler = {}
+        for i, k in enumerate(kayitlar):
+            parcalar.append({"belge": k["belge"], "sayfa": int(k["sayfa"]), "metin": k["metin"]})
+            if "kanun" in k and k["belge"] not in bilgiler:
+                bilgiler[k["belge"]] = {"kanun": k["kanun"], "yayim": int(k["yayim"]),
+                                        "etiketler": list(k["etiketler"])}
+            tokens = tokenlar(k["metin"])
+            uzunluklar.append(len(tokens))
+            for terim, tf in Counter(tokens).items():
+                p = postings.get(terim)
+                if p is None:
+                    p = postings[terim] = (array("I"), array("I"))
+                p[0].append(i)
+                p[1].append(tf)
+        return cls(parcalar, postings, uzunluklar, bilgiler)
+
+    def ara(self, soru, n=5, suzgec=None):
+        """En yuksek puanli n parcayi [(puan, parca), ...] olarak dondurur."""
+        if not self.parcalar:
+            return []
+        izinli = None
+        if suzgec:
+            izinli = bytes(suzgec.uyar(b, self.bilgiler.get(b)) for b in self.belgeler)
+            if not any(izinli):
+                return []
+        puanlar = {}
+        uz = self.uzunluklar
+        bn = self.belge_no
+        ort = self.ort_uzunluk or 1.0
+        for terim in set(tokenlar(soru)):
+            p = self.postings.get(terim)
+            if p is None:
+                continue
+            idf = self.idf[terim]
+            for i, tf in zip(p[0], p[1]):
+                if izinli is not None and not izinli[bn[i]]:
+                    continue
+                puanlar[i] = puanlar.get(i, 0.0) + idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * uz[i] / ort))
+        en_iyi = heapq.nlargest(n, puanlar.items(), key=lambda x: x[1])
+        return [(puan, self.parcalar[i]) for i, puan in en_iyi]
+
+    def kaydet(self, yol=INDEKS_YOLU):
+        os.makedirs(os.path.dirname(yol) or ".", exist_ok=True)
+        gecici = yol + ".tmp"
+        with open(gecici, "wb") as f:
+            pickle.dump({"surum": SURUM, "parcalar": self.parcalar, "postings": self.postings,
+                         "uzunluklar": self.uzunluklar, "bilgiler": self.bilgiler}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(gecici, yol)
+
+    @classmethod
+    def yukle(cls, yol=INDEKS_YOLU):
+        with open(yol, "rb") as f:
+            veri = pickle.load(f)
+        if veri.get("surum") != SURUM:
+            raise ValueError(f"BM25 indeks surumu uyumsuz: {veri.get('surum')}")
+        return cls(veri["parcalar"], veri["postings"], veri["uzunluklar"], veri.get("bilgiler"))
+
+
+def tablodan_olustur(tablo, yol=INDEKS_YOLU):
+    """LanceDB tablosundaki tum parcalardan indeksi kurar ve kaydeder."""
+    sutunlar = ["belge", "sayfa", "metin"] + [s for s in ("kanun", "yayim", "etiketler") if s in tablo.schema.names]
+    # Yalnizca gereken sutunlar okunur; vektor sutunu bellege alinmaz
+    indeks = BM25Indeks.olustur(sec(tablo, sutunlar))
+    indeks.kaydet(yol)
+    return indeks
+
+
+# {yol: (mtime, indeks)}
+_onbellek = {}
+_kilit = threading.Lock()
+
+
+def indeks_al(yol=INDEKS_YOLU):
+    """Indeksi surec basina bir kez yukler; dosya yenilenirse tekrar yukler.
+
+    Dosya yoksa None doner.
+    """
+    try:
+        mtime = os.path.getmtime(yol)
+    except OSError:
+        return None
+    with _kilit:
+        kayit = _onbellek.get(yol)
+        if kayit is None or kayit[0] != mtime:
+            kayit = _onbellek[yol] = (mtime, BM25Indeks.yukle(yol))
+        return kayit[1]
@@ -0,0 +1,111 @@
+import os
+import math
+import time
+import threading
+from collections import OrderedDict
+from gomme_onbellek import normallestir
+from metrikler import say
+
+BENZERLIK_ESIGI = float(os.environ.get("VERGIAI_CEVAP_ESIGI", "0.95"))
+YASAM_SURESI = float(os.environ.get("VERGIAI_CEVAP_TTL", str(6 * 3600)))
+MAKS_KAYIT = 500
+TEKRAR_ADIMI = 40
+
+
+def _birim(vektor):
+    n = math.sqrt(sum(x * x for x in vektor)) or 1.0
+    return [x / n for x in vektor]
+
+
+class CevapOnbellegi:
+    """Ilk tur sorulari icin anlamsal cevap onbellegi.
+
+    Bir kayit, getirilen parca kimliklerinin kumesi ayni oldugunda ve soru
+    gommeleri arasindaki kosinus benzerligi esigi gectiginde kullanilir.
+    Belge yeniden yuklenip parca kimlikleri degisince eski kayitlar kendiliginden
+    isabet vermez. Kayitlar YASAM_SURESI sonunda ve MAKS_KAYIT asilinca
+    (en eski kullanilan once) silinir.
+    """
+
+    def __init__(self, esik=BENZERLIK_ESIGI, yasam=YASAM_SURESI, boyut=MAKS_KAYIT):
+        self.esik = esik
+        self.yasam = yasam
+        self.boyut = boyut
+        # {kimlik kumesi: OrderedDict(anahtar -> kayit)}; benzerlik yalnizca
+        # ayni parcalari getiren sorular arasinda hesaplanir
+        self.kovalar = {}
+        self.sira = OrderedDict()
+        self.kilit = threading.Lock()
+        self.sayac = 0
+        self.isabet = 0
+        self.iska = 0
+
+    def _sil(self, anahtar):
+        kova_anahtari = self.sira.pop(anahtar)
+        kova = self.kovalar[kova_anahtari]
+        del kova[anahtar]
+        if not kova:
+            del self.kovalar[kova_anahtari]
+
+    def bul(self, soru, vektor, kimlikler):
+        """Eslesen kaydin (cevap, kaynaklar) ikilisini, yoksa None dondurur."""
+        kova_anahtari = frozenset(kimlikler)
+        simdi = time.monotonic()
+        birim = _birim(vektor) if vektor is not None else None
+        metin = normallestir(soru)
+        with self.kilit:
+            for anahtar, kayit in list(self.kovalar.get(kova_anahtari, {}).items()):
+                if simdi - kayit["zaman"] > self.yasam:
+                    self._sil(anahtar)
+                    continue
+                if birim is not None and kayit["vektor"] is not None:
+                    eslesti = sum(a * b for a, b in zip(birim, kayit["vektor"])) >= self.esik
+                else:
+                    eslesti = metin == kayit["metin"]
+                if eslesti:
+                    self.sira.move_to_end(anahtar)
+                    self.isabet += 1
+                    say("onbellek", onbellek="cevap", sonuc="isabet")
+                    return kayit["cevap"], kayit["kaynaklar"]
+            self.iska += 1
+        say("onbellek", onbellek="cevap", sonuc="iska")
+        return None
+
+    def koy(self, soru, vektor, kimlikler, cevap, kaynaklar):
+        kova_anahtari = frozenset(kimlikler)
+        with self.kilit:
+            self.sayac += 1
+            anahtar = self.sayac
+            self.kovalar.setdefault(kova_anahtari, {})[anahtar] = {
+                "vektor": _birim(vektor) if vektor is not None else None,
+                "metin": normallestir(soru),
+                "cevap": cevap,
+                "kaynaklar": kaynaklar,
+                "zaman": time.monotonic(),
+            }
+            self.sira[anahtar] = kova_anahtari
+            while len(self.sira) > self.boyut:
+                self._sil(next(iter(self.sira)))
+
+    def istatistik(self):
+        with self.kilit:
+            return {"isabet": self.isabet, "iska": self.iska, "kayit": len(self.sira)}
+
+
+def tekrar_oynat(cevap, kaynaklar, adim=TEKRAR_ADIMI):
+    """Onbellekteki cevabi cevap_al ile ayni bicimde (biriken metin) uretir."""
+    for i in range(adim, len(cevap) + adim, adim):
+        yield cevap[:i], kaynaklar
+
+
+_onbellek = None
+_kilit = threading.Lock()
+
+
+def cevap_onbellegi():
+    """Surec genelinde (tum Streamlit oturumlarinca) paylasilan onbellek."""
+    global _onbellek
+    with _kilit:
+        if _onbellek is None:
+            _onbellek = CevapOnbellegi()
+        return _onbellek
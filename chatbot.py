@@ -1,5 +1,6 @@
 from anthropic import Anthropic
 from dotenv import load_dotenv
+from gecmis_yonetici import SohbetGecmisi
 
 # .env dosyasındaki API anahtarını yükle
 load_dotenv()
@@ -7,8 +8,8 @@ load_dotenv()
 # Claude istemcisini oluştur
 client = Anthropic()
 
-# Sohbet geçmişini tutan liste
-sohbet_gecmisi = []
+# Sohbet geçmişi; token bütçesi aşılınca eski turlar özetlenir
+sohbet_gecmisi = SohbetGecmisi(client)
 
 # Sistem mesajı — botun kişiliğini ve görevini tanımlar
 SISTEM_MESAJI = """Sen vergiai.com'un yapay zeka asistanısın. 
@@ -22,28 +23,19 @@ bir vergi uzmanına danışılması önerilir."""
 def soru_sor(soru):
     """Kullanıcının sorusunu Claude'a gönderir ve cevap alır."""
     
-    # Soruyu geçmişe ekle
-    sohbet_gecmisi.append({
-        "role": "user",
-        "content": soru
-    })
-    
     # Claude'a gönder
     cevap = client.messages.create(
         model="claude-opus-4-5-20251101",
         max_tokens=2048,
-        system=SISTEM_MESAJI,
-        messages=sohbet_gecmisi
+        system=sohbet_gecmisi.sistem(SISTEM_MESAJI),
+        messages=sohbet_gecmisi.mesajlar(soru)
     )
     
     # Cevabı al
     asistan_cevabi = cevap.content[0].text
     
-    # Cevabı da geçmişe ekle
-    sohbet_gecmisi.append({
-        "role": "assistant", 
-        "content": asistan_cevabi
-    })
+    # Soruyu ve cevabı geçmişe ekle
+    sohbet_gecmisi.ekle(soru, asistan_cevabi)
     
     return asistan_cevabi
 
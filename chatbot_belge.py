@@ -1,91 +1,55 @@
 import warnings
 warnings.filterwarnings("ignore")
-import lancedb
 from anthropic import Anthropic
 from dotenv import load_dotenv
+from arama import arayici_olustur, ayir
+from baglam_derleme import derle, baglam_metni, ADAY_CARPANI
+from gecmis_yonetici import SohbetGecmisi
+from belge_bilgisi import Suzgec
+import belge_tablosu
 load_dotenv()
 
 client = Anthropic()
-db = lancedb.connect("./veritabani")
-gecmis = []
-
-
-def tablo_var_mi():
-    """vergi_belgeleri tablosunun var olup olmadigini kontrol eder."""
-    try:
-        sonuc = db.list_tables()
-        # Sonuc bir obje olabilir, string'e cevirip icinde ariyoruz
-        return "vergi_belgeleri" in str(sonuc)
-    except Exception:
-        return False
+gecmis = SohbetGecmisi(client)
+# Varsayilan yerel BM25; VERGIAI_ARAMA=lance veya pinecone ile vektor aramasi
+arayici = arayici_olustur(varsayilan="kelime")
 
 
 def belge_say():
+    """Yuklu parca sayisi; tablo okunmadan tablo bilgisinden."""
     try:
-        if not tablo_var_mi():
-            return 0
-        tablo = db.open_table("vergi_belgeleri")
-        df = tablo.to_pandas()
-        return len(df)
+        return belge_tablosu.say()
     except Exception as e:
         print(f"Hata: {e}")
         return 0
 
 
-def ara(soru, n=5):
+def ara(soru, n=5, suzgec=None):
     try:
-        if not tablo_var_mi():
-            return [], []
-        tablo = db.open_table("vergi_belgeleri")
-        df = tablo.to_pandas()
-        if df.empty:
-            return [], []
-
-        kelimeler = [k.lower() for k in soru.split() if len(k) > 2]
-
-        def puan(metin):
-            m = metin.lower()
-            return sum(1 for k in kelimeler if k in m)
-
-        df["puan"] = df["metin"].apply(puan)
-        df = df[df["puan"] > 0].sort_values("puan", ascending=False).head(n)
-
-        if df.empty:
-            return [], []
-
-        parcalar = df["metin"].tolist()
-        kaynaklar = [{"belge": r["belge"], "sayfa": r["sayfa"]} for _, r in df.iterrows()]
-        return parcalar, kaynaklar
+        return derle(soru, arayici.ara(soru, n * ADAY_CARPANI, suzgec), n)
     except Exception as e:
         print(f"Arama hatasi: {e}")
-        return [], []
+        return []
 
 
-def sor(soru):
-    parcalar, kaynaklar = ara(soru)
+SISTEM = """Sen vergiai.com'un Turk vergi mevzuati uzman asistanisin. Sorulari Turkce yanitla.
+Son mesajda BELGELER verilmisse soruyu o belge bolumlerini kullanarak yanitla;
+hangi belgeden ve kacinci sayfadan aldigini belirt."""
 
-    if parcalar:
-        icerik = ""
-        for p, k in zip(parcalar, kaynaklar):
-            icerik += f"\n[{k['belge']} - Sayfa {k['sayfa']}]\n{p}\n"
-        sistem = f"""Sen vergiai.com'un Turk vergi mevzuati uzman asistanisin.
-Asagidaki belge bolumlerini kullanarak soruyu Turkce yanitla.
-Hangi belgeden ve kacinci sayfadan aldigini belirt.
 
-BELGELER:
-{icerik}"""
-    else:
-        sistem = "Sen vergiai.com'un Turk vergi mevzuati uzman asistanisin. Sorulari Turkce yanitla."
+def sor(soru, suzgec=None):
+    sonuclar = ara(soru, suzgec=suzgec)
+    _, kaynaklar = ayir(sonuclar)
+    baglam = baglam_metni(sonuclar)
 
-    gecmis.append({"role": "user", "content": soru})
     yanit = client.messages.create(
         model="claude-opus-4-5-20251101",
         max_tokens=2048,
-        system=sistem,
-        messages=gecmis
+        system=gecmis.sistem(SISTEM),
+        messages=gecmis.mesajlar(soru, baglam)
     )
     cevap = yanit.content[0].text
-    gecmis.append({"role": "assistant", "content": cevap})
+    gecmis.ekle(soru, cevap)
     return cevap, kaynaklar
 
 
@@ -99,10 +63,11 @@ def main():
         print(f"  {n} belge parcasi yuklu ve hazir.")
     else:
         print("  Belge bulunamadi! Once belge_yukle.py calistirin.")
-    print("  Cikmak icin: q")
+    print("  Cikmak icin: q  |  Kanunla sinirlamak icin: /kanun KDV (kaldirmak icin: /kanun)")
     print("=" * 55)
     print()
 
+    suzgec = None
     while True:
         try:
             soru = input("Siz: ").strip()
@@ -116,7 +81,12 @@ def main():
             print("Gorusuruz!")
             break
 
-        cevap, kaynaklar = sor(soru)
+        if soru.lower().startswith("/kanun"):
+            suzgec = Suzgec(kanun=soru[len("/kanun"):].replace(",", " ").split()) or None
+            print(f"Arama: {', '.join(suzgec.kanun) if suzgec else 'tum belgeler'}\n")
+            continue
+
+        cevap, kaynaklar = sor(soru, suzgec)
         print(f"\nVergiai:\n{cevap}")
 
         if kaynaklar:
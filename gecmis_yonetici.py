@@ -0,0 +1,98 @@
+import os
+from turkce import token_tahmini, KARAKTER_BASINA_TOKEN
+from trafik import kova
+
+# Son turlar bu kadar (tahmini) token'a sigdigi surece aynen gonderilir
+GECMIS_BUTCE = int(os.environ.get("VERGIAI_GECMIS_BUTCE", "6000"))
+# Sikistirma gecmisi butcenin bu oranina indirir; boylece ozet her turda
+# yeniden uretilmez
+HEDEF_ORANI = 0.5
+OZET_MODELI = "claude-haiku-4-5-20251001"
+OZET_TOKEN = 512
+ONBELLEK = {"type": "ephemeral"}
+
+OZET_ISTEMI = """Asagida bir vergi danismanligi sohbetinin onceki ozeti ve yeni turlari var.
+Bunlari tek bir kisa Turkce ozette birlestir. Kullanicinin durumunu, sordugu
+konulari, verilen cevaplarin ozunu ve anilan kanun maddelerini koru."""
+
+
+def _blok(metin, onbellekli=False):
+    blok = {"type": "text", "text": metin}
+    if onbellekli:
+        blok["cache_control"] = ONBELLEK
+    return blok
+
+
+class SohbetGecmisi:
+    """Token butcesiyle sinirli sohbet gecmisi.
+
+    Son turlar butceye sigdigi surece aynen tutulur; butce asilinca en eski
+    turlar bir ozete katlanir. Istek su sirayla kurulur: kisilik (system),
+    ozet (system), gecmis turlar, belgeler ve soru. Degismeyen on ek
+    (kisilik, ozet ve gecmis) cache_control ile isaretlenir; boylece her
+    turda yalnizca yeni soru ve o soruya ait belgeler islenir ve ilk
+    token suresi sohbet uzadikca artmaz.
+    """
+
+    def __init__(self, client=None, butce=GECMIS_BUTCE, ozet_modeli=OZET_MODELI):
+        self.client = client
+        self.butce = butce
+        self.ozet_modeli = ozet_modeli
+        self.turlar = []
+        self.ozet = ""
+
+    def __len__(self):
+        return len(self.turlar)
+
+    def token(self):
+        return sum(token_tahmini(s) + token_tahmini(c) for s, c in self.turlar)
+
+    def sistem(self, kisilik):
+        bloklar = [_blok(kisilik, onbellekli=True)]
+        if self.ozet:
+            bloklar.append(_blok(f"ONCEKI KONUSMANIN OZETI:\n{self.ozet}", onbellekli=True))
+        return bloklar
+
+    def mesajlar(self, soru, baglam=None):
+        """Messages API'ye gidecek liste; son gecmis mesaji onbellek siniridir."""
+        msgs = []
+        for s, c in self.turlar:
+            msgs.append({"role": "user", "content": s})
+            msgs.append({"role": "assistant", "content": c})
+        if msgs:
+            msgs[-1] = {"role": "assistant", "content": [_blok(msgs[-1]["content"], onbellekli=True)]}
+        icerik = [_blok(baglam)] if baglam else []
+        icerik.append(_blok(soru))
+        msgs.append({"role": "user", "content": icerik})
+        return msgs
+
+    def ekle(self, soru, cevap):
+        self.turlar.append((soru, cevap))
+        if self.token() > self.butce:
+            self.sikistir()
+
+    def sikistir(self):
+        """En eski turlari, gecmis butcenin HEDEF_ORANI'na inene kadar ozete katlar."""
+        katlanan = []
+        while len(self.turlar) > 1 and self.token() > self.butce * HEDEF_ORANI:
+            katlanan.append(self.turlar.pop(0))
+        if katlanan:
+            self.ozet = self._ozetle(katlanan)
+
+    def _ozetle(self, turlar):
+        metin = "\n\n".join(f"Kullanici: {s}\nAsistan: {c}" for s, c in turlar)
+        if self.ozet:
+            metin = f"ONCEKI OZET:\n{self.ozet}\n\nYENI TURLAR:\n{metin}"
+        if self.client is not None:
+            try:
+                kova("anthropic").al()
+                yanit = self.client.messages.create(
+                    model=self.ozet_modeli, max_tokens=OZET_TOKEN, system=OZET_ISTEMI,
+                    messages=[{"role": "user", "content": metin}])
+                return yanit.content[0].text
+            except Exception as e:
+                print(f"Gecmis ozetlenemedi: {e}")
+        # Ozet alinamazsa sorulari ve cevaplarin basini kisaltarak sakla
+        satirlar = [self.ozet] if self.ozet else []
+        satirlar += [f"- {s[:200]} -> {c[:300]}" for s, c in turlar]
+        return "\n".join(satirlar)[-int(OZET_TOKEN * KARAKTER_BASINA_TOKEN):]
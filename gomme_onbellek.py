@@ -0,0 +1,153 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from turkce import kelimeler
+from metrikler import aralik, say
+from trafik import TekUcus, kova, yeniden_dene
+
+ONBELLEK_YOLU = "./onbellek/gommeler.sqlite3"
+LRU_BOYUTU = 2048
+# Soru gommesi kullanici bekletir; gecici hatalarda kisa sure tekrar denenir
+SORGU_DENEME = 3
+SORGU_TAVAN = 4.0
+
+
+def normallestir(metin):
+    """"KDV oranı nedir?" ve "kdv orani nedir" ayni anahtara duser."""
+    return " ".join(kelimeler(metin))
+
+
+class GommeOnbellegi:
+    """Sorgu gommeleri icin bellekte LRU, arkasinda diskte SQLite deposu.
+
+    Anahtar model adi ve normallestirilmis metindir. Disk deposu ayni
+    makinedeki tum surecler ve Streamlit oturumlari arasinda paylasilir.
+    """
+
+    def __init__(self, yol=ONBELLEK_YOLU, boyut=LRU_BOYUTU):
+        self.boyut = boyut
+        self.lru = OrderedDict()
+        self.kilit = threading.Lock()
+        self.bellek_isabet = 0
+        self.disk_isabet = 0
+        self.iska = 0
+        self.iska_suresi = 0.0
+        self.ucuslar = TekUcus("gomme")
+        self.db = None
+        if yol:
+            try:
+                os.makedirs(os.path.dirname(yol) or ".", exist_ok=True)
+                self.db = sqlite3.connect(yol, check_same_thread=False, timeout=5)
+                self.db.execute("PRAGMA journal_mode=WAL")
+                self.db.execute("CREATE TABLE IF NOT EXISTS gomme (anahtar TEXT PRIMARY KEY, vektor BLOB)")
+                self.db.commit()
+            except (OSError, sqlite3.Error) as e:
+                # Disk yazilamiyorsa yalnizca bellekte calis
+                print(f"Gomme onbellegi diski acilamadi: {e}")
+                self.db = None
+
+    @staticmethod
+    def anahtar(model, metin):
+        return hashlib.sha1(f"{model}\x1f{normallestir(metin)}".encode("utf-8")).hexdigest()
+
+    def al(self, model, metin):
+        anahtar = self.anahtar(model, metin)
+        with self.kilit:
+            vektor = self.lru.get(anahtar)
+            if vektor is not None:
+                self.lru.move_to_end(anahtar)
+                self.bellek_isabet += 1
+                say("onbellek", onbellek="gomme", sonuc="bellek")
+                return vektor
+            if self.db is None:
+                return None
+            try:
+                satir = self.db.execute("SELECT vektor FROM gomme WHERE anahtar = ?", (anahtar,)).fetchone()
+            except sqlite3.Error:
+                return None
+            if satir is None:
+                return None
+            vektor = array("f", satir[0]).tolist()
+            self._lru_koy(anahtar, vektor)
+            self.disk_isabet += 1
+            say("onbellek", onbellek="gomme", sonuc="disk")
+            return vektor
+
+    def koy(self, model, metin, vektor):
+        anahtar = self.anahtar(model, metin)
+        with self.kilit:
+            self._lru_koy(anahtar, vektor)
+            if self.db is not None:
+                try:
+                    self.db.execute("INSERT OR REPLACE INTO gomme VALUES (?, ?)", (anahtar, array("f", vektor).tobytes()))
+                    self.db.commit()
+                except sqlite3.Error:
+                    pass
+
+    def _lru_koy(self, anahtar, vektor):
+        self.lru[anahtar] = vektor
+        self.lru.move_to_end(anahtar)
+        while len(self.lru) > self.boyut:
+            self.lru.popitem(last=False)
+
+    def gom(self, voyage, metin, model, input_type="query"):
+        """Onbellekte varsa dondurur, yoksa Voyage'a sorup saklar.
+
+        Ayni metin icin eszamanli iskalar tek Voyage cagrisina iner; cagri
+        surecin paylasilan Voyage kotasini bekler.
+        """
+        vektor = self.al(model, metin)
+        if vektor is not None:
+            return vektor
+        return self.ucuslar.yap(self.anahtar(model, metin), lambda: self._gom(voyage, metin, model, input_type))
+
+    def _gom(self, voyage, metin, model, input_type):
+        # Onceki ucus, bu cagri onbellege baktiktan sonra bitmis olabilir
+        vektor = self.al(model, metin)
+        if vektor is not None:
+            return vektor
+        say("onbellek", onbellek="gomme", sonuc="iska")
+
+        def istek():
+            kova("voyage").al()
+            with aralik("voyage_gomme"):
+                return voyage.embed([metin], model=model, input_type=input_type).embeddings[0]
+
+        bas = time.perf_counter()
+        vektor = yeniden_dene(istek, deneme=SORGU_DENEME, taban=0.5, tavan=SORGU_TAVAN)
+        with self.kilit:
+            self.iska += 1
+            self.iska_suresi += time.perf_counter() - bas
+        self.koy(model, metin, vektor)
+        return vektor
+
+    def istatistik(self):
+        with self.kilit:
+            isabet = self.bellek_isabet + self.disk_isabet
+            ort = self.iska_suresi / self.iska if self.iska else 0.0
+            return {
+                "bellek_isabet": self.bellek_isabet,
+                "disk_isabet": self.disk_isabet,
+                "iska": self.iska,
+                "isabet_orani": isabet / (isabet + self.iska) if isabet + self.iska else 0.0,
+                "ort_voyage_sn": ort,
+                # Her isabet ortalama bir Voyage gidis-donusunu kazandirir
+                "kazanilan_sn": isabet * ort,
+            }
+
+
+_onbellek = None
+_kilit = threading.Lock()
+
+
+def onbellek():
+    """Surec genelinde paylasilan onbellek."""
+    global _onbellek
+    with _kilit:
+        if _onbellek is None:
+            _onbellek = GommeOnbellegi()
+        return _onbellek
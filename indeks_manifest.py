@@ -0,0 +1,35 @@
+import os
+import json
+import hashlib
+
+MANIFEST_YOLU = "./pinecone_manifest.json"
+
+
+def parca_kimligi(belge, sayfa, metin):
+    """Parcanin belge, sayfa ve metninden turetilen sabit kimligi.
+
+    Ayni icerik her calistirmada ayni kimligi alir; metni degisen parca
+    yeni bir kimlik alir, boylece sadece degisen parcalar yeniden gomulur.
+    """
+    anahtar = f"{belge}\x1f{sayfa}\x1f{metin}".encode("utf-8")
+    return hashlib.sha1(anahtar).hexdigest()
+
+
+def manifest_oku(yol=MANIFEST_YOLU):
+    """Indekste zaten bulunan parcalari {kimlik: {belge, sayfa}} olarak dondurur."""
+    if not os.path.exists(yol):
+        return {}
+    try:
+        with open(yol, encoding="utf-8") as f:
+            return json.load(f).get("parcalar", {})
+    except (OSError, ValueError) as e:
+        print(f"Manifest okunamadi ({e}), bos kabul ediliyor.")
+        return {}
+
+
+def manifest_yaz(parcalar, yol=MANIFEST_YOLU):
+    """Manifesti atomik olarak yazar; yarida kesilen yazim eski dosyayi bozmaz."""
+    gecici = yol + ".tmp"
+    with open(gecici, "w", encoding="utf-8") as f:
+        json.dump({"surum": 1, "parcalar": parcalar}, f, ensure_ascii=False)
+    os.replace(gecici, yol)
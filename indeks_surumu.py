@@ -0,0 +1,158 @@
+import os
+import re
+import time
+import threading
+from indeks_manifest import MANIFEST_YOLU
+
+# Hangi Pinecone index'inin hangi modelle gomuldugu ve hangisinin aktif oldugu
+# Pinecone'da, her index'in etiketlerinde (model, boyut, durum, etkin) tutulur.
+# Yukleme betigi ve uygulama ayni kaydi list_indexes ile okur; gecis tek bir
+# configure_index cagrisidir, her yerdeki uygulama TAZELIK icinde yeni index'e gecer
+TAZELIK = float(os.environ.get("VERGIAI_INDEKS_TAZELIK", "30"))
+# Etiketsiz (kayittan onceki) tek index ve onu dolduran model
+ESKI_INDEKS = "vergiai"
+ESKI_MODEL = "voyage-multilingual-2"
+ESKI_BOYUT = 1024
+# Pinecone index adi sinirlari
+AD_UZUNLUGU = 45
+
+
+class ModelUyumsuzlugu(ValueError):
+    """Sorgu gommesinin modeli veya boyutu index'i dolduran modelinkiyle ayni degil."""
+
+
+def parmak_izi(model, boyut):
+    return f"{model}:{boyut}"
+
+
+def indeks_adi(model, boyut, zaman=None):
+    """Model ve boyutu adinda tasiyan yeni index adi: vergiai-voyage-3-1024-2406071530."""
+    damga = time.strftime("%y%m%d%H%M", time.localtime(zaman))
+    kisa = re.sub(r"[^a-z0-9]+", "-", model.lower()).strip("-")
+    kisa = kisa[:AD_UZUNLUGU - len(f"vergiai--{boyut}-{damga}")]
+    return f"vergiai-{kisa}-{boyut}-{damga}"
+
+
+def manifest_yolu(ad):
+    """Her index'in kendi yukleme manifesti; eski index eski dosyayi kullanir."""
+    return MANIFEST_YOLU if ad == ESKI_INDEKS else f"./pinecone_manifest.{ad}.json"
+
+
+def etiketler(model, boyut, durum, etkin=0):
+    """Index etiketleri; Pinecone etiket degerleri metindir."""
+    return {"model": model, "boyut": str(boyut), "durum": durum, "etkin": str(etkin)}
+
+
+def kayit_oku(pc):
+    """{"aktif": ad, "onceki": ad, "indeksler": {ad: {model, boyut, durum, etkin}}}.
+
+    durum: aktif, golge (dolduruluyor) veya yedek (geri alma icin tutulan).
+    etkin aktif yapilma sirasidir; birden cok index aktif gorunurse (gecis
+    yarida kalmissa) en buyuk siradaki aktiftir, onceki en buyuk siradaki
+    yedektir. Etiketsiz ESKI_INDEKS ya da hic index yoksa ESKI_INDEKS
+    (ESKI_MODEL) aktif sayilir. Model etiketi olmayan index'ler kayitta yoktur.
+    """
+    indeksler = {}
+    for idx in pc.list_indexes():
+        etiket = dict(getattr(idx, "tags", None) or {})
+        if idx.name == ESKI_INDEKS:
+            etiket = {**etiketler(ESKI_MODEL, ESKI_BOYUT, "aktif"), **etiket}
+        elif "model" not in etiket:
+            continue
+        indeksler[idx.name] = {"model": etiket["model"], "boyut": int(etiket["boyut"]),
+                               "durum": etiket.get("durum") or "golge", "etkin": int(etiket.get("etkin") or 0)}
+
+    def en_son(durum):
+        adaylar = [ad for ad, bilgi in indeksler.items() if bilgi["durum"] == durum]
+        return max(adaylar, key=lambda ad: indeksler[ad]["etkin"]) if adaylar else None
+
+    aktif_ad = en_son("aktif")
+    if aktif_ad is None:
+        aktif_ad = ESKI_INDEKS
+        indeksler[ESKI_INDEKS] = {"model": ESKI_MODEL, "boyut": ESKI_BOYUT, "durum": "aktif", "etkin": 0}
+    return {"aktif": aktif_ad, "onceki": en_son("yedek"), "indeksler": indeksler}
+
+
+def aktif(kayit):
+    """(ad, bilgi) ikilisi."""
+    return kayit["aktif"], kayit["indeksler"][kayit["aktif"]]
+
+
+def golge_bul(kayit, model, boyut):
+    """Ayni model ve boyutla yarim kalmis golge index'in adi, yoksa None."""
+    for ad, bilgi in kayit["indeksler"].items():
+        if bilgi["durum"] == "golge" and parmak_izi(bilgi["model"], bilgi["boyut"]) == parmak_izi(model, boyut):
+            return ad
+    return None
+
+
+def etkinlestir(pc, kayit, ad):
+    """ad'i aktif yapar; onceki aktif geri alma icin yedek olarak kalir.
+
+    Gecis, ad'a en buyuk etkin sirasinin yazildigi tek configure_index
+    cagrisidir; eski aktif'in yedege cekilmesi ondan sonra gelir ve
+    yarida kalsa da okuyanlar yeni index'i gorur.
+    """
+    if ad == kayit["aktif"]:
+        return
+    eski = kayit["aktif"]
+    sira = max(bilgi["etkin"] for bilgi in kayit["indeksler"].values()) + 1
+    yeni = kayit["indeksler"][ad]
+    pc.configure_index(ad, tags=etiketler(yeni["model"], yeni["boyut"], "aktif", sira))
+    onceki = kayit["indeksler"][eski]
+    if eski in [idx.name for idx in pc.list_indexes()]:
+        pc.configure_index(eski, tags=etiketler(onceki["model"], onceki["boyut"], "yedek", onceki["etkin"]))
+    yeni.update(durum="aktif", etkin=sira)
+    onceki["durum"] = "yedek"
+    kayit["aktif"], kayit["onceki"] = ad, eski
+
+
+def geri_al(pc, kayit):
+    """Bir onceki aktif index'e doner; onceki yoksa ValueError."""
+    onceki = kayit.get("onceki")
+    if not onceki or onceki not in kayit["indeksler"]:
+        raise ValueError("Geri donulecek onceki index yok.")
+    etkinlestir(pc, kayit, onceki)
+
+
+class AktifIndeks:
+    """Kayittaki aktif Pinecone index'i; kayit en gec tazelik saniyede bir yeniden okunur.
+
+    al() (index, bilgi) dondurur; bilgi index'i dolduran model ve boyuttur.
+    Gecis baska bir makinede yapilsa da sonraki okumada yeni index'e gecilir.
+    Index nesneleri ada gore saklanir, geri alma yeni baglanti kurmaz; kayit
+    okunamazsa son bilinen index'le devam edilir.
+    """
+
+    def __init__(self, pc, tazelik=TAZELIK):
+        self.pc = pc
+        self.tazelik = tazelik
+        self.kilit = threading.Lock()
+        self.okuma = None
+        self.ad = None
+        self.bilgi = None
+        self.indeksler = {}
+
+    def al(self):
+        with self.kilit:
+            simdi = time.monotonic()
+            yenile = self.ad is None or simdi - self.okuma >= self.tazelik
+            if yenile:
+                # Ayni anda gelenler okuma bitene kadar bilinen index'i kullanir
+                self.okuma = simdi
+            else:
+                return self.indeksler[self.ad], self.bilgi
+        try:
+            ad, bilgi = aktif(kayit_oku(self.pc))
+            index = self.indeksler.get(ad) or self.pc.Index(ad)
+        except Exception as e:
+            if self.ad is None:
+                raise
+            print(f"Index kaydi okunamadi, {self.ad} ile devam ({type(e).__name__}): {e}")
+            return self.indeksler[self.ad], self.bilgi
+        with self.kilit:
+            self.indeksler[ad] = index
+            if self.ad is not None and ad != self.ad:
+                print(f"Aktif index degisti: {self.ad} -> {ad} ({bilgi['model']})")
+            self.ad, self.bilgi = ad, bilgi
+            return index, bilgi
@@ -0,0 +1,256 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+import warnings
+warnings.filterwarnings("ignore")
+from pathlib import Path
+from dotenv import load_dotenv
+import gomme_onbellek
+import trafik
+from gomme_onbellek import GommeOnbellegi
+from bm25_indeks import BM25Indeks
+from pdf_cikarma import sayfalari_akit, belgelere_grupla
+from parcalayici import parcala
+from tekillestirme import ust_alt_ayikla, Tekillestirici
+from belge_bilgisi import belge_bilgisi, elle_girilenler
+from arama import (KelimeArayici, PineconeArayici, LanceArayici, YerelArayici, HibritArayici,
+                   LANCE_GOMME_MODELI, SORGU_MODELI, VEKTOR_SUTUNU)
+from sahte_servisler import SahteVoyage, sahte_index
+
+SORULAR_YOLU = "./kiyaslama_sorular.json"
+BELGELER_KLASORU = "./belgeler"
+ARKA_UCLAR = ["kelime", "pinecone", "lance", "yerel", "hibrit"]
+GOMME_BATCH = 64
+
+
+def sorulari_oku(yol=SORULAR_YOLU):
+    with open(yol, encoding="utf-8") as f:
+        veri = json.load(f)
+    return veri["surum"], veri["sorular"]
+
+
+def derlem_olustur(klasor=BELGELER_KLASORU):
+    """belgeler/ altindaki PDF'leri yukleme betikleriyle ayni sekilde parcalar."""
+    kayitlar = []
+    elle = elle_girilenler(os.path.join(klasor, "bilgiler.json"))
+    for belge, sayfalar, hata in belgelere_grupla(sayfalari_akit(sorted(Path(klasor).glob("*.pdf")))):
+        if hata:
+            print(f"  {belge} okunamadi: {hata}")
+            continue
+        bilgi = belge_bilgisi(belge, sayfalar, elle.get(belge))
+        sayfalar, _ = ust_alt_ayikla(sayfalar)
+        # Yuklemedeki gibi tekillestirme belge icindedir
+        tekil = Tekillestirici()
+        kayitlar += [dict(p, belge=belge, **bilgi) for p in parcala(sayfalar) if tekil.ekle(p["metin"])]
+    return kayitlar
+
+
+def gom(voyage, metinler, model=LANCE_GOMME_MODELI):
+    vektorler = []
+    for i in range(0, len(metinler), GOMME_BATCH):
+        vektorler += voyage.embed(metinler[i:i+GOMME_BATCH], model=model, input_type="document").embeddings
+    return vektorler
+
+
+def kelime_kur(kayitlar, klasor):
+    yol = os.path.join(klasor, "bm25_indeks.pkl")
+    BM25Indeks.olustur(kayitlar).kaydet(yol)
+    return KelimeArayici(yol)
+
+
+def pinecone_kur(kayitlar, voyage, gercek):
+    if gercek:
+        # Canli index; belge_yukle_pinecone.py ile yuklenmis olmali
+        import baglantilar
+        index, _, voyage = baglantilar.baglanti()
+        return PineconeArayici(index, voyage)
+    return PineconeArayici(sahte_index(kayitlar, voyage), voyage)
+
+
+def lance_kur(kayitlar, voyage, klasor):
+    import lancedb
+    from belge_yukle import tablo_semasi, vektor_indeksi_olustur, VEKTOR_INDEKS_ESIGI
+    vektorler = gom(voyage, [k["metin"] for k in kayitlar])
+    satirlar = [dict(k, **{VEKTOR_SUTUNU: v}) for k, v in zip(kayitlar, vektorler)]
+    tablo = lancedb.connect(klasor).create_table("kiyaslama", data=satirlar, schema=tablo_semasi(len(vektorler[0])))
+    if len(satirlar) >= VEKTOR_INDEKS_ESIGI:
+        vektor_indeksi_olustur(tablo)
+    return LanceArayici(tablo, voyage)
+
+
+def yerel_kur(kayitlar, voyage, klasor):
+    from vektor_deposu import DepoYazici
+    from indeks_manifest import parca_kimligi
+    depo_klasoru = os.path.join(klasor, "vektorler")
+    yazici = DepoYazici(SORGU_MODELI, klasor=depo_klasoru, sifirdan=True)
+    yazici.ekle([(parca_kimligi(k["belge"], k["sayfa"], k["metin"]), k) for k in kayitlar],
+                gom(voyage, [k["metin"] for k in kayitlar], SORGU_MODELI))
+    yazici.kaydet()
+    return YerelArayici(voyage, klasor=depo_klasoru)
+
+
+def yuzdelik(degerler, p):
+    if not degerler:
+        return 0.0
+    s = sorted(degerler)
+    return s[min(len(s) - 1, int(round(p / 100 * (len(s) - 1))))]
+
+
+def sure_ozeti(sureler):
+    return {f"p{p}_ms": round(yuzdelik(sureler, p) * 1000, 2) for p in (50, 95, 99)}
+
+
+def isabet_sirasi(sonuclar, beklenen):
+    """Beklenen sayfalardan birinden gelen ilk sonucun 1'den baslayan sirasi (yoksa None)."""
+    hedef = {(b["belge"], b["sayfa"]) for b in beklenen}
+    for sira, s in enumerate(sonuclar, 1):
+        if (s["belge"], int(s["sayfa"])) in hedef:
+            return sira
+    return None
+
+
+def olc(arayici, sorular, k, tekrar):
+    """Ilk tur soguk (bos gomme onbellegi), sonraki turlar sicak olarak olculur."""
+    # Sahte gommeler gercek disk onbellegine karismasin; her arka uc bos bellek onbellegiyle baslar
+    gomme_onbellek._onbellek = GommeOnbellegi(yol=None)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    siralar, soguk, sicak, hata = [], [], [], 0
+    for tur in range(tekrar):
+        for soru in sorular:
+            bas = time.perf_counter()
+            try:
+                sonuclar = arayici.ara(soru["soru"], k)
+            except Exception as e:
+                hata += 1
+                print(f"  Hata: {e}")
+                sonuclar = []
+            (soguk if tur == 0 else sicak).append(time.perf_counter() - bas)
+            if tur == 0:
+                siralar.append(isabet_sirasi(sonuclar, soru["beklenen"]))
+    tepe = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        f"recall@{k}": round(sum(1 for s in siralar if s) / len(siralar), 4),
+        "mrr": round(sum(1 / s for s in siralar if s) / len(siralar), 4),
+        "soguk": sure_ozeti(soguk),
+        "sicak": sure_ozeti(sicak),
+        "tepe_bellek_mb": round(tepe / 1e6, 2),
+        "hata": hata,
+        "iskalanan": [soru["soru"] for soru, s in zip(sorular, siralar) if not s],
+    }
+
+
+def rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Linux'ta KB, macOS'ta bayt
+    ru = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(ru / (1e6 if sys.platform == "darwin" else 1e3), 1)
+
+
+def commit_kimligi():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def tablo_yazdir(rapor, onceki=None):
+    k = rapor["k"]
+    print(f"\n{'arka uc':<10}{'recall@' + str(k):>10}{'mrr':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'sicak p50':>11}{'bellek':>9}{'kurulum':>9}")
+    for ad, s in rapor["sonuclar"].items():
+        print(f"{ad:<10}{s[f'recall@{k}']:>10.3f}{s['mrr']:>8.3f}{s['soguk']['p50_ms']:>7.1f}ms{s['soguk']['p95_ms']:>7.1f}ms"
+              f"{s['soguk']['p99_ms']:>7.1f}ms{s['sicak']['p50_ms']:>9.2f}ms{s['tepe_bellek_mb']:>7.1f}MB{s['kurulum_sn']:>8.1f}s")
+        o = (onceki or {}).get("sonuclar", {}).get(ad)
+        if o:
+            print(f"{'  fark':<10}{s[f'recall@{k}'] - o.get(f'recall@{k}', 0):>+10.3f}{s['mrr'] - o['mrr']:>+8.3f}"
+                  f"{s['soguk']['p50_ms'] - o['soguk']['p50_ms']:>+7.1f}ms{s['soguk']['p95_ms'] - o['soguk']['p95_ms']:>+7.1f}ms"
+                  f"{s['soguk']['p99_ms'] - o['soguk']['p99_ms']:>+7.1f}ms")
+    print(f"\nParca: {rapor['parca']}, derlem kurulumu: {rapor['derlem_sn']:.1f} sn, surec tepe RSS: {rapor['rss_mb']} MB")
+
+
+def main():
+    load_dotenv()
+    p = argparse.ArgumentParser(description="Altin soru seti uzerinde arama kiyaslamasi")
+    p.add_argument("--arka-uc", default=",".join(ARKA_UCLAR), help="virgulle ayrilmis: " + ", ".join(ARKA_UCLAR))
+    p.add_argument("-k", type=int, default=5)
+    p.add_argument("--tekrar", type=int, default=3, help="sicak gecikme icin tur sayisi")
+    p.add_argument("--gercek", action="store_true", help="sahte servisler yerine Voyage ve canli Pinecone index'i kullan")
+    p.add_argument("--sorular", default=SORULAR_YOLU)
+    p.add_argument("--cikti", help="sonuclarin yazilacagi JSON dosyasi")
+    p.add_argument("--karsilastir", help="onceki bir --cikti dosyasi; farklar yazdirilir")
+    args = p.parse_args()
+
+    surum, sorular = sorulari_oku(args.sorular)
+    secilen = [a.strip() for a in args.arka_uc.split(",") if a.strip()]
+    voyage = SahteVoyage()
+    if args.gercek:
+        from arama import voyage_istemcisi
+        voyage = voyage_istemcisi()
+        if voyage is None:
+            sys.exit("--gercek icin VOYAGE_API_KEY gerekli")
+    else:
+        # Sahte Voyage'in kotasi yok; gecikmeler kota sirasini icermesin
+        trafik.kota_ayarla("voyage", 0)
+
+    print(f"Altin set surum {surum}, {len(sorular)} soru; {'gercek' if args.gercek else 'sahte'} servisler")
+    bas = time.perf_counter()
+    kayitlar = derlem_olustur()
+    derlem_sn = time.perf_counter() - bas
+
+    rapor = {"surum": surum, "commit": commit_kimligi(), "tarih": time.strftime("%Y-%m-%d %H:%M:%S"),
+             "gercek": args.gercek, "k": args.k, "parca": len(kayitlar), "derlem_sn": round(derlem_sn, 2), "sonuclar": {}}
+    with tempfile.TemporaryDirectory() as klasor:
+        kurulan = {}
+
+        def kur(ad):
+            if ad not in kurulan:
+                bas = time.perf_counter()
+                if ad == "kelime":
+                    kurulan[ad] = kelime_kur(kayitlar, klasor)
+                elif ad == "pinecone":
+                    kurulan[ad] = pinecone_kur(kayitlar, voyage, args.gercek)
+                elif ad == "lance":
+                    kurulan[ad] = lance_kur(kayitlar, voyage, klasor)
+                elif ad == "yerel":
+                    kurulan[ad] = yerel_kur(kayitlar, voyage, klasor)
+                elif ad == "hibrit":
+                    vektor_ucu = (os.environ.get("VERGIAI_VEKTOR") or "pinecone").lower()
+                    kurulan[ad] = HibritArayici(kur("kelime"), kur(vektor_ucu))
+                else:
+                    raise ValueError(f"Bilinmeyen arka uc: {ad}")
+                kurulan[ad + "_sn"] = time.perf_counter() - bas
+            return kurulan[ad]
+
+        for ad in secilen:
+            print(f"{ad} kuruluyor ve olculuyor...")
+            arayici = kur(ad)
+            sonuc = olc(arayici, sorular, args.k, args.tekrar)
+            sonuc["kurulum_sn"] = round(kurulan[ad + "_sn"], 2)
+            rapor["sonuclar"][ad] = sonuc
+    rapor["rss_mb"] = rss_mb()
+
+    onceki = None
+    if args.karsilastir:
+        with open(args.karsilastir, encoding="utf-8") as f:
+            onceki = json.load(f)
+        print(f"\nKarsilastirilan: commit {onceki.get('commit')} ({onceki.get('tarih')})")
+        if onceki.get("surum") != surum:
+            print("Uyari: altin set surumleri farkli, recall/MRR karsilastirilamaz.")
+    tablo_yazdir(rapor, onceki)
+    if args.cikti:
+        with open(args.cikti, "w", encoding="utf-8") as f:
+            json.dump(rapor, f, ensure_ascii=False, indent=2)
+        print(f"Sonuclar {args.cikti} dosyasina yazildi.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import re
+
+
+def _satirlari_donustur(text):
+    text = re.sub(r'^### (.+)$', r'<h3>\1</h3>', text, flags=re.MULTILINE)
+    text = re.sub(r'^## (.+)$', r'<h2>\1</h2>', text, flags=re.MULTILINE)
+    text = re.sub(r'^# (.+)$', r'<h1>\1</h1>', text, flags=re.MULTILINE)
+    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
+    text = re.sub(r'\*(.+?)\*', r'<em>\1</em>', text)
+    text = re.sub(r'^---+$', r'<hr>', text, flags=re.MULTILINE)
+    text = re.sub(r'^\* (.+)$', r'<li>\1</li>', text, flags=re.MULTILINE)
+    text = re.sub(r'^- (.+)$', r'<li>\1</li>', text, flags=re.MULTILINE)
+    text = re.sub(r'^(\d+)\. (.+)$', r'<li>\2</li>', text, flags=re.MULTILINE)
+    return text
+
+
+def md_to_html(text):
+    text = _satirlari_donustur(text)
+    text = re.sub(r'(<li>.*?</li>\n?)+', lambda m: '<ul>' + m.group(0) + '</ul>', text, flags=re.DOTALL)
+    paragraphs = text.split('\n\n')
+    result = []
+    for p in paragraphs:
+        p = p.strip()
+        if not p: continue
+        if p.startswith('<h') or p.startswith('<ul') or p.startswith('<hr'):
+            result.append(p)
+        else:
+            p = p.replace('\n', ' ')
+            result.append(f'<p>{p}</p>')
+    return '\n'.join(result)
+
+
+class AkisIsleyici:
+    """Akan cevabi artimli olarak HTML'e cevirir.
+
+    md_to_html bos satirla ayrilan bloklari birbirinden bagimsiz isler. Bu
+    yuzden tamamlanmis bloklar bir kez cevrilip saklanir; her guncellemede
+    yalnizca acik kalan son blok yeniden islenir. Boylece uzun cevaplarda
+    her token icin tum metin bastan taranmaz.
+    """
+
+    def __init__(self):
+        self.bitmis = []
+        self.konum = 0
+
+    def _sinir(self, metin):
+        """Tamamlanmis bloklari kapatan son guvenli "\n\n" konumu (yoksa -1).
+
+        Liste satirindan hemen sonra gelen bos satir guvenli degildir:
+        md_to_html liste satirinin sonundaki satir sonunu <ul> icine alir ve
+        o bos satir paragraf ayirici olmaktan cikar.
+        """
+        son = metin.rfind("\n\n", self.konum)
+        while son >= self.konum:
+            satir = metin[metin.rfind("\n", 0, son) + 1:son]
+            if not _satirlari_donustur(satir).startswith("<li>"):
+                return son
+            son = metin.rfind("\n\n", self.konum, son + 1)
+        return -1
+
+    def guncelle(self, metin):
+        son = self._sinir(metin)
+        if son >= self.konum:
+            html = md_to_html(metin[self.konum:son])
+            if html:
+                self.bitmis.append(html)
+            self.konum = son + 2
+        acik = md_to_html(metin[self.konum:])
+        return "\n".join(self.bitmis + ([acik] if acik else []))
@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Asama sureleri icin histogram kovalari (sn)
+KOVALAR = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Istek basina JSON satiri: dosya yolu veya "-" (stdout); tanimsizsa yazilmaz
+LOG_HEDEFI = os.environ.get("VERGIAI_METRIK_LOG")
+# Prometheus metin dosyasi (node_exporter textfile) ve/veya HTTP portu (/metrics)
+METRIK_DOSYASI = os.environ.get("VERGIAI_METRIK_DOSYASI")
+METRIK_PORTU = os.environ.get("VERGIAI_METRIK_PORT")
+YAZMA_ARALIGI = 15
+ON_EK = "vergiai"
+
+
+class Metrikler:
+    """Surec genelinde asama sureleri (histogram) ve olay sayaclari."""
+
+    def __init__(self, kovalar=KOVALAR):
+        self.kovalar = kovalar
+        self.kilit = threading.Lock()
+        # {asama: [kova sayilari, toplam sure, adet]}
+        self.histogramlar = {}
+        # {(ad, ((etiket, deger), ...)): sayi}
+        self.sayaclar = {}
+
+    def kaydet(self, asama, sure):
+        with self.kilit:
+            h = self.histogramlar.get(asama)
+            if h is None:
+                h = self.histogramlar[asama] = [[0] * len(self.kovalar), 0.0, 0]
+            for i, sinir in enumerate(self.kovalar):
+                if sure <= sinir:
+                    h[0][i] += 1
+            h[1] += sure
+            h[2] += 1
+
+    def say(self, ad, n=1, **etiketler):
+        anahtar = (ad, tuple(sorted(etiketler.items())))
+        with self.kilit:
+            self.sayaclar[anahtar] = self.sayaclar.get(anahtar, 0) + n
+
+    def prometheus(self):
+        """Prometheus metin bicimi (exposition format 0.0.4)."""
+        satirlar = []
+        with self.kilit:
+            if self.histogramlar:
+                satirlar += [f"# HELP {ON_EK}_asama_saniye Soru-cevap yolunun asama sureleri",
+                             f"# TYPE {ON_EK}_asama_saniye histogram"]
+            for asama, (kovalar, toplam, adet) in sorted(self.histogramlar.items()):
+                for sinir, sayi in zip(self.kovalar, kovalar):
+                    satirlar.append(f'{ON_EK}_asama_saniye_bucket{{asama="{asama}",le="{sinir}"}} {sayi}')
+                satirlar.append(f'{ON_EK}_asama_saniye_bucket{{asama="{asama}",le="+Inf"}} {adet}')
+                satirlar.append(f'{ON_EK}_asama_saniye_sum{{asama="{asama}"}} {toplam:.6f}')
+                satirlar.append(f'{ON_EK}_asama_saniye_count{{asama="{asama}"}} {adet}')
+            yazilan = set()
+            for (ad, etiketler), sayi in sorted(self.sayaclar.items()):
+                if ad not in yazilan:
+                    satirlar.append(f"# TYPE {ON_EK}_{ad}_toplam counter")
+                    yazilan.add(ad)
+                etiket = ",".join(f'{k}="{v}"' for k, v in etiketler)
+                satirlar.append(f"{ON_EK}_{ad}_toplam{{{etiket}}} {sayi}" if etiket else f"{ON_EK}_{ad}_toplam {sayi}")
+        return "\n".join(satirlar) + "\n"
+
+
+_metrikler = Metrikler()
+# Devam eden istegin asama dokumu; HibritArayici gibi is parcacigina dagilan
+# isler baglami (contextvars.copy_context) ile birlikte tasir
+_dokum = contextvars.ContextVar("vergiai_dokum", default=None)
+_log_kilidi = threading.Lock()
+
+
+def metrikler():
+    return _metrikler
+
+
+def kaydet(asama, sure):
+    _metrikler.kaydet(asama, sure)
+    dokum = _dokum.get()
+    if dokum is not None:
+        dokum["asamalar"][asama] = dokum["asamalar"].get(asama, 0.0) + sure
+
+
+@contextmanager
+def aralik(asama):
+    """with aralik("pinecone_sorgu"): ... bloğun suresini kaydeder."""
+    bas = time.perf_counter()
+    try:
+        yield
+    finally:
+        kaydet(asama, time.perf_counter() - bas)
+
+
+def say(ad, n=1, **etiketler):
+    _metrikler.say(ad, n, **etiketler)
+    dokum = _dokum.get()
+    if dokum is not None:
+        anahtar = ".".join([ad] + [str(v) for _, v in sorted(etiketler.items())])
+        dokum["sayaclar"][anahtar] = dokum["sayaclar"].get(anahtar, 0) + n
+
+
+@contextmanager
+def istek(ad, **alanlar):
+    """Bir istegin tum asamalarini toplayan dokum; cikista JSON satiri yazilir.
+
+    with istek("sohbet") as dokum: ... icindeki aralik/say cagrilari hem surec
+    geneline hem bu dokume islenir. dokum["asamalar"] saniye cinsindendir.
+    """
+    dokum = {"istek": ad, "asamalar": {}, "sayaclar": {}, **alanlar}
+    jeton = _dokum.set(dokum)
+    bas = time.perf_counter()
+    try:
+        yield dokum
+    except BaseException as e:
+        dokum["hata"] = type(e).__name__
+        raise
+    finally:
+        dokum["toplam"] = time.perf_counter() - bas
+        _dokum.reset(jeton)
+        _metrikler.kaydet(ad, dokum["toplam"])
+        if LOG_HEDEFI:
+            _log_yaz(dokum)
+
+
+def _log_yaz(dokum):
+    satir = json.dumps({
+        "zaman": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        **{k: v for k, v in dokum.items() if k not in ("asamalar", "toplam")},
+        "toplam_ms": round(dokum["toplam"] * 1000, 1),
+        "asamalar_ms": {k: round(v * 1000, 1) for k, v in dokum["asamalar"].items()},
+    }, ensure_ascii=False)
+    with _log_kilidi:
+        if LOG_HEDEFI == "-":
+            print(satir, file=sys.stdout, flush=True)
+        else:
+            try:
+                with open(LOG_HEDEFI, "a", encoding="utf-8") as f:
+                    f.write(satir + "\n")
+            except OSError:
+                pass
+
+
+def dokum_ozeti(dokum):
+    """Arayuzde gosterilecek kisa dokum: "arama 120 ms · claude_ilk_token 450 ms"."""
+    return " · ".join(f"{k} {v * 1000:.0f} ms" for k, v in dokum["asamalar"].items())
+
+
+def _dosyaya_yaz(yol):
+    while True:
+        time.sleep(YAZMA_ARALIGI)
+        try:
+            gecici = yol + ".tmp"
+            with open(gecici, "w", encoding="utf-8") as f:
+                f.write(_metrikler.prometheus())
+            os.replace(gecici, yol)
+        except OSError as e:
+            print(f"Metrik dosyasi yazilamadi: {e}")
+
+
+def _sunucu_baslat(port):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Isleyici(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            govde = _metrikler.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(govde)))
+            self.end_headers()
+            self.wfile.write(govde)
+
+        def log_message(self, *args):
+            pass
+
+    sunucu = ThreadingHTTPServer(("0.0.0.0", port), Isleyici)
+    threading.Thread(target=sunucu.serve_forever, daemon=True, name="metrikler").start()
+
+
+_baslatildi = False
+_baslat_kilidi = threading.Lock()
+
+
+def baslat():
+    """VERGIAI_METRIK_DOSYASI / VERGIAI_METRIK_PORT tanimliysa disa aktarimi bir kez baslatir."""
+    global _baslatildi
+    with _baslat_kilidi:
+        if _baslatildi:
+            return
+        _baslatildi = True
+    if METRIK_DOSYASI:
+        threading.Thread(target=_dosyaya_yaz, args=(METRIK_DOSYASI,), daemon=True, name="metrik-dosyasi").start()
+    if METRIK_PORTU:
+        try:
+            _sunucu_baslat(int(METRIK_PORTU))
+        except (OSError, ValueError) as e:
+            print(f"Metrik sunucusu baslatilamadi: {e}")
@@ -0,0 +1,168 @@
+import re
+from turkce import token_tahmini
+
+# Bir parcanin ust siniri ve birlestirme esigi (tahmini token)
+MAKS_TOKEN = 400
+MIN_TOKEN = 120
+
+# "Madde 29 –", "Geçici Madde 1-", "EK MADDE 3 –", "Madde 17/A –"
+_MADDE = re.compile(r"^((?:Ek|EK|Geçici|GEÇİCİ)\s+)?(?:Madde|MADDE)\s+(\d+(?:/[A-Z])?)\s*[-–—]")
+# Madde basligi: "Vergi indirimi:" (sonunda dipnot numaralari olabilir)
+_BASLIK = re.compile(r"^[^.;]{2,80}:\s*\d*$")
+# Fikra / bent baslangici: "1.", "(2)", "a)", "ç)"
+_FIKRA = re.compile(r"^(?:\d{1,2}\.\s|\(\d{1,2}\)\s|[a-zçğıöşü]\)\s)")
+_CUMLE = re.compile(r"(?<=[.!?;:])\s+")
+
+
+def _buyuk_baslik_mi(satir):
+    """"İKİNCİ KISIM", "GEK03 GENEL ESAS KONTROL ..." gibi tamami buyuk harf basliklar."""
+    harfler = [c for c in satir if c.isalpha()]
+    return len(harfler) >= 4 and len(satir) <= 120 and all(c.isupper() for c in harfler)
+
+
+class _Blok:
+    """Bir madde veya bolum; fikra/paragraf birimlerinden olusur."""
+
+    def __init__(self, madde="", baslik=""):
+        self.madde = madde
+        self.baslik = baslik
+        self.birimler = []  # (metin, sayfa, token)
+        self.token = 0
+
+    def ekle(self, satirlar, sayfa):
+        metin = " ".join(satirlar)
+        t = token_tahmini(metin)
+        self.birimler.append((metin, sayfa, t))
+        self.token += t
+
+
+def _bloklar(sayfalar):
+    """Sayfa satirlarini tek geciste madde/bolum bloklarina ve birimlere ayirir.
+
+    Bloklar sayfa sinirinda kesilmez; her birim basladigi sayfayi tasir.
+    """
+    blok = _Blok()
+    birim, birim_sayfa = [], None
+    bekleyen = None  # madde basligi olabilecek satir ve sayfasi
+
+    def birime_ekle(satir, sayfa):
+        nonlocal birim_sayfa
+        if not birim:
+            birim_sayfa = sayfa
+        birim.append(satir)
+
+    def birimi_kapat():
+        if birim:
+            blok.ekle(birim, birim_sayfa)
+            birim.clear()
+
+    for sayfa in sayfalar:
+        no = sayfa["sayfa_no"]
+        for satir in sayfa["metin"].splitlines():
+            satir = satir.strip()
+            if not satir:
+                birimi_kapat()
+                continue
+            m = _MADDE.match(satir)
+            if bekleyen and not m:
+                # Baslik sanilan satirdan sonra madde gelmedi; siradan satirdir
+                birime_ekle(*bekleyen)
+                bekleyen = None
+            if m or _buyuk_baslik_mi(satir):
+                birimi_kapat()
+                if blok.birimler:
+                    yield blok
+                if m:
+                    # "GEÇİCİ".capitalize() noktali I'yi bozar; tur adlari sabittir
+                    tur = ("Geçici " if m.group(1)[0] == "G" else "Ek ") if m.group(1) else ""
+                    blok = _Blok(madde=tur + m.group(2), baslik=f"{tur}Madde {m.group(2)}")
+                else:
+                    blok = _Blok(baslik=satir)
+                if bekleyen:
+                    # "Vergi indirimi:" basligi maddesiyle ayni parcada kalir
+                    birime_ekle(*bekleyen)
+                    bekleyen = None
+            elif _FIKRA.match(satir):
+                birimi_kapat()
+            elif _BASLIK.match(satir):
+                bekleyen = (satir, no)
+                continue
+            birime_ekle(satir, no)
+    if bekleyen:
+        birime_ekle(*bekleyen)
+    birimi_kapat()
+    if blok.birimler:
+        yield blok
+
+
+def cumleler(metin):
+    """Metni cumlelere (ve ";" / ":" ile ayrilan bent parcalarina) boler."""
+    return [c for c in _CUMLE.split(metin) if c]
+
+
+def _bol(metin, sinir):
+    """Tek basina sinirdan buyuk birimi cumlelerden, gerekirse kelimelerden boler."""
+    parcalar, secilen, t = [], [], 0
+    for cumle in cumleler(metin):
+        ct = token_tahmini(cumle)
+        if ct > sinir:
+            kelimeler = cumle.split()
+            adim = max(1, len(kelimeler) * sinir // ct)
+            alt = [" ".join(kelimeler[i:i+adim]) for i in range(0, len(kelimeler), adim)]
+        else:
+            alt = [cumle]
+        for a in alt:
+            at = token_tahmini(a)
+            if secilen and t + at > sinir:
+                parcalar.append(" ".join(secilen))
+                secilen, t = [], 0
+            secilen.append(a)
+            t += at
+    if secilen:
+        parcalar.append(" ".join(secilen))
+    return parcalar
+
+
+def parcala(sayfalar, maks_token=MAKS_TOKEN, min_token=MIN_TOKEN):
+    """Bir belgenin sayfalarini mevzuat yapisina gore parcalar.
+
+    sayfalar: {"sayfa_no", "metin"} sozlukleri (pdf_cikarma ciktisi).
+    Parcalar madde ve buyuk harf bolum basliklarinda baslar; maks_token'i
+    asan madde fikra/bent sinirlarindan (gerekirse cumlelerden) bolunur ve
+    devam parcalarinin basina "[Madde N]" eklenir. min_token'dan kucuk
+    komsu bloklar birlestirilir. Her satir bir kez islenir, dogrusal zamanlidir.
+
+    Donen parcalar: {"metin", "sayfa" (basladigi sayfa), "madde"} sozlukleri;
+    madde, parcadaki madde numaralari ("29" veya "62,63"), yoksa "".
+    """
+    parcalar = []
+    acik = None  # [metinler, token, sayfa, maddeler]
+
+    def kapat():
+        nonlocal acik
+        if acik:
+            parcalar.append({"metin": " ".join(acik[0]), "sayfa": acik[2], "madde": ",".join(acik[3])})
+            acik = None
+
+    for blok in _bloklar(sayfalar):
+        if acik and acik[1] < min_token:
+            # Kucuk basliklar ve kisa maddeler bir sonraki blokla birlesir
+            if blok.madde and acik[3][-1:] != [blok.madde]:
+                acik[3].append(blok.madde)
+        else:
+            kapat()
+        onek = f"[{blok.baslik}] " if blok.madde else ""
+        for metin, sayfa, t in blok.birimler:
+            for alt in (_bol(metin, maks_token) if t > maks_token else [metin]):
+                at = token_tahmini(alt)
+                if acik and acik[1] + at > maks_token:
+                    kapat()
+                if acik is None:
+                    # Bolunen maddenin devam parcasi hangi maddeye ait oldugunu tasir
+                    devam = onek if parcalar and blok.madde and parcalar[-1]["madde"].split(",")[-1] == blok.madde else ""
+                    acik = [[devam + alt] if devam else [alt], at + token_tahmini(devam), sayfa, [blok.madde] if blok.madde else []]
+                else:
+                    acik[0].append(alt)
+                    acik[1] += at
+    kapat()
+    return parcalar
@@ -0,0 +1,143 @@
+import os
+import time
+import queue
+import threading
+import itertools
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+SAYFA_GRUBU = 16
+KUYRUK_BOYUTU = 8
+
+# Her isci sureci tek bir belge tanitici tutar: (yol, doc)
+_acik_belge = None
+
+
+def _sayfalari_oku(yol, baslangic, bitis):
+    """Isci surecinde [baslangic, bitis) sayfalarini okur.
+
+    Ayni belgenin ardisik gruplari icin dosya tekrar acilmaz.
+    """
+    global _acik_belge
+    import pymupdf
+    if _acik_belge is None or _acik_belge[0] != yol:
+        if _acik_belge is not None:
+            _acik_belge[1].close()
+        _acik_belge = (yol, pymupdf.open(yol))
+    doc = _acik_belge[1]
+    bitis = min(bitis, len(doc))
+    sayfalar = []
+    for i in range(baslangic, bitis):
+        metin = doc[i].get_text()
+        if metin.strip():
+            sayfalar.append({"sayfa_no": i + 1, "metin": metin})
+    return bitis - baslangic, sayfalar
+
+
+def _sayfa_sayisi(yol):
+    import pymupdf
+    with pymupdf.open(yol) as doc:
+        return len(doc)
+
+
+class Olcum:
+    """Akis boyunca islenen sayfa/parca sayilarini ve hizi tutar."""
+
+    def __init__(self):
+        self.baslangic = time.perf_counter()
+        self.belge = 0
+        self.sayfa = 0
+        self.karakter = 0
+        self.parca = 0
+        self.tekrar = 0
+
+    def sure(self):
+        return max(time.perf_counter() - self.baslangic, 1e-9)
+
+    def ozet(self):
+        sn = self.sure()
+        tekrar = f" ({self.tekrar} tekrar atildi)" if self.tekrar else ""
+        return (f"{self.belge} belge, {self.sayfa} sayfa, {self.parca} parca{tekrar}, {sn:.1f} sn | "
+                f"{self.sayfa / sn:.1f} sayfa/sn, {self.parca / sn:.1f} parca/sn, "
+                f"{self.karakter / sn / 1e6:.2f} MB metin/sn")
+
+
+def sayfalari_akit(pdf_yollari, isci_sayisi=None, kuyruk_boyutu=KUYRUK_BOYUTU, olcum=None):
+    """PDF sayfalarini bir surec havuzunda okuyup belge/sayfa sirasiyla uretir.
+
+    Her eleman {"belge", "sayfa_no", "metin"} sozlugudur; okunamayan bir belge
+    icin tek bir {"belge", "hata"} elemani uretilir. Havuza en fazla
+    kuyruk_boyutu grup onden verilir, boylece tuketici yavas kaldiginda
+    okuma da bekler ve bellek kullanimi derlem boyutundan bagimsiz kalir.
+    """
+    olcum = olcum or Olcum()
+    kuyruk = queue.Queue(maxsize=kuyruk_boyutu)
+    bitti = object()
+    durdur = threading.Event()
+
+    with ProcessPoolExecutor(max_workers=isci_sayisi or os.cpu_count()) as havuz:
+        def uretici():
+            try:
+                for yol in pdf_yollari:
+                    if durdur.is_set():
+                        break
+                    belge = Path(yol).stem
+                    try:
+                        n = _sayfa_sayisi(str(yol))
+                    except Exception as e:
+                        kuyruk.put((belge, None, e))
+                        continue
+                    for bas in range(0, n, SAYFA_GRUBU):
+                        if durdur.is_set():
+                            break
+                        kuyruk.put((belge, havuz.submit(_sayfalari_oku, str(yol), bas, bas + SAYFA_GRUBU), None))
+            finally:
+                kuyruk.put(bitti)
+
+        is_parcacigi = threading.Thread(target=uretici, daemon=True)
+        is_parcacigi.start()
+        onceki_belge = None
+        try:
+            while True:
+                oge = kuyruk.get()
+                if oge is bitti:
+                    break
+                belge, gelecek, hata = oge
+                if hata is None:
+                    try:
+                        okunan, sayfalar = gelecek.result()
+                    except Exception as e:
+                        hata = e
+                if hata is not None:
+                    print(f"Hata: {belge} - {hata}")
+                    yield {"belge": belge, "hata": str(hata)}
+                    continue
+                if belge != onceki_belge:
+                    olcum.belge += 1
+                    onceki_belge = belge
+                olcum.sayfa += okunan
+                for sayfa in sayfalar:
+                    olcum.karakter += len(sayfa["metin"])
+                    sayfa["belge"] = belge
+                    yield sayfa
+        finally:
+            # Tuketici erken birakirsa ureticiyi durdur ve kuyrugu bosalt
+            durdur.set()
+            while is_parcacigi.is_alive():
+                try:
+                    oge = kuyruk.get(timeout=0.1)
+                    if oge is not bitti and oge[1] is not None:
+                        oge[1].cancel()
+                except queue.Empty:
+                    pass
+
+
+def belgelere_grupla(sayfalar):
+    """sayfalari_akit ciktisini (belge, sayfa listesi, hata) uclulerine boler.
+
+    Bellekte ayni anda yalnizca tek belgenin sayfalari tutulur.
+    """
+    for belge, grup in itertools.groupby(sayfalar, key=lambda s: s["belge"]):
+        grup = list(grup)
+        hata = next((s["hata"] for s in grup if "hata" in s), None)
+        yield belge, [s for s in grup if "hata" not in s], hata
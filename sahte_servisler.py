@@ -0,0 +1,350 @@
+import math
+import asyncio
+import time
+import types
+import zlib
+import random
+import threading
+from turkce import tokenlar
+from indeks_surumu import ESKI_MODEL
+
+SAHTE_BOYUT = 1024
+GOMME_BATCH = 64
+SAHTE_CEVAP = ("## Cevap\n\nKatma deger vergisi **3065 sayili Kanun** kapsaminda degerlendirilir. "
+               "Ilgili hukumler asagida ozetlenmistir:\n\n- Vergiyi doguran olay teslim aninda meydana gelir\n"
+               "- Indirim hakki belgeyle ispat edilir\n- Iade talebi liste ve raporla yapilir\n\n"
+               "Kesin hukuki gorus icin bir vergi uzmanina danisilmasi onerilir. ")
+
+
+class SahteHata(Exception):
+    """Enjekte edilen hata; http_status/status tasir, yeniden_dene gecici sayar."""
+
+    def __init__(self, durum=503):
+        super().__init__(f"sahte servis hatasi ({durum})")
+        self.http_status = self.status = durum
+        self.headers = {}
+
+
+class _Gecikmeli:
+    """Ortak gecikme ve hata enjeksiyonu: her cagri gecikme (+- sapma) kadar bekler,
+    hata_orani olasilikla durum koduyla hata verir."""
+
+    def __init__(self, gecikme=0.0, sapma=0.0, hata_orani=0.0, hata_durumu=503, tohum=0):
+        self.gecikme = gecikme
+        self.sapma = sapma
+        self.hata_orani = hata_orani
+        self.hata_durumu = hata_durumu
+        self.rastgele = random.Random(tohum)
+        self.sayac_kilidi = threading.Lock()
+        self.istek = 0
+        self.hata = 0
+
+    def _zar(self):
+        """(beklenecek sure, hata verilecek mi)."""
+        with self.sayac_kilidi:
+            self.istek += 1
+            bekle = max(0.0, self.gecikme + self.rastgele.uniform(-self.sapma, self.sapma)) if self.sapma else self.gecikme
+            hata = self.rastgele.random() < self.hata_orani
+            if hata:
+                self.hata += 1
+        return bekle, hata
+
+    def _cagri(self):
+        bekle, hata = self._zar()
+        if bekle:
+            time.sleep(bekle)
+        if hata:
+            raise SahteHata(self.hata_durumu)
+
+    async def _cagri_asenkron(self):
+        bekle, hata = self._zar()
+        if bekle:
+            await asyncio.sleep(bekle)
+        if hata:
+            raise SahteHata(self.hata_durumu)
+
+
+def sahte_gomme(metin, boyut=SAHTE_BOYUT):
+    """Kelime koklerinin isaretli karmasiyla uretilen birim vektor.
+
+    Ayni metin her zaman ayni vektoru verir; ortak kelimesi cok olan metinler
+    arasindaki kosinus benzerligi yuksektir.
+    """
+    v = [0.0] * boyut
+    for t in tokenlar(metin):
+        h = zlib.crc32(t.encode("utf-8"))
+        v[h % boyut] += 1.0 if (h >> 16) & 1 else -1.0
+    n = math.sqrt(sum(x * x for x in v)) or 1.0
+    return [x / n for x in v]
+
+
+class SahteVoyage(_Gecikmeli):
+    """voyageai.Client.embed ile ayni bicimde cevap veren, ag kullanmayan istemci."""
+
+    def __init__(self, boyut=SAHTE_BOYUT, **ayarlar):
+        super().__init__(**ayarlar)
+        self.boyut = boyut
+
+    def embed(self, texts, model=None, input_type=None, **kwargs):
+        self._cagri()
+        return types.SimpleNamespace(embeddings=[sahte_gomme(t, self.boyut) for t in texts],
+                                     total_tokens=sum(len(t) // 3 + 1 for t in texts))
+
+
+class SahteIndex(_Gecikmeli):
+    """Pinecone Index'in kullandigimiz kismi (upsert, update, query, delete, stats); bellekte kaba kuvvet kosinus.
+
+    query filter olarak $in, $eq ve $gte kosullarini (liste alanlarda herhangi
+    bir eleman) destekler; Pinecone gibi en yakin top_k uyan kayit doner.
+
+    Gecikme ve hata enjeksiyonu yalnizca query ve describe_index_stats'a uygulanir.
+    """
+
+    def __init__(self, **ayarlar):
+        super().__init__(**ayarlar)
+        import numpy as np
+        self.np = np
+        self.kimlikler = []
+        self.meta = []
+        self.sira = {}
+        self.matris = None
+        self.kilit = threading.Lock()
+
+    def upsert(self, vectors):
+        np = self.np
+        with self.kilit:
+            yeni = []
+            for v in vectors:
+                if v["id"] in self.sira:
+                    self.meta[self.sira[v["id"]]] = v.get("metadata", {})
+                    self.matris[self.sira[v["id"]]] = v["values"]
+                    continue
+                self.sira[v["id"]] = len(self.kimlikler)
+                self.kimlikler.append(v["id"])
+                self.meta.append(v.get("metadata", {}))
+                yeni.append(v["values"])
+            if yeni:
+                ek = np.asarray(yeni, dtype=np.float32)
+                self.matris = ek if self.matris is None else np.vstack([self.matris, ek])
+        return {"upserted_count": len(vectors)}
+
+    def update(self, id=None, set_metadata=None, filter=None, **kwargs):
+        """id ile tek vektorun ya da filter'a uyan tum vektorlerin metadata'sini gunceller."""
+        with self.kilit:
+            if not set_metadata:
+                return
+            if filter:
+                for i, meta in enumerate(self.meta):
+                    if self._uyar(meta, filter):
+                        self.meta[i] = {**meta, **set_metadata}
+            elif id in self.sira:
+                self.meta[self.sira[id]] = {**self.meta[self.sira[id]], **set_metadata}
+
+    def _uyar(self, meta, filtre):
+        for alan, kosul in filtre.items():
+            deger = meta.get(alan)
+            degerler = deger if isinstance(deger, list) else [deger]
+            for islec, hedef in kosul.items():
+                if islec == "$in" and not set(degerler) & set(hedef):
+                    return False
+                if islec == "$eq" and hedef not in degerler:
+                    return False
+                if islec == "$gte" and (deger is None or deger < hedef):
+                    return False
+        return True
+
+    def list(self, prefix="", limit=100, **kwargs):
+        """Onekle baslayan kimlikleri limit'lik sayfalar halinde verir (Pinecone Index.list)."""
+        with self.kilit:
+            kimlikler = sorted(k for k in self.kimlikler if k.startswith(prefix or ""))
+        for i in range(0, len(kimlikler), limit):
+            yield kimlikler[i:i + limit]
+
+    def delete(self, ids):
+        silinecek = set(ids)
+        with self.kilit:
+            kalan = [i for i, k in enumerate(self.kimlikler) if k not in silinecek]
+            self.kimlikler = [self.kimlikler[i] for i in kalan]
+            self.meta = [self.meta[i] for i in kalan]
+            self.matris = self.matris[kalan] if self.matris is not None and kalan else None
+            self.sira = {k: i for i, k in enumerate(self.kimlikler)}
+
+    def describe_index_stats(self):
+        self._cagri()
+        return {"total_vector_count": len(self.kimlikler)}
+
+    def query(self, vector, top_k=5, include_metadata=True, include_values=False, filter=None, **kwargs):
+        self._cagri()
+        np = self.np
+        with self.kilit:
+            if self.matris is None:
+                return types.SimpleNamespace(matches=[])
+            puanlar = self.matris @ np.asarray(vector, dtype=np.float32)
+            if filter:
+                uyan = np.array([self._uyar(m, filter) for m in self.meta], dtype=bool)
+                puanlar = np.where(uyan, puanlar, -np.inf)
+                top_k = min(top_k, int(uyan.sum()))
+            if not top_k:
+                return types.SimpleNamespace(matches=[])
+            k = min(top_k, len(puanlar))
+            en_iyi = np.argpartition(-puanlar, k - 1)[:k]
+            en_iyi = en_iyi[np.argsort(-puanlar[en_iyi])]
+            return types.SimpleNamespace(matches=[
+                types.SimpleNamespace(id=self.kimlikler[i], score=float(puanlar[i]),
+                                      metadata=self.meta[i] if include_metadata else None,
+                                      values=self.matris[i].tolist() if include_values else [])
+                for i in en_iyi])
+
+
+def sahte_index(kayitlar, voyage, model=ESKI_MODEL, **ayarlar):
+    """{"belge", "sayfa", "metin"[, kanun, yayim, etiketler]} kayitlarini voyage ile gomup SahteIndex'e yukler."""
+    index = SahteIndex(**ayarlar)
+    for i in range(0, len(kayitlar), GOMME_BATCH):
+        batch = kayitlar[i:i+GOMME_BATCH]
+        vektorler = [sahte_gomme(k["metin"], voyage.boyut) for k in batch] if isinstance(voyage, SahteVoyage) else \
+            voyage.embed([k["metin"] for k in batch], model=model, input_type="document").embeddings
+        index.upsert([{"id": str(i + j), "values": v, "metadata": {
+                           "metin": k["metin"], "belge": k["belge"], "sayfa": k["sayfa"],
+                           **{a: k[a] for a in ("kanun", "yayim", "etiketler") if a in k}}}
+                      for j, (k, v) in enumerate(zip(batch, vektorler))])
+    return index
+
+
+class SahtePinecone:
+    """Pinecone istemcisinin index yonetimi kismi (list/create/describe/configure/delete_index, Index).
+
+    Her index bir SahteIndex'tir; olusturulan index hemen hazirdir, etiketler
+    saklanir ve configure_index ile Pinecone gibi birlestirilir ("" siler).
+    """
+
+    def __init__(self, **ayarlar):
+        self.ayarlar = ayarlar
+        self.indeksler = {}
+
+    def _bilgi(self, name):
+        return getattr(self.indeksler[name], "bilgi", {"dimension": None, "tags": {}})
+
+    def list_indexes(self):
+        return [types.SimpleNamespace(name=ad, **self._bilgi(ad)) for ad in self.indeksler]
+
+    def create_index(self, name, dimension, metric="cosine", spec=None, **kwargs):
+        self.indeksler[name] = SahteIndex(**self.ayarlar)
+        self.indeksler[name].bilgi = {"dimension": dimension, "tags": dict(kwargs.get("tags") or {})}
+
+    def describe_index(self, name):
+        return types.SimpleNamespace(name=name, status={"ready": True}, **self._bilgi(name))
+
+    def configure_index(self, name, tags=None, **kwargs):
+        bilgi = self._bilgi(name)
+        etiket = {**bilgi["tags"], **(tags or {})}
+        self.indeksler[name].bilgi = {**bilgi, "tags": {k: v for k, v in etiket.items() if v != ""}}
+        return self.describe_index(name)
+
+    def delete_index(self, name):
+        del self.indeksler[name]
+
+    def Index(self, name):
+        return self.indeksler[name]
+
+
+class _SahteAkis:
+    def __init__(self, istemci, parcalar):
+        self.istemci = istemci
+        self.parcalar = parcalar
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *hata):
+        return False
+
+    @property
+    def text_stream(self):
+        if self.istemci.ilk_token:
+            time.sleep(self.istemci.ilk_token)
+        aralik = 1.0 / self.istemci.token_hizi if self.istemci.token_hizi else 0.0
+        for parca in self.parcalar:
+            if aralik:
+                time.sleep(aralik)
+            yield parca
+
+
+class _SahteMesajlar:
+    def __init__(self, istemci):
+        self.istemci = istemci
+
+    def stream(self, **kwargs):
+        self.istemci._cagri()
+        return _SahteAkis(self.istemci, self.istemci.parcalar())
+
+    def create(self, **kwargs):
+        self.istemci._cagri()
+        if self.istemci.ilk_token:
+            time.sleep(self.istemci.ilk_token)
+        metin = "".join(self.istemci.parcalar())
+        return types.SimpleNamespace(content=[types.SimpleNamespace(type="text", text=metin)],
+                                     usage=types.SimpleNamespace(input_tokens=0, output_tokens=self.istemci.cevap_token))
+
+
+class SahteAnthropic(_Gecikmeli):
+    """Anthropic istemcisinin messages.stream ve messages.create kismi.
+
+    Istek gecikme kadar bekler (hata enjeksiyonu burada yapilir), ilk token
+    ilk_token saniye sonra gelir, sonra cevap_token token saniyede token_hizi
+    hizla akar. Bir token yaklasik 4 karakter kabul edilir.
+    """
+
+    def __init__(self, ilk_token=0.4, token_hizi=80.0, cevap_token=250, **ayarlar):
+        super().__init__(**ayarlar)
+        self.ilk_token = ilk_token
+        self.token_hizi = token_hizi
+        self.cevap_token = cevap_token
+        self.messages = _SahteMesajlar(self)
+
+    def parcalar(self):
+        metin = (SAHTE_CEVAP * (self.cevap_token * 4 // len(SAHTE_CEVAP) + 1))[:self.cevap_token * 4]
+        return [metin[i:i+4] for i in range(0, len(metin), 4)]
+
+
+class _SahteAsenkronAkis(_SahteAkis):
+    @property
+    async def text_stream(self):
+        if self.istemci.ilk_token:
+            await asyncio.sleep(self.istemci.ilk_token)
+        aralik = 1.0 / self.istemci.token_hizi if self.istemci.token_hizi else 0.0
+        for parca in self.parcalar:
+            if aralik:
+                await asyncio.sleep(aralik)
+            yield parca
+
+
+class _SahteAsenkronMesajlar:
+    def __init__(self, istemci):
+        self.istemci = istemci
+
+    def stream(self, **kwargs):
+        return _SahteAsenkronBaslangic(self.istemci)
+
+
+class _SahteAsenkronBaslangic:
+    """AsyncAnthropic gibi istek `async with` ile girilince gonderilir."""
+
+    def __init__(self, istemci):
+        self.istemci = istemci
+        self.akis = None
+
+    async def __aenter__(self):
+        await self.istemci._cagri_asenkron()
+        self.akis = _SahteAsenkronAkis(self.istemci, self.istemci.parcalar())
+        return self.akis
+
+    async def __aexit__(self, *hata):
+        return False
+
+
+class SahteAsenkronAnthropic(SahteAnthropic):
+    """AsyncAnthropic'in messages.stream kismi; beklemeler olay dongusunu bloklamaz."""
+
+    def __init__(self, **ayarlar):
+        super().__init__(**ayarlar)
+        self.messages = _SahteAsenkronMesajlar(self)
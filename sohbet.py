@@ -0,0 +1,135 @@
+import time
+import asyncio
+import baglantilar
+from arama import ayir
+from baglam_derleme import derle, baglam_metni, ADAY_CARPANI
+from metrikler import aralik, kaydet, say
+from cevap_onbellek import cevap_onbellegi, tekrar_oynat
+from trafik import kova, KotaAsildi
+
+MODEL = "claude-haiku-4-5-20251001"
+MAKS_TOKEN = 2048
+KISILIK = "Sen vergiai.com Turk vergi mevzuati uzman asistanisin. Sorulari Turkce yanitla. Son mesajda BELGELER verilmisse cevabi o belge bolumlerine dayandir ve kaynagi (belge ve sayfa) belirt."
+
+
+def ara_sonuclari(soru, n=5, suzgec=None):
+    """Arama sonuclari; hata olursa sayilir, yazdirilir ve bos liste doner.
+
+    suzgec (belge_bilgisi.Suzgec) verilirse yalnizca uyan belgelerde aranir.
+    KotaAsildi yutulmaz; arayuz ve API onu yogunluk olarak bildirir.
+    """
+    if baglantilar.kayit_sayisi() == 0:
+        say("bos_arama", neden="bos_index")
+        return []
+    try:
+        with aralik("arama"):
+            sonuclar = baglantilar.ara(soru, n, suzgec)
+    except KotaAsildi:
+        raise
+    except Exception as e:
+        say("yutulan_hata", yer="arama")
+        print(f"Arama hatasi ({type(e).__name__}): {e}")
+        return []
+    if not sonuclar:
+        say("bos_arama", neden="eslesme_yok")
+    return sonuclar
+
+
+def ara(soru, n=5, suzgec=None):
+    return ayir(ara_sonuclari(soru, n, suzgec))
+
+
+def istek_hazirla(soru, gecmis, suzgec=None):
+    """Arama, cevap onbellegi kontrolu ve Messages API istegi.
+
+    cevap_al ve sunucu.py'deki asenkron yol ayni adimlari kullanir. Donen
+    sozluk: kaynaklar, onbellekte ((cevap, kaynaklar) veya None), sistem,
+    mesajlar ve cevap onbellege yazilacaksa anahtar ((vektor, kimlikler)).
+    """
+    sonuclar = derle(soru, ara_sonuclari(soru, 5 * ADAY_CARPANI, suzgec), n=5)
+    _, kaynaklar = ayir(sonuclar)
+    hazirlik = {"kaynaklar": kaynaklar, "onbellekte": None, "anahtar": None}
+    # Sadece belgeye dayanan ilk tur cevaplari onbellege alinir; sonraki
+    # turlarin cevabi gecmise de baglidir
+    if not gecmis and sonuclar:
+        try:
+            vektor = baglantilar.arayici().sorgu_vektoru(soru)
+        except Exception as e:
+            say("yutulan_hata", yer="sorgu_vektoru")
+            print(f"Sorgu vektoru alinamadi ({type(e).__name__}): {e}")
+            vektor = None
+        kimlikler = [s["id"] for s in sonuclar]
+        hazirlik["anahtar"] = (vektor, kimlikler)
+        hazirlik["onbellekte"] = cevap_onbellegi().bul(soru, vektor, kimlikler)
+        if hazirlik["onbellekte"]:
+            return hazirlik
+    # Belgeler sistem mesajinda degil son kullanici mesajinda; boylece kisilik
+    # ve gecmis her turda ayni kalir ve saglayici tarafinda onbellekten okunur
+    hazirlik["sistem"] = gecmis.sistem(KISILIK)
+    hazirlik["mesajlar"] = gecmis.mesajlar(soru, baglam_metni(sonuclar))
+    return hazirlik
+
+
+def onbellege_yaz(soru, hazirlik, cevap):
+    if hazirlik["anahtar"] and cevap:
+        vektor, kimlikler = hazirlik["anahtar"]
+        cevap_onbellegi().koy(soru, vektor, kimlikler, cevap, hazirlik["kaynaklar"])
+
+
+def cevap_al(soru, gecmis, suzgec=None):
+    """Cevabi (biriken metin, kaynaklar) ikilileri halinde akitir.
+
+    Arayuzden bagimsizdir; Streamlit uygulamasi ve yuk testi ayni yolu kullanir.
+    """
+    _, client, _ = baglantilar.baglanti()
+    hazirlik = istek_hazirla(soru, gecmis, suzgec)
+    kaynaklar = hazirlik["kaynaklar"]
+    if hazirlik["onbellekte"]:
+        yield from tekrar_oynat(*hazirlik["onbellekte"])
+        return
+    kova("anthropic").al()
+    tam_cevap = ""
+    bas = time.perf_counter()
+    ilk = True
+    with client.messages.stream(model=MODEL, max_tokens=MAKS_TOKEN, system=hazirlik["sistem"],
+                                messages=hazirlik["mesajlar"]) as stream:
+        for text in stream.text_stream:
+            if ilk:
+                kaydet("claude_ilk_token", time.perf_counter() - bas)
+                ilk = False
+            tam_cevap += text
+            yield tam_cevap, kaynaklar
+    kaydet("claude_akis", time.perf_counter() - bas)
+    onbellege_yaz(soru, hazirlik, tam_cevap)
+
+
+async def cevap_al_asenkron(soru, gecmis, client, suzgec=None):
+    """cevap_al'in asenkron karsiligi; yeni metin parcalarini (parca, kaynaklar) olarak akitir.
+
+    Arama ve onbellek (senkron istemciler, yerel indeksler) is parcacigi
+    havuzunda, cevap akisi AsyncAnthropic ile olay dongusunde calisir;
+    boylece akis suresince bir is parcacigi tutulmaz.
+    """
+    hazirlik = await asyncio.to_thread(istek_hazirla, soru, gecmis, suzgec)
+    kaynaklar = hazirlik["kaynaklar"]
+    if hazirlik["onbellekte"]:
+        cevap, kaynaklar = hazirlik["onbellekte"]
+        yield cevap, kaynaklar
+        return
+    # Kota sirasi olay dongusunu tutmadan beklenir
+    bekle = kova("anthropic").ayir()
+    if bekle:
+        await asyncio.sleep(bekle)
+    tam_cevap = ""
+    bas = time.perf_counter()
+    ilk = True
+    async with client.messages.stream(model=MODEL, max_tokens=MAKS_TOKEN, system=hazirlik["sistem"],
+                                      messages=hazirlik["mesajlar"]) as stream:
+        async for text in stream.text_stream:
+            if ilk:
+                kaydet("claude_ilk_token", time.perf_counter() - bas)
+                ilk = False
+            tam_cevap += text
+            yield text, kaynaklar
+    kaydet("claude_akis", time.perf_counter() - bas)
+    await asyncio.to_thread(onbellege_yaz, soru, hazirlik, tam_cevap)
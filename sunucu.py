@@ -0,0 +1,166 @@
+import os
+import json
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+import baglantilar
+import metrikler
+from sohbet import cevap_al_asenkron
+from gecmis_yonetici import SohbetGecmisi
+from belge_bilgisi import istekten
+from trafik import KotaAsildi
+
+load_dotenv()
+
+PORT = int(os.environ.get("PORT", "8000"))
+# Arama ve onbellek (senkron Pinecone/Voyage/LanceDB istemcileri) bu kadar
+# is parcacigiyla calisir; cevap akisi is parcacigi tutmaz
+ARAMA_ISCI = int(os.environ.get("VERGIAI_ARAMA_ISCI", str(baglantilar.HAVUZ_BOYUTU)))
+MAKS_SORU = 4000
+ON_YUZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public")
+SSE_BASLIKLARI = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _hata(mesaj, durum):
+    return JSONResponse({"error": mesaj}, status_code=durum)
+
+
+def _gecmis(turlar):
+    """Istemcinin gonderdigi [{"role", "content"}] listesinden gecmis.
+
+    Sunucu oturum tutmaz; her istek gecmisini kendisi getirir, boylece
+    istekler yuk dengeleyici arkasindaki herhangi bir ornege gidebilir.
+    Butce asilirsa eski turlar ozet cagrisi yapilmadan kisaltilir.
+    """
+    gecmis = SohbetGecmisi()
+    soru = None
+    for mesaj in turlar:
+        if not isinstance(mesaj, dict) or not isinstance(mesaj.get("content"), str):
+            continue
+        if mesaj.get("role") == "user":
+            soru = mesaj["content"]
+        elif mesaj.get("role") == "assistant" and soru is not None:
+            gecmis.turlar.append((soru, mesaj["content"]))
+            soru = None
+    if gecmis.token() > gecmis.butce:
+        gecmis.sikistir()
+    return gecmis
+
+
+def _kaynaklar(kaynaklar):
+    return [{"title": f"{k['belge']} - Sayfa {k['sayfa']}", "belge": k["belge"], "sayfa": k["sayfa"]}
+            for k in kaynaklar]
+
+
+def _olay(ad, veri):
+    return f"event: {ad}\ndata: {json.dumps(veri, ensure_ascii=False)}\n\n"
+
+
+async def _akis(soru, gecmis, client, suzgec):
+    """SSE olaylari: token (yeni metin), sources, done; hata olursa error."""
+    with metrikler.istek("api_sohbet_akis"):
+        kaynaklar = []
+        try:
+            async for parca, kaynaklar in cevap_al_asenkron(soru, gecmis, client, suzgec):
+                yield _olay("token", {"text": parca})
+        except KotaAsildi:
+            metrikler.say("yutulan_hata", yer="api_kota")
+            yield _olay("error", {"error": "rate limited"})
+            return
+        except Exception as e:
+            metrikler.say("yutulan_hata", yer="api_akis")
+            print(f"Cevap akisi kesildi ({type(e).__name__}): {e}")
+            yield _olay("error", {"error": "cevap alinamadi"})
+            return
+        yield _olay("sources", _kaynaklar(kaynaklar))
+        yield _olay("done", {})
+
+
+async def sohbet(request):
+    """POST /api/chat {"message", "history"?, "kanun"?, "tags"?, "sinceDays"?}.
+
+    Varsayilan cevap functions/api/chat.ts ile ayni JSON ({answer, sources});
+    Accept: text/event-stream veya ?stream=1 ile token token SSE akitilir.
+    kanun, tags ve sinceDays aramayi uyan belgelerle sinirlar.
+    """
+    try:
+        govde = await request.json()
+    except (ValueError, UnicodeDecodeError):
+        return _hata("invalid json", 400)
+    soru = govde.get("message") if isinstance(govde, dict) else None
+    if not isinstance(soru, str) or not soru.strip():
+        return _hata("message required", 400)
+    if len(soru) > MAKS_SORU:
+        return _hata("message too long", 413)
+    turlar = govde.get("history") or []
+    if not isinstance(turlar, list) or not all(isinstance(m, dict) for m in turlar):
+        return _hata("history must be a list of messages", 400)
+    gecmis = _gecmis(turlar)
+    suzgec = istekten(govde)
+    client = request.app.state.client or baglantilar.asenkron_client()
+
+    if "text/event-stream" in request.headers.get("accept", "") or request.query_params.get("stream") == "1":
+        return StreamingResponse(_akis(soru.strip(), gecmis, client, suzgec), media_type="text/event-stream",
+                                 headers=SSE_BASLIKLARI)
+
+    with metrikler.istek("api_sohbet"):
+        cevap, kaynaklar = "", []
+        try:
+            async for parca, kaynaklar in cevap_al_asenkron(soru.strip(), gecmis, client, suzgec):
+                cevap += parca
+        except KotaAsildi:
+            metrikler.say("yutulan_hata", yer="api_kota")
+            return _hata("rate limited", 429)
+        except Exception as e:
+            metrikler.say("yutulan_hata", yer="api_sohbet")
+            print(f"Cevap alinamadi ({type(e).__name__}): {e}")
+            return _hata("upstream error", 502)
+    return JSONResponse({"answer": cevap, "sources": _kaynaklar(kaynaklar)})
+
+
+async def ping(request):
+    return JSONResponse({"ok": True})
+
+
+async def metrik(request):
+    return PlainTextResponse(metrikler.metrikler().prometheus(), media_type="text/plain; version=0.0.4")
+
+
+def uygulama_olustur(client=None, on_yuz=ON_YUZ):
+    """ASGI uygulamasi; client verilmezse paylasilan AsyncAnthropic kullanilir."""
+
+    @contextlib.asynccontextmanager
+    async def omur(app):
+        # asyncio.to_thread varsayilan havuzu kullanir; boyutu baglanti havuzuyla uyumlu olsun
+        havuz = ThreadPoolExecutor(max_workers=ARAMA_ISCI, thread_name_prefix="arama")
+        asyncio.get_running_loop().set_default_executor(havuz)
+        # Arayiciyi (BM25 indeksi, depo mmap'i) ilk istek beklemesin
+        try:
+            await asyncio.to_thread(baglantilar.arayici)
+        except Exception as e:
+            print(f"Arayici hazirlanamadi, ilk istekte tekrar denenecek ({type(e).__name__}): {e}")
+        yield
+
+    rotalar = [
+        Route("/api/chat", sohbet, methods=["POST"]),
+        Route("/api/ping", ping),
+        Route("/metrics", metrik),
+    ]
+    if os.path.isdir(on_yuz):
+        rotalar.append(Mount("/", app=StaticFiles(directory=on_yuz, html=True)))
+    app = Starlette(routes=rotalar, lifespan=omur)
+    app.state.client = client
+    return app
+
+
+app = uygulama_olustur()
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=os.environ.get("HOST", "0.0.0.0"), port=PORT)
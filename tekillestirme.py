@@ -0,0 +1,107 @@
+import re
+import zlib
+import random
+from collections import Counter
+from turkce import kelimeler
+
+# Sayfanin basindan/sonundan bakilan satir sayisi ve bir satirin ust/alt
+# bilgi sayilmasi icin gectigi sayfa orani
+BAKILAN_SATIR = 3
+TEKRAR_ORANI = 0.5
+EN_AZ_SAYFA = 3
+# MinHash: IMZA_BOYU = BANT * SATIR; iki parca bir bantta ayni ozeti
+# tasiyorsa aday olur, sonra gercek Jaccard benzerligi ESIK ile karsilastirilir
+KIREMIT = 5
+BANT = 8
+SATIR = 4
+IMZA_BOYU = BANT * SATIR
+ESIK = 0.8
+
+_RAKAM = re.compile(r"\d+")
+_ASAL = (1 << 61) - 1
+_rastgele = random.Random(20240607)
+_PERMUTASYONLAR = [(_rastgele.randrange(1, _ASAL), _rastgele.randrange(0, _ASAL)) for _ in range(IMZA_BOYU)]
+
+
+def _satir_anahtari(satir):
+    # "Sayfa 12 / 80" ile "Sayfa 13 / 80" ayni anahtara iner
+    return _RAKAM.sub("#", " ".join(satir.split()).lower())
+
+
+def _kenar_satirlari(satirlar, bakilan):
+    """Bos olmayan ilk ve son bakilan satirin indisleri."""
+    dolu = [i for i, s in enumerate(satirlar) if s.strip()]
+    return set(dolu[:bakilan] + dolu[-bakilan:])
+
+
+def ust_alt_ayikla(sayfalar, bakilan=BAKILAN_SATIR, oran=TEKRAR_ORANI):
+    """Bir belgenin sayfalarindan tekrarlanan ust/alt bilgi satirlarini atar.
+
+    Sayfalarin ilk ve son bakilan satirindan, rakamlar yok sayildiginda
+    sayfalarin en az orani kadarinda gecenler (sayfa numarasi, belge adi,
+    kurum basligi) silinir. Sayfa numaralari ve siralari degismez.
+    Donen: (yeni sayfalar, silinen satir sayisi).
+    """
+    if len(sayfalar) < EN_AZ_SAYFA:
+        return sayfalar, 0
+    bolunmus = [s["metin"].splitlines() for s in sayfalar]
+    kenarlar = [_kenar_satirlari(satirlar, bakilan) for satirlar in bolunmus]
+    sayac = Counter()
+    for satirlar, kenar in zip(bolunmus, kenarlar):
+        sayac.update({_satir_anahtari(satirlar[i]) for i in kenar})
+    sinir = max(EN_AZ_SAYFA, oran * len(sayfalar))
+    tekrarlanan = {a for a, n in sayac.items() if n >= sinir}
+    if not tekrarlanan:
+        return sayfalar, 0
+    yeni, silinen = [], 0
+    for sayfa, satirlar, kenar in zip(sayfalar, bolunmus, kenarlar):
+        kalan = [s for i, s in enumerate(satirlar) if i not in kenar or _satir_anahtari(s) not in tekrarlanan]
+        silinen += len(satirlar) - len(kalan)
+        yeni.append(dict(sayfa, metin="\n".join(kalan)))
+    return yeni, silinen
+
+
+def _kiremitler(metin, k=KIREMIT):
+    k_ler = kelimeler(metin)
+    if len(k_ler) <= k:
+        return {zlib.crc32(" ".join(k_ler).encode("utf-8"))}
+    return {zlib.crc32(" ".join(k_ler[i:i+k]).encode("utf-8")) for i in range(len(k_ler) - k + 1)}
+
+
+def minhash(kiremitler):
+    return [min((a * h + b) % _ASAL for h in kiremitler) for a, b in _PERMUTASYONLAR]
+
+
+class Tekillestirici:
+    """Neredeyse ayni parcalari eleyen MinHash/LSH suzgeci.
+
+    ekle(metin) parca daha once gorulen bir parcaya ESIK'ten fazla
+    benziyorsa False doner; aksi halde parcayi kaydedip True doner. Ilk
+    gelen parca (ve sayfa bilgisi) kalir. Her belge icin yeni nesne
+    kullanilir; belgeler arasi eleme, alintilanan metnin diger belgedeki
+    kaynak atfini kaybettirirdi.
+    """
+
+    def __init__(self, esik=ESIK):
+        self.esik = esik
+        self.kovalar = [{} for _ in range(BANT)]
+        self.kumeler = []
+        self.atilan = 0
+
+    def ekle(self, metin):
+        kiremitler = _kiremitler(metin)
+        imza = minhash(kiremitler)
+        bantlar = [tuple(imza[b * SATIR:(b + 1) * SATIR]) for b in range(BANT)]
+        adaylar = set()
+        for kova, bant in zip(self.kovalar, bantlar):
+            adaylar.update(kova.get(bant, ()))
+        for i in adaylar:
+            diger = self.kumeler[i]
+            if len(kiremitler & diger) / len(kiremitler | diger) >= self.esik:
+                self.atilan += 1
+                return False
+        sira = len(self.kumeler)
+        self.kumeler.append(kiremitler)
+        for kova, bant in zip(self.kovalar, bantlar):
+            kova.setdefault(bant, []).append(sira)
+        return True
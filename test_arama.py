@@ -0,0 +1,17 @@
+"""arama: sonuc listelerinin RRF ile birlestirilmesi."""
+import pytest
+
+from arama import rrf_birlestir
+
+
+def _sonuc(kimlik):
+    return {"id": kimlik, "metin": kimlik, "belge": "kdv", "sayfa": 1, "puan": 1.0}
+
+
+def test_rrf_iki_listede_gecen_one_cikar():
+    a = [_sonuc("x"), _sonuc("y"), _sonuc("z")]
+    b = [_sonuc("z"), _sonuc("w")]
+    birlesik = rrf_birlestir([a, b], n=3)
+    assert [s["id"] for s in birlesik][:2] == ["z", "x"]
+    assert len(birlesik) == 3
+    assert birlesik[0]["puan"] == pytest.approx(1 / 63 + 1 / 61)
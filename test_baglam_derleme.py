@@ -0,0 +1,43 @@
+"""baglam_derleme: MMR secimi ve soruya gore paketleme."""
+from baglam_derleme import mmr_sec, paketle
+from turkce import token_tahmini
+
+
+def _sonuc(kimlik, metin, puan=1.0, vektor=None, belge="kdv", sayfa=1):
+    s = {"id": kimlik, "metin": metin, "belge": belge, "sayfa": sayfa, "puan": puan}
+    if vektor is not None:
+        s["vektor"] = vektor
+    return s
+
+
+def test_mmr_gomme_varsa_kopyayi_atlar():
+    sonuclar = [
+        _sonuc("a", "kdv iadesi", 0.9, [1.0, 0.0, 0.0]),
+        _sonuc("b", "kdv iadesi tekrar", 0.89, [0.99, 0.01, 0.0]),
+        _sonuc("c", "ihracat istisnasi", 0.7, [0.0, 1.0, 0.0]),
+    ]
+    assert [s["id"] for s in mmr_sec(sonuclar, 2, lam=0.5)] == ["a", "c"]
+
+
+def test_mmr_gomme_yoksa_kok_vektorleri_kullanir():
+    sonuclar = [
+        _sonuc("a", "katma değer vergisi iadesi", 0.9),
+        _sonuc("b", "katma değer vergisi iadesi", 0.89),
+        _sonuc("c", "gelir vergisi stopajı", 0.7),
+        # Gommesi olan aday gommesi olmayanla kok vektoruyle karsilastirilir
+        _sonuc("d", "katma değer vergisi iadesi", 0.6, [1.0, 0.0]),
+    ]
+    assert [s["id"] for s in mmr_sec(sonuclar, 2, lam=0.5)] == ["a", "c"]
+    assert len(mmr_sec(sonuclar, 10)) == 4
+
+
+def test_paketle_butceye_sigar_ve_gommeyi_atar():
+    metin = "Vergi indirimi: " + " ".join(f"Cümle {i} genel bir açıklamadır." for i in range(30)) + \
+        " İhracat teslimlerinde iade yapılır."
+    sonuclar = [_sonuc("a", metin, vektor=[1.0], sayfa=7), _sonuc("b", metin, belge="gvk", sayfa=2)]
+    paket = paketle("ihracat iade", sonuclar, butce=40)
+    assert sum(token_tahmini(s["metin"]) for s in paket) <= 40 + 10
+    assert all("vektor" not in s for s in paket)
+    assert (paket[0]["belge"], paket[0]["sayfa"]) == ("kdv", 7)
+    assert "İhracat teslimlerinde iade yapılır." in paket[0]["metin"]
+    assert "[...]" in paket[0]["metin"]
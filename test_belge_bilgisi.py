@@ -0,0 +1,34 @@
+"""belge_bilgisi: belge bilgisi cikarimi, elle girilen alanlar ve Suzgec."""
+import datetime
+
+from belge_bilgisi import belge_bilgisi, gun_oncesi, istekten, tarih_sayisi, Suzgec
+
+ILK_SAYFA = [{"sayfa_no": 1, "metin": "KATMA DEĞER VERGİSİ KANUNU\nResmi Gazete Tarihi: 02.11.1984"}]
+
+
+def test_metinden_kanun_ve_tarih():
+    bilgi = belge_bilgisi("kdv_kanunu", ILK_SAYFA)
+    assert bilgi == {"kanun": "KDV", "yayim": 19841102, "etiketler": ["kdv", "kanun"]}
+
+
+def test_elle_girilen_kanun_buyuk_harfe_cevrilir():
+    bilgi = belge_bilgisi("kdvira_kilavuzu", ILK_SAYFA, {"kanun": "kdv", "etiketler": ["İade"]})
+    assert bilgi["kanun"] == "KDV"
+    assert bilgi["etiketler"] == ["kdv", "kanun", "iade"]
+    assert Suzgec(kanun=["kdv"]).uyar("kdvira_kilavuzu", bilgi)
+
+
+def test_iso_olmayan_yayim_bos_sayilir(capsys):
+    assert tarih_sayisi("01.03.2024") == 0
+    assert "Tarih okunamadi" in capsys.readouterr().out
+    assert tarih_sayisi("2024-03-01") == 20240301
+    assert belge_bilgisi("x", ILK_SAYFA, {"yayim": "01.03.2024"})["yayim"] == 0
+
+
+def test_since_days_sinirlanir():
+    bugun = datetime.date(2024, 3, 1)
+    assert gun_oncesi(10, bugun) == 20240220
+    assert gun_oncesi(10 ** 12, bugun) > 0
+    assert istekten({"sinceDays": 10 ** 12}).tarihten > 0
+    assert istekten({"sinceDays": True}) is None
+    assert istekten({}) is None
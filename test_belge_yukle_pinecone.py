@@ -0,0 +1,27 @@
+"""belge_yukle_pinecone: batch'leme ve ilk surumden kalan konumsal kimliklerin silinmesi."""
+import os
+
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("VOYAGE_API_KEY", "test")
+
+import belge_yukle_pinecone as yukleme  # noqa: E402
+from sahte_servisler import SahteIndex  # noqa: E402
+
+
+def test_konumsal_kimlikler_silinir_icerik_kimlikleri_kalir():
+    index = SahteIndex()
+    index.upsert([{"id": f"doc_{i}", "values": [1.0, 0.0], "metadata": {}} for i in range(250)])
+    index.upsert([{"id": "a3f9c1", "values": [0.0, 1.0], "metadata": {}}])
+    assert yukleme.konumsallari_sil(index) == 250
+    assert index.kimlikler == ["a3f9c1"]
+    assert yukleme.konumsallari_sil(index) == 0
+
+
+
+def test_batchle_token_ve_metin_sinirina_uyar():
+    parcalar = [(str(i), {"metin": "ş" * 700}) for i in range(100)]
+    batchler = list(yukleme.batchle(parcalar, token_siniri=5000))
+    assert [k for b in batchler for k, _ in b] == [str(i) for i in range(100)]
+    assert all(sum(yukleme.token_tahmini(p["metin"]) * yukleme.TOKEN_PAYI for _, p in b) <= 5000 for b in batchler)
+    # Siniri tek basina asan parca kendi batch'inde gider
+    assert list(yukleme.batchle([("a", {"metin": "x" * 50000})], token_siniri=100)) == [[("a", {"metin": "x" * 50000})]]
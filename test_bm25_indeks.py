@@ -0,0 +1,14 @@
+"""bm25_indeks: ters indeks ve BM25 puanlamasi."""
+from bm25_indeks import BM25Indeks
+
+
+def test_bm25_birebir_terimi_one_alir():
+    indeks = BM25Indeks.olustur([
+        {"belge": "kdv", "sayfa": 1, "metin": "ihracat istisnası ve iade"},
+        {"belge": "gvk", "sayfa": 3, "metin": "ücret gelirleri stopaj"},
+        {"belge": "gvk", "sayfa": 4, "metin": "serbest meslek kazancı ve stopaj oranı"},
+    ])
+    bulunan = indeks.ara("stopaj oranı", n=2)
+    assert [p["sayfa"] for _, p in bulunan] == [4, 3]
+    assert bulunan[0][0] > bulunan[1][0]
+    assert indeks.ara("olmayan kelime") == []
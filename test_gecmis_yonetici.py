@@ -0,0 +1,14 @@
+"""gecmis_yonetici: butceli sohbet gecmisi ve sikistirma."""
+from gecmis_yonetici import SohbetGecmisi
+
+
+def test_sohbet_gecmisi_butceyi_asinca_ozetler():
+    gecmis = SohbetGecmisi(client=None, butce=200)
+    for i in range(10):
+        gecmis.ekle(f"soru {i} " + "a" * 50, f"cevap {i} " + "b" * 80)
+    assert gecmis.token() <= 200
+    assert gecmis.turlar[-1][0].startswith("soru 9")
+    assert "soru 0" in gecmis.ozet
+    mesajlar = gecmis.mesajlar("yeni soru")
+    assert mesajlar[-1]["role"] == "user" and len(mesajlar) == 2 * len(gecmis) + 1
+    assert len(gecmis.sistem("kisilik")) == 2
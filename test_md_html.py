@@ -0,0 +1,25 @@
+"""md_html: akan cevabin artimli HTML'e cevrilmesi."""
+from md_html import md_to_html, AkisIsleyici
+
+
+CEVAP = """# Başlık
+
+KDV **iadesi** için:
+
+- ihracat
+- tevkifat
+1. dilekçe
+
+Sonuç *paragrafı*
+ikinci satır.
+
+---
+## Not
+
+Son."""
+
+
+def test_akis_isleyici_md_to_html_ile_ayni():
+    isleyici = AkisIsleyici()
+    for i in range(1, len(CEVAP) + 1):
+        assert isleyici.guncelle(CEVAP[:i]) == md_to_html(CEVAP[:i])
@@ -0,0 +1,21 @@
+"""parcalayici: mevzuat yapisina gore parcalama."""
+from parcalayici import parcala, MAKS_TOKEN
+from turkce import token_tahmini
+
+
+def test_parcala_madde_sinirlarindan_boler():
+    sayfalar = [
+        {"sayfa_no": 1, "metin": "Madde 1 – Teslim ve hizmet işlemleri katma değer vergisine tabidir. " * 3},
+        {"sayfa_no": 2, "metin": "Madde 2 – İhracat teslimleri vergiden istisnadır. " * 40},
+    ]
+    parcalar = parcala(sayfalar, min_token=10)
+    assert [p["madde"] for p in parcalar][:2] == ["1", "2"]
+    assert parcalar[0]["sayfa"] == 1 and parcalar[1]["sayfa"] == 2
+    # Uzun madde bolunur, devam parcalari maddesini tasir
+    devam = [p for p in parcalar if p["madde"] == "2"][1:]
+    assert devam and all(p["metin"].startswith("[Madde 2") for p in devam)
+    assert all(token_tahmini(p["metin"]) <= MAKS_TOKEN + 20 for p in parcalar)
+
+
+def test_parcala_bos_sayfa():
+    assert parcala([{"sayfa_no": 1, "metin": ""}]) == []
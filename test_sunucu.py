@@ -0,0 +1,23 @@
+"""sunucu: /api/chat istek dogrulamasi (cevap uretilmeden donen hatalar)."""
+import pytest
+from starlette.testclient import TestClient
+
+from sunucu import uygulama_olustur
+
+
+@pytest.fixture
+def istemci():
+    # Yasam dongusu (arayici isinmasi) calistirilmaz; dogrulama ondan once biter
+    return TestClient(uygulama_olustur(client=object(), on_yuz=""))
+
+
+@pytest.mark.parametrize("gecmis", [5, "merhaba", {"role": "user"}, [1, 2], [["user", "soru"]]])
+def test_gecmis_liste_degilse_400(istemci, gecmis):
+    yanit = istemci.post("/api/chat", json={"message": "KDV oranı nedir?", "history": gecmis})
+    assert yanit.status_code == 400
+    assert "history" in yanit.json()["error"]
+
+
+def test_soru_yoksa_400(istemci):
+    assert istemci.post("/api/chat", json={"history": []}).status_code == 400
+    assert istemci.post("/api/chat", content=b"{").status_code == 400
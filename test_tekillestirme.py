@@ -0,0 +1,11 @@
+"""tekillestirme: neredeyse ayni parcalarin elenmesi."""
+from tekillestirme import Tekillestirici
+
+
+def test_tekillestirici_neredeyse_ayniyi_atar():
+    tekil = Tekillestirici()
+    metin = " ".join(f"kelime{i}" for i in range(60))
+    assert tekil.ekle(metin)
+    assert not tekil.ekle(metin + " ek")
+    assert tekil.ekle(" ".join(f"baska{i}" for i in range(60)))
+    assert tekil.atilan == 1
@@ -0,0 +1,123 @@
+"""trafik: kota kovasi, tek ucus, yeniden deneme ve KotaAsildi'nin iletilmesi."""
+import threading
+import time
+
+import pytest
+
+import baglantilar
+import trafik
+from arama import HibritArayici
+from sohbet import ara_sonuclari
+from trafik import Kova, KotaAsildi, TekUcus, yeniden_dene
+
+
+class _Arayici:
+    def __init__(self, sonuclar=(), hata=None):
+        self.sonuclar = list(sonuclar)
+        self.hata = hata
+
+    def ara(self, soru, n=5, suzgec=None):
+        if self.hata:
+            raise self.hata
+        return self.sonuclar
+
+
+def test_kova_sirada_bekletir_ve_uzun_sirada_reddeder():
+    kova = Kova("deneme", dakika=60, kapasite=2, azami=1.5)
+    assert kova.ayir() == 0 and kova.ayir() == 0
+    assert kova.ayir() == pytest.approx(1.0, abs=0.05)
+    with pytest.raises(KotaAsildi):
+        kova.ayir()
+
+
+def test_kova_sinirsiz():
+    kova = Kova("deneme", dakika=0)
+    assert all(kova.ayir() == 0 for _ in range(100))
+
+
+def test_kota_asildi_tekrar_denenmez(monkeypatch):
+    monkeypatch.setattr(trafik.time, "sleep", lambda sn: None)
+    cagrilar = []
+
+    def dolu():
+        cagrilar.append(1)
+        raise KotaAsildi("dolu")
+
+    with pytest.raises(KotaAsildi):
+        yeniden_dene(dolu)
+    assert len(cagrilar) == 1
+
+
+def test_gecici_hata_tekrar_denenir(monkeypatch):
+    monkeypatch.setattr(trafik.time, "sleep", lambda sn: None)
+    cagrilar = []
+
+    def bazen():
+        cagrilar.append(1)
+        if len(cagrilar) < 3:
+            raise ConnectionError("koptu")
+        return "tamam"
+
+    assert yeniden_dene(bazen) == "tamam"
+    assert len(cagrilar) == 3
+
+
+def test_tek_ucus_eszamanli_cagrilari_birlestirir(monkeypatch):
+    ucus = TekUcus("deneme")
+    basladi, birak = threading.Event(), threading.Event()
+    cagrilar, sonuclar, bekleyen = [], [], []
+    # Izleyenler beklemeye gecmeden once "tek_ucus" sayaci artar
+    monkeypatch.setattr(trafik, "say", lambda ad, **etiket: bekleyen.append(ad))
+
+    def islem():
+        cagrilar.append(1)
+        basladi.set()
+        birak.wait(5)
+        return "sonuc"
+
+    lider = threading.Thread(target=lambda: sonuclar.append(ucus.yap("a", islem)))
+    lider.start()
+    basladi.wait(5)
+    izleyenler = [threading.Thread(target=lambda: sonuclar.append(ucus.yap("a", islem))) for _ in range(3)]
+    for t in izleyenler:
+        t.start()
+    while len(bekleyen) < 3:
+        time.sleep(0.01)
+    birak.set()
+    for t in [lider] + izleyenler:
+        t.join(5)
+    assert sonuclar == ["sonuc"] * 4
+    assert len(cagrilar) == 1
+    # Islem bitince anahtar birakilir
+    assert ucus.yap("a", lambda: "yeni") == "yeni"
+
+
+def test_tek_ucus_hatayi_iletir():
+    ucus = TekUcus("deneme")
+    with pytest.raises(ValueError):
+        ucus.yap("a", lambda: (_ for _ in ()).throw(ValueError("bozuk")))
+    assert ucus.ucuslar == {}
+
+
+def test_arama_kota_hatasini_yutmaz(monkeypatch):
+    monkeypatch.setattr(baglantilar, "kayit_sayisi", lambda: 10)
+
+    def dolu(soru, n, suzgec):
+        raise KotaAsildi("voyage kotasi dolu")
+
+    monkeypatch.setattr(baglantilar, "ara", dolu)
+    with pytest.raises(KotaAsildi):
+        ara_sonuclari("kdv iadesi")
+    # Diger hatalar bos sonuca doner
+    monkeypatch.setattr(baglantilar, "ara", lambda soru, n, suzgec: 1 / 0)
+    assert ara_sonuclari("kdv iadesi") == []
+
+
+def test_hibrit_vektor_kotasi_dolunca_bm25_ile_devam_eder():
+    bulunan = {"id": "a", "metin": "kdv", "belge": "kdv", "sayfa": 1, "puan": 3.0}
+    hibrit = HibritArayici(_Arayici([bulunan]), _Arayici(hata=KotaAsildi("dolu")))
+    assert [s["id"] for s in hibrit.ara("kdv")] == ["a"]
+    # BM25 de bos donerse bos cevap yerine kota hatasi iletilir
+    hibrit = HibritArayici(_Arayici(), _Arayici(hata=KotaAsildi("dolu")))
+    with pytest.raises(KotaAsildi):
+        hibrit.ara("kdv")
@@ -0,0 +1,166 @@
+import os
+import time
+import random
+import threading
+from metrikler import kaydet, say
+
+YENIDEN_DENEME = 6
+# Durum kodu tasimayan ama gecici olan istemci hatalari
+GECICI_HATALAR = {"APIConnectionError", "Timeout", "TryAgain", "ServiceUnavailableError",
+                  "ServerError", "RateLimitError", "PineconeProtocolError"}
+# Surec basina dakikadaki istek kotasi; hesabin kademesine gore ortamdan verilir.
+# Verilmezse (0) sinirlanmaz. Tum oturumlar ayni kovayi paylasir
+KOTALAR = {
+    "anthropic": int(os.environ.get("VERGIAI_ANTHROPIC_RPM", "0")),
+    "voyage": int(os.environ.get("VERGIAI_VOYAGE_RPM", "0")),
+}
+# Kota dolunca cagri en fazla bu kadar sirada bekler; daha uzun sira varsa KotaAsildi
+AZAMI_BEKLEME = float(os.environ.get("VERGIAI_KOTA_BEKLEME", "10"))
+
+
+def _gecici_mi(hata):
+    """429, 5xx ve baglanti hatalari tekrar denenir; digerleri (400, 401...) denenmez."""
+    durum = getattr(hata, "http_status", None) or getattr(hata, "status", None) or getattr(hata, "status_code", None)
+    if durum is not None:
+        try:
+            durum = int(durum)
+        except (TypeError, ValueError):
+            durum = None
+        if durum is not None:
+            return durum == 429 or durum >= 500
+    return isinstance(hata, (ConnectionError, TimeoutError)) or type(hata).__name__ in GECICI_HATALAR
+
+
+def yeniden_dene(islem, deneme=YENIDEN_DENEME, taban=1.0, tavan=60.0):
+    """islem()'i gecici hatalarda ustel bekleme (ve rastgele sapma) ile tekrarlar.
+
+    Sunucu Retry-After bildirirse en az o kadar beklenir. Son denemenin ya da
+    gecici olmayan bir hatanin istisnasi aynen yukari iletilir.
+    """
+    for i in range(deneme):
+        try:
+            return islem()
+        except Exception as e:
+            if i == deneme - 1 or not _gecici_mi(e):
+                raise
+            bekle = min(tavan, taban * 2 ** i) * random.uniform(0.5, 1.0)
+            basliklar = getattr(e, "headers", None) or {}
+            try:
+                bekle = max(bekle, float(basliklar.get("retry-after", 0)))
+            except (TypeError, ValueError, AttributeError):
+                pass
+            print(f"  Gecici hata ({type(e).__name__}), {bekle:.1f} sn sonra tekrar denenecek")
+            time.sleep(bekle)
+
+
+class KotaAsildi(RuntimeError):
+    """Kota dolu; cagri AZAMI_BEKLEME'den uzun sirada bekleyecekti.
+
+    Gecici hata sayilmaz; yeniden_dene tekrar denemez, yoksa reddedilen
+    cagri kovaya yeniden yuklenirdi.
+    """
+
+
+class Kova:
+    """Token kovasi: dakikada `dakika` istek, en fazla `kapasite` istekli ani yuk.
+
+    Her cagri gonderim anini ayirir ve o ana kadar bekler; kota dolunca
+    istekler hata almak yerine gelis sirasiyla gonderilir. Sira azami'den
+    uzunsa ayirma yapilmaz ve KotaAsildi atilir.
+    """
+
+    def __init__(self, ad, dakika, kapasite=None, azami=AZAMI_BEKLEME):
+        self.ad = ad
+        self.hiz = dakika / 60.0
+        self.kapasite = kapasite or max(1, dakika // 10)
+        self.azami = azami
+        self.jeton = float(self.kapasite)
+        self.zaman = time.monotonic()
+        self.kilit = threading.Lock()
+
+    def ayir(self, n=1):
+        """n istek ayirir; gondermeden once beklenecek saniyeyi dondurur."""
+        if self.hiz <= 0:
+            return 0.0
+        with self.kilit:
+            simdi = time.monotonic()
+            self.jeton = min(self.kapasite, self.jeton + (simdi - self.zaman) * self.hiz)
+            self.zaman = simdi
+            bekle = max(0.0, (n - self.jeton) / self.hiz)
+            if bekle > self.azami:
+                say("kota_asimi", servis=self.ad)
+                raise KotaAsildi(f"{self.ad} kotasi dolu, sira {bekle:.1f} sn")
+            # Eksi jeton siradaki istekleri gosterir
+            self.jeton -= n
+        if bekle:
+            say("kota_bekleme", servis=self.ad)
+            kaydet(f"kota_{self.ad}", bekle)
+        return bekle
+
+    def al(self, n=1):
+        """Sira gelene kadar bekler (asenkron kodda ayir() ve asyncio.sleep kullanilir)."""
+        bekle = self.ayir(n)
+        if bekle:
+            time.sleep(bekle)
+
+
+class _Ucus:
+    def __init__(self):
+        self.bitti = threading.Event()
+        self.sonuc = None
+        self.hata = None
+
+
+class TekUcus:
+    """Ayni anahtarla eszamanli gelen cagrilari tek cagriya indirir.
+
+    Ilk gelen islemi calistirir; o bitene kadar ayni anahtarla gelenler
+    bekleyip ayni sonucu (ya da ayni hatayi) alir. Islem bitince anahtar
+    birakilir; sonuc saklanmaz, saklamak onbelleklerin isidir.
+    """
+
+    def __init__(self, ad):
+        self.ad = ad
+        self.kilit = threading.Lock()
+        self.ucuslar = {}
+
+    def yap(self, anahtar, islem):
+        with self.kilit:
+            ucus = self.ucuslar.get(anahtar)
+            lider = ucus is None
+            if lider:
+                ucus = self.ucuslar[anahtar] = _Ucus()
+        if not lider:
+            say("tek_ucus", yer=self.ad)
+            ucus.bitti.wait()
+            if ucus.hata is not None:
+                raise ucus.hata
+            return ucus.sonuc
+        try:
+            ucus.sonuc = islem()
+            return ucus.sonuc
+        except BaseException as e:
+            ucus.hata = e
+            raise
+        finally:
+            with self.kilit:
+                del self.ucuslar[anahtar]
+            ucus.bitti.set()
+
+
+_kilit = threading.Lock()
+_kovalar = {}
+
+
+def kova(ad):
+    """Surec genelinde paylasilan kova; kotasi KOTALAR'dan."""
+    with _kilit:
+        if ad not in _kovalar:
+            _kovalar[ad] = Kova(ad, KOTALAR.get(ad, 0))
+        return _kovalar[ad]
+
+
+def kota_ayarla(ad, dakika, kapasite=None):
+    """Kovayi yeni kotayla degistirir; yuk testi ve kiyaslama icindir (0 sinirsiz)."""
+    with _kilit:
+        _kovalar[ad] = Kova(ad, dakika, kapasite)
@@ -0,0 +1,44 @@
+import re
+import unicodedata
+
+# "I".lower() -> "i" ve "İ".lower() -> "i̇" (noktali birlesik karakter) verir;
+# Turkcede dogrusu I -> ı ve İ -> i
+_BUYUK_I = str.maketrans({"I": "ı", "İ": "i"})
+_ASCII = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_KELIME = re.compile(r"\w+")
+KOK_UZUNLUGU = 5
+# Turkce metinde token basina ortalama karakter (kaba tahmin)
+KARAKTER_BASINA_TOKEN = 3.5
+
+
+def kucult(metin):
+    """Turkce kurallarina gore kucuk harfe cevirir."""
+    return unicodedata.normalize("NFC", metin).translate(_BUYUK_I).lower()
+
+
+def katla(metin):
+    """Kucuk harfe cevirip Turkce karakterleri ASCII karsiliklarina indirger.
+
+    Kullanicilar cogu zaman "orani" yazar, belgede "oranı" gecer; ikisi de
+    ayni bicime iner.
+    """
+    return kucult(metin).translate(_ASCII)
+
+
+def kelimeler(metin):
+    """Katlanmis metni kelimelere ayirir."""
+    return _KELIME.findall(katla(metin))
+
+
+def tokenlar(metin):
+    """Arama icin tokenlar: kelimelerin ilk KOK_UZUNLUGU harfi.
+
+    Eklemeli Turkcede sabit uzunlukta kesme ("vergisinin" -> "vergi")
+    basit ve etkili bir kok bulma yontemidir; sayilar oldugu gibi kalir.
+    """
+    return [k if k.isdigit() else k[:KOK_UZUNLUGU] for k in kelimeler(metin) if len(k) > 1 or k.isdigit()]
+
+
+def token_tahmini(metin):
+    """Model token sayisinin kaba tahmini; sayac cagirmadan butce hesabi icin."""
+    return int(len(metin) / KARAKTER_BASINA_TOKEN) + 1
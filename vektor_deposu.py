@@ -0,0 +1,260 @@
+import os
+import json
+import mmap
+import shutil
+import threading
+import numpy as np
+from indeks_manifest import parca_kimligi
+
+DEPO_YOLU = "./veritabani/vektorler"
+SURUM = 1
+# int8 (float32'nin ceyregi, satir basina olcekli; puan hatasi ~1e-3) veya
+# float16 (yarisi, hata ~1e-5). numpy'da int8 -> float32 donusumu float16'dan
+# belirgin hizli oldugu icin varsayilan int8
+TUR = os.environ.get("VERGIAI_DEPO_TURU", "int8")
+# Arama matrisi bu kadar satirlik bloklarla float32'ye cevrilir; gecici dizi
+# islemci onbellegine sigar ve tepe bellek depo boyutundan bagimsiz kalir
+BLOK = 512
+_KAYIT = np.dtype([("belge", "<i4"), ("sayfa", "<i4"), ("bas", "<i8"), ("uzunluk", "<i4")])
+
+
+def _dosya(klasor, ad):
+    return os.path.join(klasor, ad)
+
+
+def nicemle(matris, tur):
+    """Birim uzunluga getirilmis float32 satirlari (vektorler, olcekler) olarak sikistirir."""
+    if tur == "float16":
+        return matris.astype(np.float16), None
+    if tur != "int8":
+        raise ValueError(f"Bilinmeyen depo turu: {tur} (float16 veya int8 olmali)")
+    olcek = np.abs(matris).max(axis=1) / 127.0
+    olcek[olcek == 0] = 1.0
+    return np.round(matris / olcek[:, None]).astype(np.int8), olcek.astype(np.float32)
+
+
+def _birim(matris):
+    matris = np.asarray(matris, dtype=np.float32)
+    normlar = np.linalg.norm(matris, axis=-1, keepdims=True)
+    normlar[normlar == 0] = 1.0
+    return matris / normlar
+
+
+class VektorDeposu:
+    """Diskteki gomme deposu; dosyalar belleğe kopyalanmadan mmap ile acilir.
+
+    Klasorde bilgi.json (model, boyut, tur, belge adlari ve belge bilgileri), vektorler.npy
+    (n x boyut float16/int8), int8 icin olcekler.npy, kayitlar.npy (belge
+    numarasi, sayfa, metnin bayt konumu ve uzunlugu) ve metinler.bin
+    (UTF-8 metinler art arda) bulunur. Puan, Pinecone'un cosine metrigiyle
+    ayni olcekte kosinus benzerligidir.
+    """
+
+    def __init__(self, klasor=DEPO_YOLU):
+        self.klasor = klasor
+        with open(_dosya(klasor, "bilgi.json"), encoding="utf-8") as f:
+            self.bilgi = json.load(f)
+        if self.bilgi.get("surum") != SURUM:
+            raise ValueError(f"Desteklenmeyen vektor deposu surumu: {self.bilgi.get('surum')}")
+        self.model = self.bilgi["model"]
+        self.belgeler = self.bilgi["belgeler"]
+        self.bilgiler = self.bilgi.get("bilgiler", {})
+        self.adet = self.bilgi["adet"]
+        self.vektorler = np.load(_dosya(klasor, "vektorler.npy"), mmap_mode="r")
+        self.kayitlar = np.load(_dosya(klasor, "kayitlar.npy"), mmap_mode="r")
+        self.olcekler = None
+        if self.bilgi["tur"] == "int8":
+            self.olcekler = np.load(_dosya(klasor, "olcekler.npy"), mmap_mode="r")
+        self.metinler = b""
+        if os.path.getsize(_dosya(klasor, "metinler.bin")):
+            with open(_dosya(klasor, "metinler.bin"), "rb") as f:
+                self.metinler = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return self.adet
+
+    def metin(self, i):
+        k = self.kayitlar[i]
+        return self.metinler[int(k["bas"]):int(k["bas"]) + int(k["uzunluk"])].decode("utf-8")
+
+    def kayit(self, i):
+        k = self.kayitlar[i]
+        return {"belge": self.belgeler[int(k["belge"])], "sayfa": int(k["sayfa"]), "metin": self.metin(i)}
+
+    def satirlar(self, suzgec):
+        """Suzgece uyan belgelerin satir numaralari; suzgec bossa None (tum satirlar)."""
+        if not suzgec:
+            return None
+        izinli = [i for i, b in enumerate(self.belgeler) if suzgec.uyar(b, self.bilgiler.get(b))]
+        return np.flatnonzero(np.isin(self.kayitlar["belge"], izinli))
+
+    def puanlar(self, vektor, satirlar=None):
+        """Sorgunun tum satirlarla (veya yalnizca verilen satirlarla) kosinus benzerligi."""
+        q = _birim(vektor)
+        adet = self.adet if satirlar is None else len(satirlar)
+        puanlar = np.empty(adet, dtype=np.float32)
+        for bas in range(0, adet, BLOK):
+            if satirlar is None:
+                blok = self.vektorler[bas:bas + BLOK]
+            else:
+                blok = self.vektorler[satirlar[bas:bas + BLOK]]
+            puanlar[bas:bas + BLOK] = np.asarray(blok, dtype=np.float32) @ q
+        if self.olcekler is not None:
+            puanlar *= self.olcekler if satirlar is None else self.olcekler[satirlar]
+        return puanlar
+
+    def ara(self, vektor, n=5, satirlar=None):
+        """En yakin n satir: [(puan, satir numarasi)], puana gore azalan.
+
+        satirlar verilirse (bkz. satirlar()) yalnizca o satirlar puanlanir.
+        """
+        puanlar = self.puanlar(vektor, satirlar) if self.adet else []
+        if not len(puanlar):
+            return []
+        k = min(n, len(puanlar))
+        en_iyi = np.argpartition(-puanlar, k - 1)[:k]
+        en_iyi = en_iyi[np.argsort(-puanlar[en_iyi])]
+        sira = en_iyi if satirlar is None else satirlar[en_iyi]
+        return [(float(puanlar[i]), int(j)) for i, j in zip(en_iyi, sira)]
+
+
+# {klasor: (mtime, depo)}
+_onbellek = {}
+_kilit = threading.Lock()
+
+
+def depo_al(klasor=DEPO_YOLU):
+    """Depoyu surec basina bir kez acar; yeniden yazilinca tekrar acar. Yoksa None."""
+    try:
+        mtime = os.path.getmtime(_dosya(klasor, "bilgi.json"))
+    except OSError:
+        return None
+    with _kilit:
+        kayit = _onbellek.get(klasor)
+        if kayit is None or kayit[0] != mtime:
+            kayit = _onbellek[klasor] = (mtime, VektorDeposu(klasor))
+        return kayit[1]
+
+
+class DepoYazici:
+    """Mevcut depoyu yeni gommelerle birlestirip yeniden yazar.
+
+    Mevcut depodaki parcalar kimlikleriyle (parca_kimligi) taninir, yeniden
+    gomulmez. ekle() yukleme is parcaciklarindan cagrilabilir; kaydet()
+    once gecici klasore yazar, sonra eski klasorle yer degistirir.
+    bilgiler[belge] belge bilgisidir (belge_bilgisi); yeniden gomulmeyen
+    parcalarin belgeleri icin de guncellenebilir.
+    """
+
+    def __init__(self, model, klasor=DEPO_YOLU, tur=TUR, sifirdan=False):
+        self.model = model
+        self.klasor = klasor
+        self.tur = tur
+        self.kilit = threading.Lock()
+        self.yeni = []  # (kimlik, belge, sayfa, metin, vektor)
+        self.eski = None
+        self.eski_sira = {}
+        self.eski_belgeler = {}
+        self.bilgiler = {}
+        eski = None if sifirdan else depo_al(klasor)
+        if eski is not None and eski.model == model:
+            self.eski = eski
+            self.bilgiler.update(eski.bilgiler)
+            for i in range(len(eski)):
+                k = eski.kayit(i)
+                kimlik = parca_kimligi(k["belge"], k["sayfa"], k["metin"])
+                self.eski_sira[kimlik] = i
+                self.eski_belgeler[kimlik] = k["belge"]
+        elif eski is not None:
+            print(f"Vektor deposu {eski.model} ile olusturulmus, {model} ile yeniden olusturulacak.")
+
+    def __contains__(self, kimlik):
+        return kimlik in self.eski_sira
+
+    def ekle(self, batch, vektorler):
+        """batch: (kimlik, {"belge", "sayfa", "metin"[, kanun, yayim, etiketler]}) ciftleri, vektorler: gommeler."""
+        with self.kilit:
+            for (kimlik, parca), vektor in zip(batch, vektorler):
+                self.yeni.append((kimlik, parca["belge"], int(parca["sayfa"]), parca["metin"],
+                                  np.asarray(vektor, dtype=np.float32)))
+                if "kanun" in parca:
+                    self.bilgiler[parca["belge"]] = {k: parca[k] for k in ("kanun", "yayim", "etiketler")}
+
+    def kaydet(self, silinecek=()):
+        """Eski parcalardan silinecek olmayanlari ve yenileri yazar; satir sayisini dondurur."""
+        silinecek = set(silinecek)
+        eski = [i for k, i in self.eski_sira.items() if k not in silinecek]
+        eski.sort()
+        yeni = {k: (b, s, m, v) for k, b, s, m, v in self.yeni if k not in self.eski_sira}
+        adet = len(eski) + len(yeni)
+        boyut = self.eski.vektorler.shape[1] if self.eski is not None else \
+            (len(next(iter(yeni.values()))[3]) if yeni else 0)
+
+        gecici = self.klasor + ".yeni"
+        shutil.rmtree(gecici, ignore_errors=True)
+        os.makedirs(gecici)
+        belgeler, belge_no = [], {}
+        kayitlar = np.zeros(adet, dtype=_KAYIT)
+        vektor_turu = np.float16 if self.tur == "float16" else np.int8
+        vektor_dosyasi = np.lib.format.open_memmap(_dosya(gecici, "vektorler.npy"), mode="w+",
+                                                   dtype=vektor_turu, shape=(adet, boyut))
+        olcekler = np.ones(adet, dtype=np.float32)
+        konum = 0
+
+        with open(_dosya(gecici, "metinler.bin"), "wb") as metin_dosyasi:
+            def satir_yaz(j, belge, sayfa, metin):
+                nonlocal konum
+                if belge not in belge_no:
+                    belge_no[belge] = len(belgeler)
+                    belgeler.append(belge)
+                veri = metin.encode("utf-8")
+                metin_dosyasi.write(veri)
+                kayitlar[j] = (belge_no[belge], sayfa, konum, len(veri))
+                konum += len(veri)
+
+            for bas in range(0, len(eski), BLOK):
+                satirlar = eski[bas:bas + BLOK]
+                for j, i in enumerate(satirlar, bas):
+                    k = self.eski.kayit(i)
+                    satir_yaz(j, k["belge"], k["sayfa"], k["metin"])
+                if self.eski.bilgi["tur"] == self.tur:
+                    # Ayni tur: satirlar oldugu gibi kopyalanir, her yazimda tekrar nicemlenmez
+                    vektor_dosyasi[bas:bas + len(satirlar)] = self.eski.vektorler[satirlar]
+                    if self.eski.olcekler is not None:
+                        olcekler[bas:bas + len(satirlar)] = self.eski.olcekler[satirlar]
+                    continue
+                parca = np.asarray(self.eski.vektorler[satirlar], dtype=np.float32)
+                if self.eski.olcekler is not None:
+                    parca *= np.asarray(self.eski.olcekler[satirlar])[:, None]
+                vektor_dosyasi[bas:bas + len(satirlar)], olcek = nicemle(_birim(parca), self.tur)
+                if olcek is not None:
+                    olcekler[bas:bas + len(satirlar)] = olcek
+
+            yeni = list(yeni.values())
+            for bas in range(0, len(yeni), BLOK):
+                grup = yeni[bas:bas + BLOK]
+                j0 = len(eski) + bas
+                for j, (belge, sayfa, metin, _) in enumerate(grup, j0):
+                    satir_yaz(j, belge, sayfa, metin)
+                vektor_dosyasi[j0:j0 + len(grup)], olcek = nicemle(_birim([g[3] for g in grup]), self.tur)
+                if olcek is not None:
+                    olcekler[j0:j0 + len(grup)] = olcek
+
+        vektor_dosyasi.flush()
+        del vektor_dosyasi
+        np.save(_dosya(gecici, "kayitlar.npy"), kayitlar)
+        if self.tur == "int8":
+            np.save(_dosya(gecici, "olcekler.npy"), olcekler)
+        with open(_dosya(gecici, "bilgi.json"), "w", encoding="utf-8") as f:
+            json.dump({"surum": SURUM, "model": self.model, "boyut": boyut, "tur": self.tur,
+                       "adet": adet, "belgeler": belgeler,
+                       "bilgiler": {b: self.bilgiler[b] for b in belgeler if b in self.bilgiler}}, f, ensure_ascii=False)
+
+        # Acik mmap'ler eski dosyalari (Linux'ta) silinene kadar kullanmaya devam eder
+        eski_klasor = self.klasor + ".eski"
+        shutil.rmtree(eski_klasor, ignore_errors=True)
+        if os.path.exists(self.klasor):
+            os.replace(self.klasor, eski_klasor)
+        os.replace(gecici, self.klasor)
+        shutil.rmtree(eski_klasor, ignore_errors=True)
+        return adet
@@ -0,0 +1,140 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+import warnings
+warnings.filterwarnings("ignore")
+import baglantilar
+import metrikler
+import gomme_onbellek
+import trafik
+import cevap_onbellek
+from gomme_onbellek import GommeOnbellegi
+from cevap_onbellek import CevapOnbellegi
+from arama import HibritArayici, PineconeArayici
+from gecmis_yonetici import SohbetGecmisi
+from sohbet import cevap_al
+from kiyaslama import sorulari_oku, derlem_olustur, kelime_kur, yuzdelik
+from sahte_servisler import SahteAnthropic, SahteVoyage, sahte_index
+
+
+def bellek_mb():
+    """Surecin o anki RSS'i; /proc yoksa tepe degeri."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    ru = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return ru / (1e6 if sys.platform == "darwin" else 1e3)
+
+
+def oturum(client, sorular, tur, rastgele, olcumler, kilit):
+    """Bir kullanicinin tur sayisi kadar soru sordugu tek sohbet."""
+    gecmis = SohbetGecmisi(client)
+    for _ in range(tur):
+        soru = rastgele.choice(sorular)["soru"]
+        bas = time.perf_counter()
+        ilk = None
+        cevap = ""
+        try:
+            with metrikler.istek("sohbet"):
+                for cevap, _ in cevap_al(soru, gecmis):
+                    if ilk is None and cevap:
+                        ilk = time.perf_counter() - bas
+            gecmis.ekle(soru, cevap)
+            kayit = {"ilk_token": ilk or 0.0, "toplam": time.perf_counter() - bas, "hata": False}
+        except Exception:
+            kayit = {"ilk_token": None, "toplam": time.perf_counter() - bas, "hata": True}
+        with kilit:
+            olcumler.append(kayit)
+
+
+def kademe(client, sorular, eszamanli, sure, tur, tohum):
+    """eszamanli kullanici sure boyunca yeni sohbetler acar; olcumleri dondurur."""
+    olcumler, kilit = [], threading.Lock()
+    bitis = time.monotonic() + sure
+
+    def kullanici(i):
+        rastgele = random.Random(tohum * 1000 + i)
+        while time.monotonic() < bitis:
+            oturum(client, sorular, tur, rastgele, olcumler, kilit)
+
+    cpu0, bas = time.process_time(), time.perf_counter()
+    isciler = [threading.Thread(target=kullanici, args=(i,), daemon=True) for i in range(eszamanli)]
+    for t in isciler:
+        t.start()
+    tepe_bellek = bellek_mb()
+    while any(t.is_alive() for t in isciler):
+        time.sleep(0.2)
+        tepe_bellek = max(tepe_bellek, bellek_mb())
+    gecen = time.perf_counter() - bas
+    cpu = time.process_time() - cpu0
+    basarili = [o for o in olcumler if not o["hata"]]
+    ilk = [o["ilk_token"] for o in basarili]
+    toplam = [o["toplam"] for o in basarili]
+    return {
+        "eszamanli": eszamanli, "cevap": len(basarili), "hata": len(olcumler) - len(basarili),
+        "cevap_sn": len(basarili) / gecen, "ilk_p50": yuzdelik(ilk, 50), "ilk_p95": yuzdelik(ilk, 95),
+        "toplam_p50": yuzdelik(toplam, 50), "toplam_p95": yuzdelik(toplam, 95),
+        "cpu": 100 * cpu / gecen, "bellek": tepe_bellek,
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description="Sahte Anthropic/Voyage/Pinecone ile cevap_al yuk testi")
+    p.add_argument("--eszamanli", default="1,4,16,64", help="virgulle ayrilmis kullanici sayilari")
+    p.add_argument("--sure", type=float, default=20, help="her kademenin suresi (sn)")
+    p.add_argument("--tur", type=int, default=3, help="sohbet basina soru sayisi")
+    p.add_argument("--ilk-token", type=float, default=0.4, help="Claude ilk token gecikmesi (sn)")
+    p.add_argument("--token-hizi", type=float, default=80, help="Claude token/sn")
+    p.add_argument("--cevap-token", type=int, default=250)
+    p.add_argument("--voyage-gecikme", type=float, default=0.15)
+    p.add_argument("--pinecone-gecikme", type=float, default=0.05)
+    p.add_argument("--hata-orani", type=float, default=0.0, help="her sahte servis icin hata olasiligi")
+    p.add_argument("--anthropic-rpm", type=int, default=0, help="Claude dakikalik istek kotasi (0 sinirsiz)")
+    p.add_argument("--voyage-rpm", type=int, default=0, help="Voyage dakikalik istek kotasi (0 sinirsiz)")
+    p.add_argument("--cevap-onbellegi", action="store_true", help="anlamsal cevap onbellegini acik birak")
+    p.add_argument("--tohum", type=int, default=1)
+    args = p.parse_args()
+
+    _, sorular = sorulari_oku()
+    print("Derlem hazirlaniyor...")
+    kayitlar = derlem_olustur()
+    hata = {"hata_orani": args.hata_orani, "sapma": 0.3 * args.voyage_gecikme, "tohum": args.tohum}
+    voyage = SahteVoyage(gecikme=args.voyage_gecikme, **hata)
+    index = sahte_index(kayitlar, voyage, gecikme=args.pinecone_gecikme, hata_orani=args.hata_orani, tohum=args.tohum)
+    client = SahteAnthropic(ilk_token=args.ilk_token, token_hizi=args.token_hizi, cevap_token=args.cevap_token,
+                            hata_orani=args.hata_orani, tohum=args.tohum)
+    # Sahte gommeler disk onbellegine yazilmasin; cevap onbellegi istenmedikce kapali (boyut 0)
+    gomme_onbellek._onbellek = GommeOnbellegi(yol=None)
+    cevap_onbellek._onbellek = CevapOnbellegi() if args.cevap_onbellegi else CevapOnbellegi(boyut=0)
+    # Varsayilan olarak kota yok; verilirse kota altinda bekleme ve KotaAsildi olculur
+    trafik.kota_ayarla("anthropic", args.anthropic_rpm)
+    trafik.kota_ayarla("voyage", args.voyage_rpm)
+
+    with tempfile.TemporaryDirectory() as klasor:
+        arayici = HibritArayici(kelime_kur(kayitlar, klasor), PineconeArayici(index, voyage))
+        baglantilar.baglanti_ayarla(index, client, voyage, arayici)
+        print(f"{len(kayitlar)} parca; Claude ilk token {args.ilk_token}s, {args.token_hizi} token/sn, "
+              f"Voyage {args.voyage_gecikme}s, Pinecone {args.pinecone_gecikme}s, hata orani {args.hata_orani}")
+        print(f"\n{'kullanici':>9}{'cevap':>7}{'hata':>6}{'cevap/sn':>10}{'ilk p50':>9}{'ilk p95':>9}"
+              f"{'toplam p50':>12}{'toplam p95':>12}{'CPU':>7}{'RSS':>9}")
+        for eszamanli in [int(x) for x in args.eszamanli.split(",") if x.strip()]:
+            s = kademe(client, sorular, eszamanli, args.sure, args.tur, args.tohum)
+            print(f"{s['eszamanli']:>9}{s['cevap']:>7}{s['hata']:>6}{s['cevap_sn']:>10.2f}{s['ilk_p50']:>8.2f}s{s['ilk_p95']:>8.2f}s"
+                  f"{s['toplam_p50']:>11.2f}s{s['toplam_p95']:>11.2f}s{s['cpu']:>6.0f}%{s['bellek']:>7.0f}MB")
+        print("\nAsama ortalamalari (tum kademeler):")
+        for asama, (_, toplam, adet) in sorted(metrikler.metrikler().histogramlar.items()):
+            print(f"  {asama:<18}{toplam / adet * 1000:>9.1f} ms  ({adet} kez)")
+
+
+if __name__ == "__main__":
+    main()